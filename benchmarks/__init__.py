@@ -0,0 +1,2 @@
+"""Offline benchmarks of the hot paths of VLMEvalKit itself (data loading, image I/O, the API thread pool, the
+rule-based evaluators and the VisFactor generators), independent of any model. Run `python -m benchmarks -h`."""
@@ -0,0 +1,31 @@
+import os
+from .common import Case, benchmark
+
+
+class FakeAPI:
+    """A fake API model that answers immediately, so that only the overhead of the framework is measured."""
+
+    is_api = True
+
+    def generate(self, message, dataset=None):
+        return 'The answer is ' + message[-1]['value'][-1]
+
+
+@benchmark('track_progress_rich')
+def bench_track_progress_rich(ctx):
+    from vlmeval.utils import track_progress_rich
+    n = ctx.count(2000)
+    model = FakeAPI()
+    tasks = [dict(message=[dict(type='text', value=f'Question {i}')], dataset='Bench') for i in range(n)]
+    keys = list(range(n))
+    save = ctx.path('track_progress_rich', 'results.pkl')
+
+    def setup():
+        if os.path.exists(save):
+            os.remove(save)
+
+    def run():
+        # As in `infer_data_api`: results are saved to a pickle file while the tasks finish
+        track_progress_rich(model.generate, tasks, nproc=16, chunksize=16, keys=keys, save=save)
+
+    return Case(n, run, setup)
@@ -0,0 +1,83 @@
+import os.path as osp
+import shutil
+from .common import Case, benchmark, synthetic_images, synthetic_mcq_tsv
+
+DATASET_NAME = 'Bench_MCQ'
+
+
+def synthetic_dataset_cls(file_md5=None):
+    from vlmeval.dataset.image_mcq import ImageMCQDataset
+
+    class BenchMCQDataset(ImageMCQDataset):
+        # The tsv is already in the LMUData root, `prepare_tsv` only checks its MD5
+        DATASET_URL = {DATASET_NAME: f'{DATASET_NAME}.tsv'}
+        DATASET_MD5 = {DATASET_NAME: file_md5} if file_md5 is not None else {}
+
+    return BenchMCQDataset
+
+
+def prepare_tsv(ctx, n):
+    from vlmeval.smp import LMUDataRoot
+    path = osp.join(LMUDataRoot(), f'{DATASET_NAME}.tsv')
+    if not osp.exists(path):
+        # 1 / 4 of the rows share the image of another row
+        synthetic_mcq_tsv(path, n, n_images=n * 3 // 4, seed=ctx.seed)
+    return path
+
+
+@benchmark('tsv_load')
+def bench_tsv_load(ctx):
+    from vlmeval.smp import load
+    n = ctx.count(2000)
+    path = prepare_tsv(ctx, n)
+    return Case(n, lambda: load(path))
+
+
+@benchmark('image_dataset_build')
+def bench_dataset_build(ctx):
+    # Including the MD5 check of the tsv, as for the released datasets
+    from vlmeval.smp import md5
+    n = ctx.count(2000)
+    cls = synthetic_dataset_cls(md5(prepare_tsv(ctx, n)))
+    return Case(n, lambda: cls(DATASET_NAME))
+
+
+@benchmark('dump_image')
+def bench_dump_image(ctx):
+    n = ctx.count(2000)
+    prepare_tsv(ctx, n)
+    dataset = synthetic_dataset_cls()(DATASET_NAME)
+    lines = [dataset.data.iloc[i] for i in range(len(dataset))]
+
+    def setup():
+        shutil.rmtree(dataset.img_root, ignore_errors=True)
+
+    def run():
+        for line in lines:
+            dataset.dump_image(line)
+
+    return Case(n, run, setup)
+
+
+@benchmark('encode_image_to_base64')
+def bench_encode_image(ctx):
+    from vlmeval.smp import encode_image_to_base64
+    images = synthetic_images(ctx.count(200), seed=ctx.seed, size=(1024, 768))
+
+    def run():
+        for im in images:
+            encode_image_to_base64(im)
+
+    return Case(len(images), run)
+
+
+@benchmark('encode_image_to_base64_resize')
+def bench_encode_image_resize(ctx):
+    from vlmeval.smp import encode_image_to_base64
+    images = synthetic_images(ctx.count(200), seed=ctx.seed, size=(1024, 768))
+
+    def run():
+        for im in images:
+            encode_image_to_base64(im, target_size=512)
+
+    return Case(len(images), run)
@@ -0,0 +1,102 @@
+import os
+import numpy as np
+import pandas as pd
+from .common import Case, benchmark
+
+VISFACTOR_NAME = 'VisFactor_Bench'
+
+
+class FakeJudge:
+    """A fake judge that answers immediately with the first option label in the prompt."""
+
+    def generate(self, prompt, **kwargs):
+        return 'A'
+
+
+def synthetic_visfactor_predictions(n, seed=0):
+    """Predictions of all VisFactor subtest families, in the json answer format asked by the prompts. About half of
+    them are correct, some have no json answer (the raw response is used then)."""
+    from vlmeval.dataset.visfactor import VisFactor
+    rng = np.random.default_rng(seed)
+    subtests = VisFactor.TF_SUBTESTS + VisFactor.CHOICE_SUBTESTS + VisFactor.EXTRACT_SUBTESTS
+    rows = []
+    for i in range(n):
+        cid = subtests[i % len(subtests)]
+        additional = 'nan'
+        if cid in VisFactor.TF_SUBTESTS:
+            answer = rng.choice(['T', 'F'])
+            pred = rng.choice(['true', 'false', 'yes', 'no'])
+        elif cid in VisFactor.CHOICE_SUBTESTS:
+            answer = 'cat,kitten'
+            pred = rng.choice(['cat', 'dog', 'Kitten'])
+        elif cid == 'CF3':
+            answer = '(2, 3)'
+            pred = f'({rng.integers(1, 4)}, {rng.integers(1, 4)})'
+        elif cid == 'VZ3':
+            additional = '4'
+            answer = rng.choice(list('ABCD'))
+            pred = rng.choice(list('ABCD'))
+        else:
+            answer = str(rng.integers(1, 4))
+            pred = f'There are {rng.integers(1, 4)} of them'
+        response = f'Let me think step by step. {{"answer": "{pred}"}}' if rng.random() < 0.9 else f'I think {pred}'
+        rows.append(dict(
+            index=i, category_id=cid, eval_index=i // 4, question='<IMAGE_0> Q', additional=additional,
+            answer=answer, prediction=response))
+    return pd.DataFrame(rows)
+
+
+@benchmark('visfactor_evaluate')
+def bench_visfactor_evaluate(ctx):
+    from vlmeval.dataset.visfactor import VisFactor
+    from vlmeval.smp import dump
+    n = ctx.count(20000)
+    eval_file = ctx.path('visfactor', f'Bench_{VISFACTOR_NAME}.xlsx')
+    dump(synthetic_visfactor_predictions(n, seed=ctx.seed), eval_file)
+    # The evaluation does not use the dataset itself, skip the loading of the tsv
+    dataset = VisFactor.__new__(VisFactor)
+    dataset.dataset_name = VISFACTOR_NAME
+    return Case(n, lambda: dataset.evaluate(eval_file))
+
+
+def synthetic_circular_data(n_groups, seed=0):
+    """Circular MCQ predictions: each question is asked with its 4 options rotated, the copies are indexed with
+    `index + k * 1e6`. Most predictions are a plain option label, some need the judge."""
+    rng = np.random.default_rng(seed)
+    options = ['A red square', 'A green circle', 'A blue triangle', 'Nothing at all']
+    meta, data = [], []
+    for g in range(n_groups):
+        answer = int(rng.integers(4))
+        for k in range(4):
+            idx = g + k * int(1e6)
+            rotated = options[k:] + options[:k]
+            gt = 'ABCD'[(answer - k) % 4]
+            r = rng.random()
+            if r < 0.7:
+                prediction = gt
+            elif r < 0.9:
+                prediction = f'The answer is {rng.choice(list("ABCD"))}. {rng.choice(rotated)}'
+            else:
+                prediction = 'I can not tell from the image.'
+            meta.append(dict(index=idx, answer=gt))
+            data.append(dict(index=idx, g_index=g, question=f'Question {g}', prediction=prediction,
+                             **dict(zip('ABCD', rotated))))
+    return pd.DataFrame(data), pd.DataFrame(meta)
+
+
+@benchmark('mcq_circular_eval')
+def bench_mcq_circular_eval(ctx):
+    from vlmeval.dataset.utils.multiple_choice import mcq_circular_eval
+    n_groups = ctx.count(5000)
+    data, meta = synthetic_circular_data(n_groups, seed=ctx.seed)
+    result_file = ctx.path('mcq_circular_eval', 'result.pkl')
+    judge = FakeJudge()
+
+    def setup():
+        if os.path.exists(result_file):
+            os.remove(result_file)
+
+    def run():
+        mcq_circular_eval(judge, data.copy(), meta, 16, result_file, 'Bench_circular')
+
+    return Case(4 * n_groups, run, setup)
@@ -0,0 +1,228 @@
+"""Items / sec of each VisFactor generator (`visfactor/utils`), one item being one iteration of the corresponding
+loop of `visfactor/generate_images.py` (including the rejection sampling and the saving of the images)."""
+import os
+import sys
+import os.path as osp
+import shutil
+import importlib.util
+from .common import Case, benchmark, synthetic_images
+
+VISFACTOR_UTILS = osp.join(osp.dirname(osp.dirname(osp.abspath(__file__))), 'visfactor', 'utils')
+# The number of items of each generator (at scale 1)
+NUM_ITEMS = 8
+
+
+def load_generator(name):
+    # The generator modules are scripts (not a package), load them by path
+    import matplotlib
+    matplotlib.use('Agg')
+    module_name = f'visfactor_{name}'
+    if module_name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(module_name, osp.join(VISFACTOR_UTILS, f'{name}.py'))
+        module = importlib.util.module_from_spec(spec)
+        # Registered before the execution, as required by dataclasses
+        sys.modules[module_name] = module
+        try:
+            spec.loader.exec_module(module)
+        except BaseException:
+            sys.modules.pop(module_name)
+            raise
+    return sys.modules[module_name]
+
+
+def collected_figures(ctx, n=24):
+    """A folder of synthetic source figures with their labels (`answers.txt`), as used by CS1 / CS3 / MA1."""
+    root = osp.join(ctx.root, 'visfactor', 'Collected_Figures')
+    if not osp.exists(osp.join(root, 'answers.txt')):
+        os.makedirs(root, exist_ok=True)
+        for i, im in enumerate(synthetic_images(n, seed=ctx.seed, size=(256, 256))):
+            im.save(osp.join(root, f'{i}.png'))
+        with open(osp.join(root, 'answers.txt'), 'w') as fout:
+            fout.write(''.join(f'{i}.png object_{i}\n' for i in range(n)))
+    return root
+
+
+def generator_case(ctx, name, make_item, n=NUM_ITEMS):
+    """`make_item(i, out_dir)` generates item `i` into `out_dir`, which is emptied before each repetition."""
+    n = ctx.count(n)
+    out_dir = osp.join(ctx.root, 'visfactor', name)
+
+    def setup():
+        shutil.rmtree(out_dir, ignore_errors=True)
+        os.makedirs(out_dir)
+
+    def run():
+        for i in range(n):
+            make_item(i, out_dir)
+
+    return Case(n, run, setup)
+
+
+@benchmark('visfactor_CF1')
+def bench_cf1(ctx):
+    m = load_generator('CF1')
+    grid = m.Grid(rows=6, cols=6)
+    gen = m.GridFigureGenerator(grid, density=0.2)
+    models = [m.parse_model(s) for s in [
+        '0,1-0,2; 0,2-0,3; 0,3-1,2; 1,2-2,2; 2,2-2,1; 2,1-1,0; 1,0-0,1',
+        '0,0-0,1; 0,1-0,2; 0,2-0,3; 0,3-1,2; 1,2-2,1; 2,1-1,1; 1,1-0,0',
+        '1,0-1,1; 1,1-0,2; 0,2-0,3; 0,3-1,3; 1,3-2,2; 2,2-2,1; 2,1-1,0',
+        '2,0-1,1; 1,1-0,2; 0,2-1,3; 1,3-2,3; 2,3-2,2; 2,2-2,1; 2,1-2,0',
+        '2,0-1,1; 1,1-0,1; 0,1-1,2; 1,2-1,3; 1,3-2,2; 2,2-2,1; 2,1-2,0',
+    ]]
+
+    def make_item(i, out_dir):
+        while True:
+            pattern = gen.sample()
+            if 1 <= sum(m.model_in_pattern(model, pattern) for model in models) <= 4:
+                break
+        grid.draw(pattern, osp.join(out_dir, f'{i}.png'))
+
+    return generator_case(ctx, 'CF1', make_item)
+
+
+@benchmark('visfactor_CF2')
+def bench_cf2(ctx):
+    m = load_generator('CF2')
+    gen = m.GridPatternGenerator(rows=3, cols=3, density=0.2)
+    model = m.parse_edges('0,2-0,1; 0,1-1,1; 1,1-2,0; 1,1-2,2')
+
+    def make_item(i, out_dir):
+        # Half of the patterns contain the model
+        expect = i % 2 == 0
+        pattern = gen.generate_pattern()
+        while gen.contains_model(pattern, model) != expect:
+            pattern = gen.generate_pattern()
+        gen.draw_edges(pattern, osp.join(out_dir, f'{i}.png'))
+
+    return generator_case(ctx, 'CF2', make_item)
+
+
+@benchmark('visfactor_CF3')
+def bench_cf3(ctx):
+    m = load_generator('CF3')
+    gen = m.GridWalkGenerator(m.GridConfig(rows=5, cols=5), 4, 4)
+    return generator_case(ctx, 'CF3', lambda i, out_dir: gen.generate_pair(i, osp.join(out_dir, f'{i}.png')))
+
+
+@benchmark('visfactor_CS1')
+def bench_cs1(ctx):
+    m = load_generator('CS1')
+    dataset = m.MaskedImageDataset(collected_figures(ctx), severity=0.4, repeat=True)
+    items = iter(dataset)
+
+    def make_item(i, out_dir):
+        img, _ = next(items)
+        img.save(osp.join(out_dir, f'{i}.png'))
+
+    return generator_case(ctx, 'CS1', make_item)
+
+
+@benchmark('visfactor_CS2')
+def bench_cs2(ctx):
+    import cv2
+    m = load_generator('CS2')
+    dataset = m.WordImageDataset(3, 6, severity=0.4, infinite=True)
+    items = iter(dataset)
+
+    def make_item(i, out_dir):
+        img, _ = next(items)
+        cv2.imwrite(osp.join(out_dir, f'{i}.png'), img)
+
+    return generator_case(ctx, 'CS2', make_item)
+
+
+@benchmark('visfactor_CS3')
+def bench_cs3(ctx):
+    m = load_generator('CS3')
+    dataset = m.NoisyImageDataset(root_dir=collected_figures(ctx), severity=0.4)
+
+    def make_item(i, out_dir):
+        img, _ = dataset[i % len(dataset)]
+        img.save(osp.join(out_dir, f'{i}.png'))
+
+    return generator_case(ctx, 'CS3', make_item)
+
+
+@benchmark('visfactor_MA1')
+def bench_ma1(ctx):
+    m = load_generator('MA1')
+    dataset = m.CompositeGridDataset(collected_figures(ctx), capacity=21, seed=ctx.seed)
+
+    def make_item(i, out_dir):
+        big_img, obj_img, _ = next(dataset)
+        big_img.save(osp.join(out_dir, f'{i}-0.png'))
+        obj_img.save(osp.join(out_dir, f'{i}-1.png'))
+
+    return generator_case(ctx, 'MA1', make_item)
+
+
+@benchmark('visfactor_S1')
+def bench_s1(ctx):
+    m = load_generator('S1')
+    n = ctx.count(NUM_ITEMS)
+
+    def make_item(i, out_dir):
+        # One item is one question polygon with its 8 rotated / mirrored candidates
+        dataset = m.RandomPolygonDataset(num_polygons=1, eval_num=8, n_vertices_range=(4, 8), seed=ctx.seed + i)
+        for q_img, imgs, _ in dataset:
+            q_img.save(osp.join(out_dir, f'{i}-0.png'))
+            for j, img in enumerate(imgs):
+                img.save(osp.join(out_dir, f'{i}-{j + 1}.png'))
+
+    return generator_case(ctx, 'S1', make_item, n=n)
+
+
+@benchmark('visfactor_S2')
+def bench_s2(ctx):
+    import cv2
+    m = load_generator('S2')
+
+    def make_item(i, out_dir):
+        # Half of the pairs show the same cube
+        expect = i % 2 == 0
+        cube1, cube2 = m.generate_cube_pairs()
+        while m.is_same_cube(cube1, cube2) != expect:
+            cube1, cube2 = m.generate_cube_pairs()
+        cv2.imwrite(osp.join(out_dir, f'{i}-0.png'), m.generate_cube(cube1))
+        cv2.imwrite(osp.join(out_dir, f'{i}-1.png'), m.generate_cube(cube2))
+
+    return generator_case(ctx, 'S2', make_item)
+
+
+@benchmark('visfactor_SS3')
+def bench_ss3(ctx):
+    m = load_generator('SS3')
+
+    def make_item(i, out_dir):
+        city = m.City(rows=7, cols=8, blocked_ratio=0.25, num_buildings=10)
+        while len(city.crossed_buildings) != 1:
+            city = m.City(rows=7, cols=8, blocked_ratio=0.25, num_buildings=10)
+        city.draw(osp.join(out_dir, f'{i}.png'))
+
+    return generator_case(ctx, 'SS3', make_item)
+
+
+@benchmark('visfactor_VZ1')
+def bench_vz1(ctx):
+    m = load_generator('VZ1')
+    models = [
+        '0,1-0,3; 0,3-1,3; 1,3-1,4; 1,4-3,4; 3,4-3,3; 3,3-4,3; 4,3-4,1; 4,1-3,1; 3,1-3,0; 3,0-1,0; 1,0-1,1; 1,1-0,1',
+        '0,1-0,3; 0,3-2,4; 2,4-4,3; 4,3-4,1; 4,1-2,0; 2,0-0,1',
+        '0,0-0,5; 0,5-5,5; 5,5-5,0; 5,0-0,0',
+        '4,0-4,4; 4,4-0,2; 0,2-4,0',
+    ]
+    return generator_case(
+        ctx, 'VZ1', lambda i, out_dir: m.Puzzle.from_edges(models[i % 4]).export(osp.join(out_dir, f'{i}.png')))
+
+
+@benchmark('visfactor_VZ2')
+def bench_vz2(ctx):
+    m = load_generator('VZ2')
+
+    def make_item(i, out_dir):
+        # `generate_sequence` reseeds the global RNG itself
+        m.generate_sequence(3, 1, 3, seed=ctx.seed + i, save_dir=osp.join(out_dir, str(i)))
+        m.process_images(out_dir + '/', i)
+
+    return generator_case(ctx, 'VZ2', make_item)
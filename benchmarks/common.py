@@ -0,0 +1,85 @@
+import os
+import os.path as osp
+import random
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from PIL import Image
+
+# name -> function(ctx), see `benchmark`
+BENCHMARKS = OrderedDict()
+
+
+class Context:
+    """The shared settings of a benchmark session: a scratch directory, the scale of the item counts and the seed."""
+
+    def __init__(self, root, scale=1.0, seed=0):
+        self.root = root
+        self.scale = scale
+        self.seed = seed
+
+    def count(self, n):
+        # The number of items of a benchmark, scaled with `--scale`
+        return max(int(n * self.scale), 1)
+
+    def path(self, *parts):
+        pth = osp.join(self.root, *parts)
+        os.makedirs(osp.dirname(pth), exist_ok=True)
+        return pth
+
+    def reseed(self):
+        random.seed(self.seed)
+        np.random.seed(self.seed)
+
+
+class Case:
+    """A prepared benchmark: `run` processes `items` items and is the only timed part. `setup` is called (untimed)
+    before each repetition, e.g., to remove the outputs of the previous one."""
+
+    def __init__(self, items, run, setup=None):
+        self.items = items
+        self.run = run
+        self.setup = setup
+
+
+def benchmark(name):
+    """Register a benchmark. The decorated function takes a `Context` and returns a `Case`."""
+    def wrap(func):
+        assert name not in BENCHMARKS, f'Duplicated benchmark name: {name}'
+        BENCHMARKS[name] = func
+        return func
+    return wrap
+
+
+def synthetic_image(rng, size=(512, 384)):
+    # A smooth random image (upsampled noise), closer to natural images than white noise when compressed
+    low = rng.integers(0, 256, size=(size[1] // 32 + 1, size[0] // 32 + 1, 3), dtype=np.uint8)
+    return Image.fromarray(low).resize(size, Image.BILINEAR)
+
+
+def synthetic_images(n, seed=0, size=(512, 384)):
+    rng = np.random.default_rng(seed)
+    return [synthetic_image(rng, size) for _ in range(n)]
+
+
+def synthetic_mcq_tsv(path, n, n_images=None, seed=0, size=(512, 384)):
+    """Write an MCQ tsv of `n` rows in the LMUData format: base64 images (the rows after the first `n_images` refer
+    to the image of another row by its index, as in the released tsv files), a question, options A-D and an answer.
+    Returns the DataFrame."""
+    from vlmeval.smp import encode_image_to_base64
+    n_images = n if n_images is None else min(n_images, n)
+    rng = np.random.default_rng(seed)
+    images = [encode_image_to_base64(im) for im in synthetic_images(n_images, seed=seed, size=size)]
+    data = pd.DataFrame({
+        'index': list(range(n)),
+        'image': [images[i] if i < n_images else str(int(rng.integers(n_images))) for i in range(n)],
+        'question': [f'Which option describes the image {i} best?' for i in range(n)],
+        'A': ['A red square'] * n,
+        'B': ['A green circle'] * n,
+        'C': ['A blue triangle'] * n,
+        'D': ['Nothing at all'] * n,
+        'answer': [rng.choice(list('ABCD')) for _ in range(n)],
+        'category': [f'cat_{i % 8}' for i in range(n)],
+    })
+    data.to_csv(path, sep='\t', index=False)
+    return data
@@ -0,0 +1,126 @@
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import traceback
+import os.path as osp
+import numpy as np
+
+from .common import BENCHMARKS, Context
+
+# Importing the modules registers their benchmarks
+BENCHMARK_MODULES = ['bench_data', 'bench_api', 'bench_eval', 'bench_visfactor']
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Offline benchmarks of the VLMEvalKit hot paths. Results are saved to a JSON file, which can be '
+                    'compared with the results of another commit with `--compare`.')
+    parser.add_argument('--filter', type=str, nargs='+', default=None,
+                        help='Only run the benchmarks whose name matches one of these regular expressions')
+    parser.add_argument('--list', action='store_true', help='List the benchmarks and exit')
+    parser.add_argument('--repeat', type=int, default=3, help='The number of timed repetitions of each benchmark')
+    parser.add_argument('--scale', type=float, default=1.0, help='Multiply the number of items of each benchmark')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--work-dir', type=str, default='./outputs/benchmarks',
+                        help='The directory of the result files')
+    parser.add_argument('--out', type=str, default=None,
+                        help='The result file, defaults to `{work_dir}/bench_{commit}_{time}.json`')
+    parser.add_argument('--compare', type=str, default=None,
+                        help='A previous result file, print the speedup of each benchmark against it')
+    parser.add_argument('--keep-data', action='store_true', help='Keep the synthetic data in the work dir')
+    return parser.parse_args()
+
+
+def load_benchmarks():
+    import importlib
+    for name in BENCHMARK_MODULES:
+        importlib.import_module(f'{__package__}.{name}')
+    return BENCHMARKS
+
+
+def run_case(func, ctx, repeat):
+    ctx.reseed()
+    case = func(ctx)
+    times = []
+    for _ in range(repeat):
+        ctx.reseed()
+        if case.setup is not None:
+            case.setup()
+        st = time.perf_counter()
+        case.run()
+        times.append(time.perf_counter() - st)
+    median = float(np.median(times))
+    return dict(
+        items=case.items, times=times, best=min(times), median=median,
+        items_per_sec=case.items / median if median > 0 else float('inf'))
+
+
+def meta_info(args):
+    from vlmeval.smp import githash, timestr
+    return dict(
+        commit=githash(digits=8), time=timestr(), python=sys.version.split()[0], platform=platform.platform(),
+        cpu_count=os.cpu_count(), repeat=args.repeat, scale=args.scale, seed=args.seed)
+
+
+def compare(results, base_file):
+    from tabulate import tabulate
+    with open(base_file) as fin:
+        base = json.load(fin)
+    rows = []
+    for name, res in results.items():
+        old = base['results'].get(name, {})
+        if 'items_per_sec' not in res or 'items_per_sec' not in old:
+            continue
+        rows.append((name, old['items_per_sec'], res['items_per_sec'], res['items_per_sec'] / old['items_per_sec']))
+    print(f"Compared with {base_file} (commit {base['meta'].get('commit')}):")
+    print(tabulate(rows, headers=['Benchmark', 'Base (items/s)', 'Current (items/s)', 'Speedup'], floatfmt='.2f'))
+
+
+def main():
+    args = parse_args()
+    benchmarks = load_benchmarks()
+    if args.filter is not None:
+        benchmarks = {k: v for k, v in benchmarks.items() if any(re.search(p, k) for p in args.filter)}
+    if args.list:
+        print('\n'.join(benchmarks))
+        return
+
+    os.makedirs(args.work_dir, exist_ok=True)
+    root = tempfile.mkdtemp(prefix='data_', dir=args.work_dir)
+    # Synthetic datasets are saved to (and loaded from) a private LMUData root, nothing is downloaded
+    os.environ['LMUData'] = root
+    ctx = Context(root, scale=args.scale, seed=args.seed)
+    meta = meta_info(args)
+
+    results = {}
+    try:
+        for name, func in benchmarks.items():
+            print(f'Running {name} ...', flush=True)
+            try:
+                results[name] = run_case(func, ctx, args.repeat)
+                print(f"    {results[name]['items']} items, median {results[name]['median']:.3f}s, "
+                      f"{results[name]['items_per_sec']:.2f} items/s", flush=True)
+            except Exception as e:
+                # A missing optional dependency (e.g., of a VisFactor generator) only skips its own benchmark
+                results[name] = dict(error=f'{type(e).__name__}: {e}')
+                print(f'    Failed: {type(e).__name__}: {e}', flush=True)
+                traceback.print_exc()
+    finally:
+        if not args.keep_data:
+            shutil.rmtree(root, ignore_errors=True)
+
+    out_file = args.out
+    if out_file is None:
+        out_file = osp.join(args.work_dir, f"bench_{meta['commit']}_{meta['time']}.json")
+    with open(out_file, 'w') as fout:
+        json.dump(dict(meta=meta, results=results), fout, indent=4)
+    print(f'Results saved to {out_file}')
+
+    if args.compare is not None:
+        compare(results, args.compare)
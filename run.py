@@ -194,11 +194,31 @@ You can launch the evaluation by setting either --data and --model or --config.
     parser.add_argument('--reuse-aux', type=int, default=True, help='reuse auxiliary evaluation files')
     parser.add_argument(
         '--use-vllm', action='store_true', help='use vllm to generate, the flag is only supported in Llama4 for now')
+    # Predictions are stored in PRED_FORMAT (parquet by default), also export a xlsx copy for manual inspection
+    parser.add_argument('--export-xlsx', action='store_true', help='export the prediction file to xlsx as well')
 
     args = parser.parse_args()
     return args
 
 
+def dump_run_timings(pred_root, model_name, dataset_name):
+    # Set `TIMING_TRACE=1` to also save all spans in the Chrome trace format
+    timing_file = osp.join(pred_root, f'{model_name}_{dataset_name}_timings.json')
+    trace_file = None
+    if os.environ.get('TIMING_TRACE', '0') == '1':
+        trace_file = osp.join(pred_root, f'{model_name}_{dataset_name}_trace.json')
+    try:
+        report = dump_timings(timing_file, trace_file, model=model_name, dataset=dataset_name)
+    except Exception as e:
+        get_logger('RUN').warning(f'Failed to dump the stage timings to {timing_file}: {e}')
+        return
+    stages = [(x['path'], x['count'], x['total'], x['mean']) for x in report['stages'] if x['depth'] <= 2]
+    if len(stages):
+        get_logger('RUN').info(
+            f'Stage timings of {model_name} x {dataset_name} (saved to {timing_file}):\n'
+            + tabulate(stages, headers=['Stage', 'Count', 'Total (s)', 'Mean (s)'], floatfmt='.2f'))
+
+
 def main():
     logger = get_logger('RUN')
     args = parse_args()
@@ -263,21 +283,23 @@ def main():
             os.makedirs(pred_root, exist_ok=True)
 
         if use_config:
-            model = build_model_from_config(cfg['model'], model_name, args.use_vllm)
+            with timer('build_model', model=model_name):
+                model = build_model_from_config(cfg['model'], model_name, args.use_vllm)
 
         for _, dataset_name in enumerate(args.data):
             if WORLD_SIZE > 1:
                 dist.barrier()
 
             try:
-                result_file_base = f'{model_name}_{dataset_name}.xlsx'
+                result_file_base = f'{model_name}_{dataset_name}.{get_pred_file_format()}'
 
                 if use_config:
-                    if WORLD_SIZE > 1:
-                        if RANK == 0:
-                            dataset = build_dataset_from_config(cfg['data'], dataset_name)
-                        dist.barrier()
-                    dataset = build_dataset_from_config(cfg['data'], dataset_name)
+                    with timer('build_dataset', dataset=dataset_name):
+                        if WORLD_SIZE > 1:
+                            if RANK == 0:
+                                dataset = build_dataset_from_config(cfg['data'], dataset_name)
+                            dist.barrier()
+                        dataset = build_dataset_from_config(cfg['data'], dataset_name)
                     if dataset is None:
                         logger.error(f'Dataset {dataset_name} is not valid, will be skipped. ')
                         continue
@@ -287,27 +309,29 @@ def main():
                         dataset_kwargs['model'] = model_name
 
                     # If distributed, first build the dataset on the main process for doing preparation works
-                    if WORLD_SIZE > 1:
-                        if RANK == 0:
-                            dataset = build_dataset(dataset_name, **dataset_kwargs)
-                        dist.barrier()
+                    with timer('build_dataset', dataset=dataset_name):
+                        if WORLD_SIZE > 1:
+                            if RANK == 0:
+                                dataset = build_dataset(dataset_name, **dataset_kwargs)
+                            dist.barrier()
 
-                    dataset = build_dataset(dataset_name, **dataset_kwargs)
+                        dataset = build_dataset(dataset_name, **dataset_kwargs)
                     if dataset is None:
                         logger.error(f'Dataset {dataset_name} is not valid, will be skipped. ')
                         continue
 
                 # Handling Multi-Turn Dataset
                 if dataset.TYPE == 'MT':
-                    result_file_base = result_file_base.replace('.xlsx', '.tsv')
+                    result_file_base = f'{model_name}_{dataset_name}.tsv'
 
                 result_file = osp.join(pred_root, result_file_base)
                 # Reuse the previous prediction file if exists
                 if RANK == 0 and len(prev_pred_roots):
-                    prepare_reuse_files(
-                        pred_root_meta=pred_root_meta, eval_id=eval_id, model_name=model_name,
-                        dataset_name=dataset_name, reuse=args.reuse, reuse_aux=args.reuse_aux
-                    )
+                    with timer('prepare_reuse'):
+                        prepare_reuse_files(
+                            pred_root_meta=pred_root_meta, eval_id=eval_id, model_name=model_name,
+                            dataset_name=dataset_name, reuse=args.reuse, reuse_aux=args.reuse_aux
+                        )
 
                 if WORLD_SIZE > 1:
                     dist.barrier()
@@ -316,36 +340,37 @@ def main():
                     model = model_name  # which is only a name
 
                 # Perform the Inference
-                if dataset.MODALITY == 'VIDEO':
-                    model = infer_data_job_video(
-                        model,
-                        work_dir=pred_root,
-                        model_name=model_name,
-                        dataset=dataset,
-                        result_file_name=result_file_base,
-                        verbose=args.verbose,
-                        api_nproc=args.api_nproc,
-                        use_vllm=args.use_vllm)
-                elif dataset.TYPE == 'MT':
-                    model = infer_data_job_mt(
-                        model,
-                        work_dir=pred_root,
-                        model_name=model_name,
-                        dataset=dataset,
-                        verbose=args.verbose,
-                        api_nproc=args.api_nproc,
-                        ignore_failed=args.ignore,
-                        use_vllm=args.use_vllm)
-                else:
-                    model = infer_data_job(
-                        model,
-                        work_dir=pred_root,
-                        model_name=model_name,
-                        dataset=dataset,
-                        verbose=args.verbose,
-                        api_nproc=args.api_nproc,
-                        ignore_failed=args.ignore,
-                        use_vllm=args.use_vllm)
+                with timer('infer'):
+                    if dataset.MODALITY == 'VIDEO':
+                        model = infer_data_job_video(
+                            model,
+                            work_dir=pred_root,
+                            model_name=model_name,
+                            dataset=dataset,
+                            result_file_name=result_file_base,
+                            verbose=args.verbose,
+                            api_nproc=args.api_nproc,
+                            use_vllm=args.use_vllm)
+                    elif dataset.TYPE == 'MT':
+                        model = infer_data_job_mt(
+                            model,
+                            work_dir=pred_root,
+                            model_name=model_name,
+                            dataset=dataset,
+                            verbose=args.verbose,
+                            api_nproc=args.api_nproc,
+                            ignore_failed=args.ignore,
+                            use_vllm=args.use_vllm)
+                    else:
+                        model = infer_data_job(
+                            model,
+                            work_dir=pred_root,
+                            model_name=model_name,
+                            dataset=dataset,
+                            verbose=args.verbose,
+                            api_nproc=args.api_nproc,
+                            ignore_failed=args.ignore,
+                            use_vllm=args.use_vllm)
 
                 # Set the judge kwargs first before evaluation or dumping
 
@@ -396,6 +421,12 @@ def main():
 
                 # Only RANK 0 handles the evaluation part
                 if RANK == 0:
+                    if args.export_xlsx and not result_file.endswith('.xlsx') and osp.exists(result_file):
+                        xlsx_file = get_intermediate_file_path(result_file, '', 'xlsx')
+                        with timer('export_xlsx'):
+                            dump(load(result_file), xlsx_file)
+                        logger.info(f'Prediction file exported to {xlsx_file}')
+
                     # Prepare Submission Files for MMMU_TEST AND MMT-Bench_ALL
                     if dataset_name in ['MMMU_TEST']:
                         result_json = MMMU_result_transfer(result_file)
@@ -440,7 +471,8 @@ def main():
                         proxy_set(eval_proxy)
 
                     # Perform the Evaluation
-                    eval_results = dataset.evaluate(result_file, **judge_kwargs)
+                    with timer('evaluate'):
+                        eval_results = dataset.evaluate(result_file, **judge_kwargs)
                     # Display Evaluation Results in Terminal
                     if eval_results is not None:
                         assert isinstance(eval_results, dict) or isinstance(eval_results, pd.DataFrame)
@@ -472,6 +504,11 @@ def main():
                 logger.exception(f'Model {model_name} x Dataset {dataset_name} combination failed: {e}, '
                                  'skipping this combination.')
                 continue
+            finally:
+                # The stage timings of this (model, dataset) combination
+                if RANK == 0:
+                    dump_run_timings(pred_root, model_name, dataset_name)
+                reset_timings()
 
     if WORLD_SIZE > 1:
         dist.destroy_process_group()
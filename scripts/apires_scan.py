@@ -10,9 +10,8 @@ if root[-1] in '/\\':
 model_name = root.split('/')[-1]
 
 for d in SUPPORTED_DATASETS:
-    fname = f'{model_name}_{d}.xlsx'
-    pth = osp.join(root, fname)
-    if osp.exists(pth):
+    pth = find_pred_file(root, model_name, d)
+    if pth is not None:
         data = load(pth)
         # Detect Failure
         assert 'prediction' in data
@@ -24,7 +23,7 @@ for d in SUPPORTED_DATASETS:
             print(f'Model {model_name} x Dataset {d}: {nfail} out of {ntot} failed. {nfail / ntot * 100: .2f}%. ')
 
         eval_files = ls(root, match=f'{model_name}_{d}_')
-        eval_files = [x for x in eval_files if listinstr([f'{d}_openai', f'{d}_gpt'], x) and x.endswith('.xlsx')]
+        eval_files = [x for x in eval_files if listinstr([f'{d}_openai', f'{d}_gpt'], x) and x.split('.')[-1] in PRED_FORMATS]
 
         if len(eval_files) == 0:
             print(f'Model {model_name} x Dataset {d} openai missing')
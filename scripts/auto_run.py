@@ -26,7 +26,7 @@ args = parser.parse_args()
 models = [x for x in models if not listinstr(['MiniGPT', 'grounding-generalist'], x)]
 
 for m in models:
-    unknown_datasets = [x for x in args.data if not osp.exists(f'{m}/{m}_{x}.xlsx')]
+    unknown_datasets = [x for x in args.data if find_pred_file(m, m, x) is None]
     if len(unknown_datasets) == 0:
         continue
     dataset_str = ' '.join(unknown_datasets)
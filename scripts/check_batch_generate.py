@@ -0,0 +1,136 @@
+"""Check that the batch generation of a model (`generate_batch`) gives the same outputs as the sample by sample
+generation (`generate`), with greedy decoding.
+
+By default, a tiny randomly initialized Qwen2-VL checkpoint is built in a temporary directory and run on CPU, so the
+check needs neither a GPU nor a download:
+
+    python scripts/check_batch_generate.py
+
+With `--model`, a model of `vlmeval.config.supported_VLM` is checked instead (e.g., `--model Qwen2-VL-2B-Instruct`).
+Exits with a non-zero status if any output differs.
+"""
+import sys
+import time
+import argparse
+import tempfile
+import os.path as osp
+import numpy as np
+from PIL import Image
+
+SPECIAL_TOKENS = ['<|endoftext|>', '<|im_start|>', '<|im_end|>', '<|vision_start|>', '<|vision_end|>',
+                  '<|image_pad|>', '<|video_pad|>']
+WORDS = 'What is in the image? Describe the picture. Answer the question with a single word. The quick brown fox'
+
+
+def build_tiny_qwen2_vl(root):
+    """Save a tiny randomly initialized Qwen2-VL checkpoint (with a small BPE tokenizer) to `root`."""
+    import torch
+    from tokenizers import Tokenizer, models, pre_tokenizers, decoders, trainers
+    from transformers import (Qwen2TokenizerFast, Qwen2VLImageProcessor, Qwen2VLProcessor, Qwen2VLConfig,
+                              Qwen2VLForConditionalGeneration)
+    from vlmeval.vlm.qwen2_vl.model import CHAT_TEMPLATE
+
+    tok = Tokenizer(models.BPE())
+    tok.pre_tokenizer = pre_tokenizers.ByteLevel(add_prefix_space=False)
+    tok.decoder = decoders.ByteLevel()
+    trainer = trainers.BpeTrainer(
+        vocab_size=400, special_tokens=SPECIAL_TOKENS, initial_alphabet=pre_tokenizers.ByteLevel.alphabet())
+    tok.train_from_iterator([f'user assistant system {WORDS} 0123456789'] * 10, trainer)
+    hf_tok = Qwen2TokenizerFast(
+        tokenizer_object=tok, eos_token='<|im_end|>', pad_token='<|endoftext|>',
+        additional_special_tokens=SPECIAL_TOKENS[1:])
+    image_processor = Qwen2VLImageProcessor(min_pixels=56 * 56, max_pixels=112 * 112)
+    processor = Qwen2VLProcessor(image_processor=image_processor, tokenizer=hf_tok, chat_template=CHAT_TEMPLATE)
+    processor.save_pretrained(root)
+
+    ids = {t: hf_tok.convert_tokens_to_ids(t) for t in SPECIAL_TOKENS}
+    config = Qwen2VLConfig(
+        vocab_size=len(hf_tok), hidden_size=64, intermediate_size=128, num_hidden_layers=2, num_attention_heads=4,
+        num_key_value_heads=2, max_position_embeddings=4096, rope_scaling={'type': 'mrope', 'mrope_section': [2, 3, 3]},
+        vision_config=dict(depth=2, embed_dim=32, hidden_size=64, num_heads=2, mlp_ratio=2, in_chans=3, patch_size=14,
+                           spatial_merge_size=2, temporal_patch_size=2),
+        image_token_id=ids['<|image_pad|>'], video_token_id=ids['<|video_pad|>'],
+        vision_start_token_id=ids['<|vision_start|>'], vision_end_token_id=ids['<|vision_end|>'],
+        bos_token_id=ids['<|endoftext|>'], eos_token_id=ids['<|im_end|>'], pad_token_id=ids['<|endoftext|>'])
+    torch.manual_seed(0)
+    Qwen2VLForConditionalGeneration(config).save_pretrained(root)
+    return root
+
+
+def load_tiny_qwen2_vl(root, max_new_tokens=20):
+    import torch
+    from transformers import Qwen2VLForConditionalGeneration, Qwen2VLProcessor
+    from vlmeval.vlm.qwen2_vl.model import Qwen2VLChat
+    # The constructor of Qwen2VLChat requires a GPU, set up the (CPU) model by hand
+    model = Qwen2VLChat.__new__(Qwen2VLChat)
+    model.model_path = root
+    model.processor = Qwen2VLProcessor.from_pretrained(root)
+    model.model = Qwen2VLForConditionalGeneration.from_pretrained(root, torch_dtype=torch.float32).eval()
+    model.min_pixels, model.max_pixels, model.total_pixels = 56 * 56, 112 * 112, None
+    model.max_new_tokens = max_new_tokens
+    model.generate_kwargs = dict(
+        max_new_tokens=max_new_tokens, top_p=0.001, top_k=1, temperature=0.01, repetition_penalty=1.0)
+    model.system_prompt, model.verbose, model.post_process = None, False, False
+    model.fps, model.nframe, model.FRAME_FACTOR = 2, 128, 2
+    model.use_vllm, model.use_lmdeploy, model.use_audio_in_video = False, False, False
+    model.dump_image_func = None
+    return model
+
+
+def build_messages(root, num_samples):
+    """Messages of various lengths: text only, one image and two images."""
+    rng = np.random.default_rng(0)
+    images = []
+    for i in range(4):
+        pth = osp.join(root, f'img{i}.png')
+        Image.fromarray(rng.integers(0, 256, size=(64 + 16 * i, 96, 3), dtype=np.uint8)).save(pth)
+        images.append(pth)
+    words = WORDS.split()
+    messages = []
+    for k in range(num_samples):
+        text = ' '.join(words[: 3 + (k * 7) % len(words)])
+        if k % 3 == 0:
+            messages.append([dict(type='text', value=text)])
+        else:
+            msg = [dict(type='image', value=images[k % 4]), dict(type='text', value=text)]
+            if k % 5 == 0:
+                msg.insert(1, dict(type='image', value=images[(k + 1) % 4]))
+            messages.append(msg)
+    return messages
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check the batch generation against the sample by sample one.')
+    parser.add_argument('--model', type=str, default=None,
+                        help='A model of `supported_VLM`, default to a tiny random Qwen2-VL on CPU')
+    parser.add_argument('--dataset', type=str, default=None, help='The dataset name passed to the generation')
+    parser.add_argument('--batch-size', type=int, default=4)
+    parser.add_argument('--num-samples', type=int, default=11)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        if args.model is None:
+            model = load_tiny_qwen2_vl(build_tiny_qwen2_vl(osp.join(root, 'ckpt')))
+        else:
+            from vlmeval.config import supported_VLM
+            model = supported_VLM[args.model]()
+        if not model.support_batch_generate(args.dataset):
+            print(f'{type(model).__name__} does not support batch generation for dataset {args.dataset}')
+            return 1
+        messages = build_messages(root, args.num_samples)
+
+        st = time.time()
+        sequential = [model.generate(msg, dataset=args.dataset) for msg in messages]
+        mid = time.time()
+        batched = model.generate_batch(messages, dataset=args.dataset, batch_size=args.batch_size)
+        print(f'Sequential: {mid - st:.2f}s, batched (batch size {args.batch_size}): {time.time() - mid:.2f}s')
+
+    diff = [i for i, (a, b) in enumerate(zip(sequential, batched)) if a != b]
+    for i in diff:
+        print(f'Sample {i} differs:\n    sequential: {sequential[i]!r}\n    batched:    {batched[i]!r}')
+    print(f'{len(messages) - len(diff)} / {len(messages)} outputs are identical')
+    return 1 if len(diff) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
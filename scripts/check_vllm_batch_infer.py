@@ -0,0 +1,141 @@
+"""Check the chunked submission of samples to the vLLM engine (`BaseModel.generate_batch_vllm`) in `infer_data_job`,
+with a stub engine of the `LLM.generate` interface, so the check needs neither vLLM nor a GPU:
+
+    python scripts/check_vllm_batch_infer.py
+
+It checks that:
+    1. 23 samples are submitted in chunks of 10 / 10 / 3 with `INFER_VLLM_BATCH_SIZE=10`;
+    2. each prediction is saved under the index of its own sample, although the samples of a chunk are reordered by
+       length and the dataset indices are not contiguous;
+    3. the results of each chunk are on disk before the next chunk is submitted, and an interrupted run resumes
+       without submitting the finished samples again.
+"""
+import os
+import sys
+import tempfile
+import os.path as osp
+import pandas as pd
+
+NUM_SAMPLES = 23
+CHUNK_SIZE = 10
+
+
+class StubOutput:
+
+    def __init__(self, text):
+        self.outputs = [type('CompletionOutput', (), dict(text=text))()]
+
+
+class StubEngine:
+    """Answers each prompt with the reversed prompt, records the number of prompts of each call and the number of
+    finished samples on disk (in the result log of `infer_data`) at the time of the call."""
+
+    def __init__(self, log_file, fail_at=None):
+        self.log_file = log_file
+        self.fail_at = fail_at
+        self.calls = []
+        self.saved = []
+
+    def generate(self, prompts, sampling_params=None):
+        from vlmeval.smp import ResultLog
+        assert isinstance(sampling_params, list) and len(prompts) == len(sampling_params)
+        if len(self.calls) == self.fail_at:
+            raise KeyboardInterrupt('Interrupted by the check')
+        self.calls.append(len(prompts))
+        self.saved.append(len(ResultLog(self.log_file).load()))
+        return [StubOutput(p['prompt'][::-1] + '<|eot|>') for p in prompts]
+
+
+def build_model(engine):
+    from vlmeval.vlm.base import BaseModel
+
+    class StubVLLMModel(BaseModel):
+
+        use_vllm = True
+
+        def __init__(self, llm):
+            super().__init__()
+            self.llm = llm
+
+        def support_batch_generate(self, dataset=None):
+            return True
+
+        def vllm_request(self, message, dataset=None):
+            text = ' '.join(x['value'] for x in message if x['type'] == 'text')
+            return dict(prompt=text), dict(temperature=0.0, max_tokens=16)
+
+        def vllm_output(self, text, dataset=None):
+            return text.replace('<|eot|>', '')
+
+        def generate_inner(self, message, dataset=None):
+            return self.generate_batch_vllm([message], dataset=dataset)[0]
+
+        def generate_batch_inner(self, messages, dataset=None):
+            return self.generate_batch_vllm(messages, dataset=dataset)
+
+    return StubVLLMModel(engine)
+
+
+class StubDataset:
+
+    dataset_name = 'StubVLLM'
+
+    def __init__(self):
+        # Not contiguous and of various lengths, so that a wrong mapping of the outputs is detected
+        self.data = pd.DataFrame({
+            'index': [1000 + 7 * i for i in range(NUM_SAMPLES)],
+            'question': [f'question {i} ' + 'x' * ((i * 5) % 11) for i in range(NUM_SAMPLES)],
+        })
+
+    def __len__(self):
+        return len(self.data)
+
+    def build_prompt(self, line):
+        return [dict(type='text', value=line['question'])]
+
+    def dump_image(self, line):
+        return []
+
+
+def run(work_dir, fail_at=None):
+    from vlmeval.inference import infer_data_job
+    from vlmeval.smp import get_rank_and_world_size
+    _, world_size = get_rank_and_world_size()
+    dataset = StubDataset()
+    log_file = osp.join(work_dir, f'0{world_size}_{dataset.dataset_name}.records')
+    engine = StubEngine(log_file, fail_at=fail_at)
+    try:
+        infer_data_job(build_model(engine), work_dir, 'stub', dataset)
+    except KeyboardInterrupt:
+        pass
+    return engine, dataset
+
+
+def main():
+    os.environ['INFER_VLLM_BATCH_SIZE'] = str(CHUNK_SIZE)
+    from vlmeval.smp import find_pred_file, load
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        engine, dataset = run(work_dir)
+        assert engine.calls == [10, 10, 3], engine.calls
+        assert engine.saved == [0, 10, 20], engine.saved
+        pred = load(find_pred_file(work_dir, 'stub', dataset.dataset_name))
+        answers = {i: q[::-1] for i, q in zip(dataset.data['index'], dataset.data['question'])}
+        assert len(pred) == NUM_SAMPLES
+        assert all(answers[i] == p for i, p in zip(pred['index'], pred['prediction']))
+        print(f'Chunks {engine.calls}, the predictions map back to their indices')
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        engine, dataset = run(work_dir, fail_at=2)
+        assert engine.calls == [10, 10], engine.calls
+        assert find_pred_file(work_dir, 'stub', dataset.dataset_name) is None
+        engine, _ = run(work_dir)
+        assert engine.calls == [3], engine.calls
+        pred = load(find_pred_file(work_dir, 'stub', dataset.dataset_name))
+        assert len(pred) == NUM_SAMPLES
+        print(f'Resumed after 2 chunks, the remaining samples are submitted as {engine.calls}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -102,6 +102,7 @@ def do_setup():
         packages=find_packages(exclude=[
             'test*',
             'paper_test*',
+            'benchmarks*',
         ]),
         keywords=['AI', 'NLP', 'in-context learning'],
         entry_points={
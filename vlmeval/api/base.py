@@ -1,9 +1,13 @@
+import os
 import time
+import threading
 import random as rd
+from concurrent.futures import Future
 from abc import abstractmethod
 import os.path as osp
 import copy as cp
 from ..smp import get_logger, parse_file, concat_images_vlmeval, LMUDataRoot, md5, decode_base64_to_image_file
+from .metrics import http_status, parse_usage, image_bytes, append_record
 
 
 class BaseAPI:
@@ -11,6 +15,11 @@ class BaseAPI:
     allowed_types = ['text', 'image', 'video']
     INTERLEAVE = True
     INSTALL_REQ = False
+    # Results of the health probe, shared by all instances with the same endpoint: {key: (start_time, future)}
+    HEALTH_CACHE = {}
+    HEALTH_LOCK = threading.Lock()
+    # The telemetry of `generate` calls is appended to this file if set, see `set_metrics_file`
+    metrics_file = None
 
     def __init__(self,
                  retry=10,
@@ -59,25 +68,58 @@ class BaseAPI:
     def working(self):
         """If the API model is working, return True, else return False.
 
+        The probe runs once per endpoint, and a successful result is cached for `API_HEALTH_TTL` seconds
+        (default to 600).
+
         Returns:
             bool: If the API model is working, return True, else return False.
         """
-        self.old_timeout = None
-        if hasattr(self, 'timeout'):
-            self.old_timeout = self.timeout
-            self.timeout = 120
+        return self.check_health().result()
+
+    def check_health(self):
+        """Start the health probe in a background thread if there is no valid cached result.
+
+        Returns:
+            Future: The future of the probe result (bool).
+        """
+        key = (type(self).__name__, getattr(self, 'model', None), getattr(self, 'api_base', None))
+        ttl = float(os.environ.get('API_HEALTH_TTL', 600))
+        with self.HEALTH_LOCK:
+            cached = self.HEALTH_CACHE.get(key, None)
+            if cached is not None:
+                start, future = cached
+                failed = future.done() and (future.exception() is not None or not future.result())
+                if time.time() - start < ttl and not failed:
+                    return future
+            future = Future()
+
+            def probe():
+                try:
+                    future.set_result(self.probe())
+                except Exception as err:
+                    future.set_exception(err)
+
+            self.HEALTH_CACHE[key] = (time.time(), future)
+            threading.Thread(target=probe, daemon=True).start()
+            return future
+
+    def probe(self):
+        """Send a few 'hello' requests to check if the API model is working."""
+        # Probe with a copy (with its own mutable config), so that the longer timeout does not affect requests sent
+        # in the meantime
+        model = cp.copy(self)
+        for k, v in vars(self).items():
+            if isinstance(v, (dict, list, set)):
+                setattr(model, k, cp.copy(v))
+        if hasattr(model, 'timeout'):
+            model.timeout = 120
 
         retry = 5
         while retry > 0:
-            ret = self.generate('hello')
+            ret = model.generate('hello')
             if ret is not None and ret != '' and self.fail_msg not in ret:
-                if self.old_timeout is not None:
-                    self.timeout = self.old_timeout
                 return True
             retry -= 1
-
-        if self.old_timeout is not None:
-            self.timeout = self.old_timeout
         return False
 
     def check_content(self, msgs):
@@ -194,6 +236,20 @@ class BaseAPI:
 
         return self.fail_msg if answer in ['', None] else answer
 
+    def set_metrics_file(self, metrics_file):
+        """Record the telemetry of each `generate` call (one JSON line per call) to `metrics_file`, None to stop."""
+        self.metrics_file = metrics_file
+
+    def record_call(self, message, stats):
+        model = getattr(self, 'model', None)
+        stats['model'] = model if isinstance(model, str) else self.__class__.__name__
+        stats['end'] = time.time()
+        stats['image_bytes'] = image_bytes(message)
+        try:
+            append_record(self.metrics_file, stats)
+        except Exception as err:
+            self.logger.warning(f'Failed to record the API call metrics: {type(err)}: {err}')
+
     def preprocess_message_with_role(self, message):
         system_prompt = ''
         new_message = []
@@ -241,29 +297,42 @@ class BaseAPI:
         T = rd.random() * 0.5
         time.sleep(T)
 
-        for i in range(self.retry):
-            try:
-                ret_code, answer, log = self.generate_inner(message, **kwargs)
-                if ret_code == 0 and self.fail_msg not in answer and answer != '':
+        # Telemetry of the call: HTTP status of each attempt, token usage of the last response
+        stats = dict(
+            start=time.time(), attempts=0, status=[], success=False, prompt_tokens=None, completion_tokens=None)
+        try:
+            for i in range(self.retry):
+                stats['attempts'] += 1
+                try:
+                    ret_code, answer, log = self.generate_inner(message, **kwargs)
+                    if self.metrics_file is not None:
+                        stats['status'].append(http_status(ret_code, log))
+                        stats['prompt_tokens'], stats['completion_tokens'] = parse_usage(log)
+                    if ret_code == 0 and self.fail_msg not in answer and answer != '':
+                        if self.verbose:
+                            print(answer)
+                        stats['success'] = True
+                        return answer
+                    elif self.verbose:
+                        if not isinstance(log, str):
+                            try:
+                                log = log.text
+                            except Exception as e:
+                                self.logger.warning(f'Failed to parse {log} as an http response: {str(e)}. ')
+                        self.logger.info(f'RetCode: {ret_code}\nAnswer: {answer}\nLog: {log}')
+                except Exception as err:
+                    stats['status'].append(type(err).__name__)
                     if self.verbose:
-                        print(answer)
-                    return answer
-                elif self.verbose:
-                    if not isinstance(log, str):
-                        try:
-                            log = log.text
-                        except Exception as e:
-                            self.logger.warning(f'Failed to parse {log} as an http response: {str(e)}. ')
-                    self.logger.info(f'RetCode: {ret_code}\nAnswer: {answer}\nLog: {log}')
-            except Exception as err:
-                if self.verbose:
-                    self.logger.error(f'An error occured during try {i}: ')
-                    self.logger.error(f'{type(err)}: {err}')
-            # delay before each retry
-            T = rd.random() * self.wait * 2
-            time.sleep(T)
-
-        return self.fail_msg if answer in ['', None] else answer
+                        self.logger.error(f'An error occured during try {i}: ')
+                        self.logger.error(f'{type(err)}: {err}')
+                # delay before each retry
+                T = rd.random() * self.wait * 2
+                time.sleep(T)
+
+            return self.fail_msg if answer in ['', None] else answer
+        finally:
+            if self.metrics_file is not None:
+                self.record_call(message, stats)
 
     def message_to_promptimg(self, message, dataset=None):
         assert not self.INTERLEAVE
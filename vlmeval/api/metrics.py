@@ -0,0 +1,107 @@
+"""Per-call telemetry of the API models.
+
+When a metrics file is set (`BaseAPI.set_metrics_file`), each `BaseAPI.generate` call appends one JSON line with
+its start / end timestamps, the number of attempts, the HTTP status of each attempt, the token usage returned by
+the API (if any) and the number of image bytes sent. `summarize_api_metrics` aggregates a metrics file into
+latency percentiles, retry & rate-limit (429) rates and token throughput.
+"""
+import os
+import json
+import threading
+import numpy as np
+import pandas as pd
+
+_WRITE_LOCK = threading.Lock()
+
+# The token usage fields of the common API response formats (OpenAI, Anthropic, Gemini)
+USAGE_KEYS = [
+    ('usage', 'prompt_tokens', 'completion_tokens'),
+    ('usage', 'input_tokens', 'output_tokens'),
+    ('usageMetadata', 'promptTokenCount', 'candidatesTokenCount'),
+    ('usage_metadata', 'prompt_token_count', 'candidates_token_count'),
+]
+
+
+def http_status(ret_code, log):
+    """The HTTP status of an attempt, from the response returned by `generate_inner` (or its ret_code)."""
+    status = getattr(log, 'status_code', None)
+    if isinstance(status, int):
+        return status
+    return 200 if ret_code == 0 else ret_code
+
+
+def parse_usage(log):
+    """The (prompt tokens, completion tokens) reported in the response of an attempt, (None, None) if unknown."""
+    struct = log
+    if hasattr(log, 'json') and callable(log.json):
+        try:
+            struct = log.json()
+        except Exception:
+            return None, None
+    if not isinstance(struct, dict):
+        return None, None
+    for key, prompt_key, completion_key in USAGE_KEYS:
+        usage = struct.get(key)
+        if isinstance(usage, dict) and (prompt_key in usage or completion_key in usage):
+            return usage.get(prompt_key), usage.get(completion_key)
+    return None, None
+
+
+def image_bytes(message):
+    """The size of the image files in a (preprocessed) message."""
+    total = 0
+    for item in message:
+        if item['type'] == 'image' and os.path.exists(item['value']):
+            total += os.path.getsize(item['value'])
+    return total
+
+
+def append_record(metrics_file, record):
+    line = json.dumps(record) + '\n'
+    with _WRITE_LOCK:
+        with open(metrics_file, 'a') as fout:
+            fout.write(line)
+
+
+def load_api_metrics(metrics_file):
+    records = []
+    with open(metrics_file) as fin:
+        for line in fin:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                # A truncated last line of an interrupted run
+                continue
+    return pd.DataFrame(records)
+
+
+def summarize_api_metrics(metrics_file):
+    """Aggregate the records of a metrics file, one row per model (pd.DataFrame), None if there is no record."""
+    if not os.path.exists(metrics_file):
+        return None
+    df = load_api_metrics(metrics_file)
+    if len(df) == 0:
+        return None
+    rows = []
+    for model, sub in df.groupby('model'):
+        latency = sub['end'] - sub['start']
+        statuses = [s for lst in sub['status'] for s in lst]
+        completion_tokens = pd.to_numeric(sub['completion_tokens'], errors='coerce')
+        prompt_tokens = pd.to_numeric(sub['prompt_tokens'], errors='coerce')
+        with_usage = completion_tokens.notna()
+        rows.append({
+            'Model': model,
+            'Calls': len(sub),
+            'Success (%)': 100 * sub['success'].mean(),
+            'Latency p50 (s)': float(np.percentile(latency, 50)),
+            'Latency p95 (s)': float(np.percentile(latency, 95)),
+            'Attempts / Call': sub['attempts'].mean(),
+            'HTTP 429 (%)': 100 * np.mean([s == 429 for s in statuses]) if len(statuses) else 0.0,
+            'Prompt Tokens': int(prompt_tokens.sum()),
+            'Completion Tokens': int(completion_tokens.sum()),
+            'Completion Tokens / s': (
+                completion_tokens[with_usage].sum() / latency[with_usage].sum() if latency[with_usage].sum() > 0
+                else float('nan')),
+            'Image MB Sent': sub['image_bytes'].sum() / 2 ** 20,
+        })
+    return pd.DataFrame(rows)
@@ -1,6 +1,7 @@
 from huggingface_hub import snapshot_download
 from ...smp import *
 from ..video_base import VideoBaseDataset
+from ..utils.frame_extractor import decode_frames
 from ..utils import build_judge, DEBUG_MESSAGE, cgbench
 from .utils import *
 from ...utils import track_progress_rich
@@ -326,7 +327,7 @@ class CGAVCounting(VideoBaseDataset):
         lock_path = osp.splitext(vid_path)[0] + '.lock'
         with portalocker.Lock(lock_path, 'w', timeout=30):
             if not np.all([osp.exists(p) for p in frame_paths]):
-                images = [vid[i].asnumpy() for i in indices]
+                images = decode_frames(vid, indices)
                 for i, (img_array, path) in enumerate(zip(images, frame_paths)):
                     if osp.exists(path):
                         try:
@@ -359,10 +360,8 @@ class CGAVCounting(VideoBaseDataset):
 
     def evaluate(self, eval_file, **judge_kwargs):
 
-        assert eval_file.endswith(".xlsx"), "data file should be an xlsx file"
-
-        tgt_file = eval_file.replace(".xlsx", "_rating.json")
-        score_file = eval_file.replace(".xlsx", "_score.xlsx")
+        tgt_file = get_intermediate_file_path(eval_file, "_rating", "json")
+        score_file = get_intermediate_file_path(eval_file, "_score")
 
         data = load(eval_file)
 
@@ -1,6 +1,6 @@
 import json
 import time
-import Levenshtein
+from ..utils.string_distance import levenshtein_distance
 import evaluate
 import random
 import pdb
@@ -282,7 +282,7 @@ class call_Edit_dist():
             upper_len = max(len(pred), len(gt))
             sample['upper_len'] = upper_len
             if len(pred) > 0 or len(gt) > 0:
-                edit_dist = Levenshtein.distance(pred, gt)
+                edit_dist = levenshtein_distance(pred, gt)
                 if not sample.get('metric'):
                     sample['metric'] = {}
                 sample['metric']['Edit_dist'] = edit_dist / upper_len
@@ -422,7 +422,7 @@ class CustomConfig(Config):
     def normalized_distance(self, *sequences):
         """Get distance from 0 to 1
         """
-        return float(Levenshtein.distance(*sequences)) / self.maximum(*sequences)
+        return float(levenshtein_distance(*sequences)) / self.maximum(*sequences)
 
     def rename(self, node1, node2):
         """Compares attributes of trees"""
@@ -8,6 +8,7 @@ from tqdm import tqdm
 import torch.distributed as dist
 from ..image_base import ImageBaseDataset
 from ...smp import *
+from ...utils import eval_map
 
 
 class OmniDocBench(ImageBaseDataset):
@@ -202,8 +203,8 @@ class end2end_evaluator():
         pred = sum(read_order_pred, [])
         pred = [x for x in pred if x]
         if len(pred) > 0 or len(gt) > 0:
-            import Levenshtein
-            edit = Levenshtein.distance(gt, pred)/ max(len(pred), len(gt))
+            from ..utils.string_distance import levenshtein_distance
+            edit = levenshtein_distance(gt, pred)/ max(len(pred), len(gt))
             return {
                 'gt': gt,
                 'pred': pred,
@@ -229,10 +230,14 @@ class end2end_evaluator():
         order_match = []
 
 
-        for i,sample in enumerate(references):
-            img_name = os.path.basename(sample["page_info"]["image_path"])
-            pred_content = predictions[i]
-            result = self.process_get_matched_elements(sample, pred_content, img_name)
+        # Pages are matched independently, in the shared evaluation pool
+        tasks = [
+            (sample, predictions[i], os.path.basename(sample["page_info"]["image_path"]))
+            for i, sample in enumerate(references)
+        ]
+        results = eval_map(self.process_page, tasks)
+
+        for result in results:
             [plain_text_match_clean, formated_display_formula, latex_table_match_s, html_table_match_s, order_match_single] = result
 
             if order_match_single:
@@ -262,6 +267,16 @@ class end2end_evaluator():
 
         return matched_samples_all
 
+    def __getstate__(self):
+        # Only the matching config is needed by the pool workers, skip the references & predictions
+        state = self.__dict__.copy()
+        state.pop('references', None)
+        state.pop('predictions', None)
+        return state
+
+    def process_page(self, task):
+        return self.process_get_matched_elements(*task)
+
     def process_get_matched_elements(self, sample, pred_content, img_name):
         from .utils import match_gt2pred_simple, match_gt2pred_no_split, match_gt2pred_quick, md_tex_filter
         from func_timeout import FunctionTimedOut, func_timeout
@@ -299,8 +314,9 @@ class end2end_evaluator():
                 print(f'Time out for plain text match of {img_name}, match_gt2pred_simple will be used.')
                 plain_text_match_s = match_gt2pred_simple(gt_text_list, pred_dataset['text_all'], 'text', img_name)
             except Exception as e:
+                # Runs in a pool worker, re-raise so that the error is reported by the main process
                 print(str(e))
-                sys.exit()
+                raise
 
             if not plain_text_match_s:
                 print(f'No text match of {img_name}. The plain text match will be empty.')
@@ -434,7 +450,7 @@ class table_evalutor():
         from .data_preprocess import clean_string, normalized_formula, textblock2unicode, normalized_table
         samples=[]
         preds=[]
-        predictions=pd.read_excel(eval_file)['prediction'].tolist()
+        predictions=load(eval_file)['prediction'].tolist()
         gt_samples=pd.read_csv(gt_file,sep='\t')['answer'].tolist()
         load_success,load_fail=0,0
         for i,gt_sample in tqdm(enumerate(gt_samples),desc='Loading data'):
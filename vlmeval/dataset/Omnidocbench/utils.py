@@ -11,8 +11,8 @@ import json
 import copy
 import unicodedata
 
-import Levenshtein
 import numpy as np
+from ..utils.string_distance import levenshtein_distance, levenshtein_matrix, levenshtein_one_to_many
 from bs4 import BeautifulSoup
 from pylatexenc.latex2text import LatexNodes2Text
 from scipy.optimize import linear_sum_assignment
@@ -801,20 +801,8 @@ def get_pred_category_type(pred_idx, pred_items):
 
 
 def compute_edit_distance_matrix_new(gt_lines, matched_lines):
-    try:
-        distance_matrix = np.zeros((len(gt_lines), len(matched_lines)))
-        for i, gt_line in enumerate(gt_lines):
-            for j, matched_line in enumerate(matched_lines):
-                if len(gt_line) == 0 and len(matched_line) == 0:
-                    distance_matrix[i][j] = 0
-                else:
-                    distance_matrix[i][j] = Levenshtein.distance(gt_line, matched_line) / max(len(matched_line), len(gt_line))
-        return distance_matrix
-    except ZeroDivisionError:
-        #print("ZeroDivisionError occurred. Outputting norm_gt_lines and norm_pred_lines:")
-        # print("norm_gt_lines:", gt_lines)
-        # print("norm_pred_lines:", matched_lines)
-        raise
+    # Normalized edit distances between all gt & pred lines, computed by the batched (C++) kernel
+    return levenshtein_matrix(gt_lines, matched_lines, normalize=True)
 
 def get_gt_pred_lines(gt_items, pred_items, line_type):
     norm_html_lines = []
@@ -940,12 +928,12 @@ def match_gt2pred_simple(gt_items, pred_items, line_type, img_name):
     cost_matrix = compute_edit_distance_matrix_new(norm_gt_lines, norm_pred_lines)
 
     row_ind, col_ind = linear_sum_assignment(cost_matrix)
+    gt2pred = dict(zip(row_ind.tolist(), col_ind.tolist()))
 
 
     for gt_idx in range(len(norm_gt_lines)):
-        if gt_idx in row_ind:
-            row_i = list(row_ind).index(gt_idx)
-            pred_idx = int(col_ind[row_i])
+        if gt_idx in gt2pred:
+            pred_idx = gt2pred[gt_idx]
             pred_line = pred_lines[pred_idx]
             norm_pred_line = norm_pred_lines[pred_idx]
             edit = cost_matrix[gt_idx][pred_idx]
@@ -977,7 +965,8 @@ def match_gt2pred_simple(gt_items, pred_items, line_type, img_name):
         # print('-'*10)
         # [([0,1], 0),(2, 1), (1,2)] --> [0,2,1]/[0,1,2]
 
-    pred_idx_list = [pred_idx for pred_idx in range(len(norm_pred_lines)) if pred_idx not in col_ind] # get not matched preds
+    matched_pred_idx = set(col_ind.tolist())
+    pred_idx_list = [pred_idx for pred_idx in range(len(norm_pred_lines)) if pred_idx not in matched_pred_idx] # get not matched preds
     if pred_idx_list: # if there are still remaining pred_idx, concatenate all preds
         match_list.append({
             'gt_idx': [""],
@@ -1012,7 +1001,7 @@ def match_gt2pred_no_split(gt_items, pred_items, line_type, img_name):
     sorted_pred_lines = sorted(pred_line_with_position, key=lambda x: x[0])
     pred = '\n\n'.join([_[1] for _ in sorted_pred_lines])
     norm_pred = '\n\n'.join([_[2] for _ in sorted_pred_lines])
-    # edit = Levenshtein.distance(norm_gt, norm_pred)/max(len(norm_gt), len(norm_pred))
+    # edit = levenshtein_distance(norm_gt, norm_pred)/max(len(norm_gt), len(norm_pred))
     if norm_gt or norm_pred:
         return [{
                 'gt_idx': [0],
@@ -1034,15 +1023,12 @@ def match_gt2pred_no_split(gt_items, pred_items, line_type, img_name):
 
 
 from scipy.optimize import linear_sum_assignment
-# from rapidfuzz.distance import Levenshtein
-import Levenshtein
 from collections import defaultdict
 import copy
 import pdb
 import numpy as np
 import evaluate
 from collections import Counter
-from Levenshtein import distance as Levenshtein_distance
 
 
 def match_gt2pred_quick(gt_items, pred_items, line_type, img_name):
@@ -1090,7 +1076,7 @@ def match_gt2pred_quick(gt_items, pred_items, line_type, img_name):
             })
         return match_list
     elif len(norm_gt_lines) == 1 and len(norm_pred_lines) == 1:
-        edit_distance = Levenshtein_distance(norm_gt_lines[0], norm_pred_lines[0])
+        edit_distance = levenshtein_distance(norm_gt_lines[0], norm_pred_lines[0])
         normalized_edit_distance = edit_distance / max(len(norm_gt_lines[0]), len(norm_pred_lines[0]))
         return [{
             'gt_idx': [0],
@@ -1227,7 +1213,7 @@ def sub_pred_fuzzy_matching(gt, pred):
     if gt_len >= pred_len and pred_len > 0:
         for i in range(gt_len - pred_len + 1):
             sub = gt[i:i + pred_len]
-            dist = Levenshtein_distance(sub, pred)/pred_len
+            dist = levenshtein_distance(sub, pred)/pred_len
             if dist < min_d:
                 min_d = dist
                 pos = i
@@ -1247,7 +1233,7 @@ def sub_gt_fuzzy_matching(pred, gt):
     if pred_len >= gt_len and gt_len > 0:
         for i in range(pred_len - gt_len + 1):
             sub = pred[i:i + gt_len]
-            dist = Levenshtein.distance(sub, gt)  /gt_len
+            dist = levenshtein_distance(sub, gt)  /gt_len
             if dist < min_d:
                 min_d = dist
                 pos = i
@@ -1336,8 +1322,8 @@ def judge_pred_merge(gt_list, pred_list, threshold=0.6):
     cur_pred = ' '.join(pred_list[:-1])
     merged_pred = ' '.join(pred_list)
 
-    cur_dist = Levenshtein.distance(gt_list[0], cur_pred) / max(len(gt_list[0]), len(cur_pred))
-    merged_dist = Levenshtein.distance(gt_list[0], merged_pred) / max(len(gt_list[0]), len(merged_pred))
+    cur_dist = levenshtein_distance(gt_list[0], cur_pred) / max(len(gt_list[0]), len(cur_pred))
+    merged_dist = levenshtein_distance(gt_list[0], merged_pred) / max(len(gt_list[0]), len(merged_pred))
 
     if merged_dist > cur_dist:
         return False, False
@@ -1357,9 +1343,9 @@ def judge_pred_merge(gt_list, pred_list, threshold=0.6):
 
 def deal_with_truncated(cost_matrix, norm_gt_lines, norm_pred_lines):
     matched_first = np.argwhere(cost_matrix < 0.25)
-    masked_gt_idx = [i[0] for i in matched_first]
+    masked_gt_idx = set(matched_first[:, 0].tolist())
     unmasked_gt_idx = [i for i in range(cost_matrix.shape[0]) if i not in masked_gt_idx]
-    masked_pred_idx = [i[1] for i in matched_first]
+    masked_pred_idx = set(matched_first[:, 1].tolist())
     unmasked_pred_idx = [i for i in range(cost_matrix.shape[1]) if i not in masked_pred_idx]
 
     merges_gt_dict = {}
@@ -1368,7 +1354,7 @@ def deal_with_truncated(cost_matrix, norm_gt_lines, norm_pred_lines):
 
     for gt_idx in unmasked_gt_idx:
         check_merge_subset = []
-        merged_dist = []
+        matched_lines = []
 
         for pred_idx in unmasked_pred_idx:
             step = 1
@@ -1388,9 +1374,11 @@ def deal_with_truncated(cost_matrix, norm_gt_lines, norm_pred_lines):
                         break
 
             check_merge_subset.append(list(range(pred_idx, pred_idx + step)))
-            matched_line = ' '.join([norm_pred_lines[i] for i in range(pred_idx, pred_idx + step)])
-            dist = Levenshtein_distance(norm_gt_lines[gt_idx], matched_line) / max(len(matched_line), len(norm_gt_lines[gt_idx]))
-            merged_dist.append(dist)
+            matched_lines.append(' '.join(norm_pred_lines[pred_idx: pred_idx + step]))
+
+        # An empty pair gets 0, as in `compute_edit_distance_matrix_new` (it can not occur here: such a pair costs 0
+        # in `cost_matrix`, so both lines are masked)
+        merged_dist = levenshtein_one_to_many(norm_gt_lines[gt_idx], matched_lines, normalize=True).tolist()
 
         if not merged_dist:
             subset_certain = []
@@ -1564,7 +1552,7 @@ def recalculate_edit_distances(final_matches, gt_lens_dict, norm_gt_lines, norm_
             pred_content = norm_pred_lines[pred_key[0]] if isinstance(pred_key[0], int) else ''
 
             try:
-                edit_distance = Levenshtein_distance(merged_gt_content, pred_content)
+                edit_distance = levenshtein_distance(merged_gt_content, pred_content)
                 normalized_edit_distance = edit_distance / max(len(merged_gt_content), len(pred_content))
             except ZeroDivisionError:
                 normalized_edit_distance = 1
@@ -1575,7 +1563,7 @@ def recalculate_edit_distances(final_matches, gt_lens_dict, norm_gt_lines, norm_
             pred_content = ' '.join(norm_pred_lines[pred_idx] for pred_idx in pred_key if isinstance(pred_idx, int))
 
             try:
-                edit_distance = Levenshtein_distance(norm_gt_lines[gt_idx], pred_content)
+                edit_distance = levenshtein_distance(norm_gt_lines[gt_idx], pred_content)
                 normalized_edit_distance = edit_distance / max(len(norm_gt_lines[gt_idx]), len(pred_content))
             except ZeroDivisionError:
                 normalized_edit_distance = 1
@@ -1610,10 +1598,10 @@ def convert_final_matches(final_matches, norm_gt_lines, norm_pred_lines):
 
     if unmatched_pred_indices:
         if unmatched_gt_indices:
-            distance_matrix = [
-                [Levenshtein_distance(norm_gt_lines[gt_idx], norm_pred_lines[pred_idx]) for pred_idx in unmatched_pred_indices]
-                for gt_idx in unmatched_gt_indices
-            ]
+            distance_matrix = levenshtein_matrix(
+                [norm_gt_lines[gt_idx] for gt_idx in unmatched_gt_indices],
+                [norm_pred_lines[pred_idx] for pred_idx in unmatched_pred_indices]
+            )
 
             row_ind, col_ind = linear_sum_assignment(distance_matrix)
 
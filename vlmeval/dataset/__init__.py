@@ -110,8 +110,11 @@ class ConcatDataset(ImageBaseDataset):
         self.TYPE = TYPES[0]
         self.MODALITY = MODALITIES[0]
         data_all = []
+        # (sub-dataset, original index) -> row position in the sub-dataset, for constant-time lookup of rows
+        self.row_map = {}
         for dname in datasets:
             data = self.dataset_map[dname].data
+            self.row_map.update({(dname, idx): pos for pos, idx in enumerate(data['index'])})
             data['SUB_DATASET'] = [dname] * len(data)
             if 'image' in data:
                 data_new = localize_df(data, dname, nproc=16)
@@ -129,8 +132,8 @@ class ConcatDataset(ImageBaseDataset):
             line = self.data.iloc[line]
         idx = line['original_index']
         dname = line['SUB_DATASET']
-        org_data = self.dataset_map[dname].data
-        org_line = cp.deepcopy(org_data[org_data['index'] == idx]).iloc[0]
+        # `iloc` with a single position already returns a new Series, no need to copy
+        org_line = self.dataset_map[dname].data.iloc[self.row_map[(dname, idx)]]
         return self.dataset_map[dname].build_prompt(org_line)
 
     def dump_image(self, line):
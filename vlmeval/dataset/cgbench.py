@@ -1,6 +1,7 @@
 from huggingface_hub import snapshot_download
 from ..smp import *
 from .video_base import VideoBaseDataset
+from .utils.frame_extractor import decode_frames
 from .utils import build_judge, DEBUG_MESSAGE
 from .utils.cgbench import *
 from ..utils import track_progress_rich
@@ -90,6 +91,7 @@ class CGBench_MCQ_Grounding_Mini(VideoBaseDataset):
     def supported_datasets(cls):
         return ["CG-Bench_MCQ_Grounding_Mini"]
 
+    # One directory per question: a question refers to a single video, as expected by `save_frames`
     def clue_frame_paths(self, qid, num_frames=8):
         frame_root = osp.join(self.clue_frame_root, qid)
         os.makedirs(frame_root, exist_ok=True)
@@ -399,7 +401,7 @@ class CGBench_MCQ_Grounding_Mini(VideoBaseDataset):
         lock_path = osp.splitext(vid_path)[0] + '.lock'
         with portalocker.Lock(lock_path, 'w', timeout=30):
             if not np.all([osp.exists(p) for p in frame_paths]):
-                images = [vid[i].asnumpy() for i in indices]
+                images = decode_frames(vid, indices)
                 for i, (img_array, path) in enumerate(zip(images, frame_paths)):
                     if osp.exists(path):
                         try:
@@ -432,10 +434,8 @@ class CGBench_MCQ_Grounding_Mini(VideoBaseDataset):
 
     def evaluate(self, eval_file, **judge_kwargs):
 
-        assert eval_file.endswith(".xlsx"), "data file should be an xlsx file"
-
-        tgt_file = eval_file.replace(".xlsx", "_rating.json")
-        score_file = eval_file.replace(".xlsx", "_score.xlsx")
+        tgt_file = get_intermediate_file_path(eval_file, "_rating", "json")
+        score_file = get_intermediate_file_path(eval_file, "_score")
 
         data = load(eval_file)
 
@@ -669,6 +669,7 @@ class CGBench_OpenEnded_Mini(VideoBaseDataset):
 
         return message
 
+    # One directory per question: a question refers to a single video, as expected by `save_frames`
     def clue_frame_paths(self, qid, num_frames=8):
         frame_root = osp.join(self.clue_frame_root, qid)
         os.makedirs(frame_root, exist_ok=True)
@@ -725,7 +726,7 @@ class CGBench_OpenEnded_Mini(VideoBaseDataset):
         lock_path = osp.splitext(vid_path)[0] + '.lock'
         with portalocker.Lock(lock_path, 'w', timeout=30):
             if not np.all([osp.exists(p) for p in frame_paths]):
-                images = [vid[i].asnumpy() for i in indices]
+                images = decode_frames(vid, indices)
                 for i, (img_array, path) in enumerate(zip(images, frame_paths)):
                     if osp.exists(path):
                         try:
@@ -760,12 +761,10 @@ class CGBench_OpenEnded_Mini(VideoBaseDataset):
 
         from .utils.cgbench import get_dimention_rating_open_ended, post_process_open
 
-        assert eval_file.endswith(".xlsx"), "data file should be an xlsx file"
-
-        tgt_file = eval_file.replace(".xlsx", "_rating.json")
-        score_file = eval_file.replace(".xlsx", "_score.xlsx")
-        step_1_tmp_file = eval_file.replace(".xlsx", "_step_1.pkl")
-        step_2_tmp_file = eval_file.replace(".xlsx", "_step_2.pkl")
+        tgt_file = get_intermediate_file_path(eval_file, "_rating", "json")
+        score_file = get_intermediate_file_path(eval_file, "_score")
+        step_1_tmp_file = get_intermediate_file_path(eval_file, "_step_1", "pkl")
+        step_2_tmp_file = get_intermediate_file_path(eval_file, "_step_2", "pkl")
 
         data = load(eval_file)
 
@@ -967,6 +966,7 @@ class CGBench_MCQ_Grounding(VideoBaseDataset):
     def supported_datasets(cls):
         return ["CG-Bench_MCQ_Grounding"]
 
+    # One directory per question: a question refers to a single video, as expected by `save_frames`
     def clue_frame_paths(self, qid, num_frames=8):
         frame_root = osp.join(self.clue_frame_root, qid)
         os.makedirs(frame_root, exist_ok=True)
@@ -1281,7 +1281,7 @@ class CGBench_MCQ_Grounding(VideoBaseDataset):
         lock_path = osp.splitext(vid_path)[0] + '.lock'
         with portalocker.Lock(lock_path, 'w', timeout=30):
             if not np.all([osp.exists(p) for p in frame_paths]):
-                images = [vid[i].asnumpy() for i in indices]
+                images = decode_frames(vid, indices)
                 for i, (img_array, path) in enumerate(zip(images, frame_paths)):
                     if osp.exists(path):
                         try:
@@ -1314,10 +1314,8 @@ class CGBench_MCQ_Grounding(VideoBaseDataset):
 
     def evaluate(self, eval_file, **judge_kwargs):
 
-        assert eval_file.endswith(".xlsx"), "data file should be an xlsx file"
-
-        tgt_file = eval_file.replace(".xlsx", "_rating.json")
-        score_file = eval_file.replace(".xlsx", "_score.xlsx")
+        tgt_file = get_intermediate_file_path(eval_file, "_rating", "json")
+        score_file = get_intermediate_file_path(eval_file, "_score")
 
         data = load(eval_file)
 
@@ -1550,6 +1548,7 @@ class CGBench_OpenEnded(VideoBaseDataset):
 
         return message
 
+    # One directory per question: a question refers to a single video, as expected by `save_frames`
     def clue_frame_paths(self, qid, num_frames=8):
         frame_root = osp.join(self.clue_frame_root, qid)
         os.makedirs(frame_root, exist_ok=True)
@@ -1606,7 +1605,7 @@ class CGBench_OpenEnded(VideoBaseDataset):
         lock_path = osp.splitext(vid_path)[0] + '.lock'
         with portalocker.Lock(lock_path, 'w', timeout=30):
             if not np.all([osp.exists(p) for p in frame_paths]):
-                images = [vid[i].asnumpy() for i in indices]
+                images = decode_frames(vid, indices)
                 for i, (img_array, path) in enumerate(zip(images, frame_paths)):
                     if osp.exists(path):
                         try:
@@ -1641,12 +1640,10 @@ class CGBench_OpenEnded(VideoBaseDataset):
 
         from .utils.cgbench import get_dimention_rating_open_ended, post_process_open
 
-        assert eval_file.endswith(".xlsx"), "data file should be an xlsx file"
-
-        tgt_file = eval_file.replace(".xlsx", "_rating.json")
-        score_file = eval_file.replace(".xlsx", "_score.xlsx")
-        step_1_tmp_file = eval_file.replace(".xlsx", "_step_1.pkl")
-        step_2_tmp_file = eval_file.replace(".xlsx", "_step_2.pkl")
+        tgt_file = get_intermediate_file_path(eval_file, "_rating", "json")
+        score_file = get_intermediate_file_path(eval_file, "_score")
+        step_1_tmp_file = get_intermediate_file_path(eval_file, "_step_1", "pkl")
+        step_2_tmp_file = get_intermediate_file_path(eval_file, "_step_2", "pkl")
 
         data = load(eval_file)
 
@@ -26,6 +26,7 @@ from ..dataset.utils.chartmimic.evaluator.chart_type_evaluator import ChartTypeE
 from ..dataset.utils.chartmimic.evaluator.color_evaluator import ColorEvaluator
 from ..dataset.utils.chartmimic.evaluator.layout_evaluator import LayoutEvaluator
 from ..dataset.utils.chartmimic.mp_util import track_progress_rich_new
+from ..dataset.utils.chartmimic.executor import run_script
 
 # from ..dataset.utils.chartmimic.evaluator.legend_evaluator import LegendEvaluator
 # from ..dataset.utils.chartmimic.evaluator.grid_evaluator import GridEvaluator
@@ -252,15 +253,10 @@ def judge_one_item(item):
     # [Attention] run code with timeout, enhancement here
     # try generate pdf
     try:
-        subprocess.run(
-            ["python", output_py],
-            timeout=120,
-            capture_output=True,
-            text=True,
-        )
-        logger.info(f"Successfully ran {output_py}")
-    except subprocess.TimeoutExpired:
-        logger.info(f"Timeout: Script {output_py} ran too long.")
+        if run_script(output_py, timeout=120):
+            logger.info(f"Successfully ran {output_py}")
+        else:
+            logger.info(f"Failed or timeout when running {output_py}")
     except Exception as e:
         # maybe could directly return 0, zero_score_dict
         logger.info(f"Error when running {output_py}: {e}")
@@ -204,9 +204,9 @@ class CharXiv(ImageBaseDataset):
 
         # Define file paths
         suffix = eval_file.split(".")[-1]
-        result_file = eval_file.replace(f".{suffix}", f"_{judge_model_name}.xlsx")
+        result_file = file.get_intermediate_file_path(eval_file, f"_{judge_model_name}")
         temp_result_file = eval_file.replace(f".{suffix}", f"_{judge_model_name}.pkl")
-        score_file = result_file.replace(".xlsx", "_acc.csv")
+        score_file = file.get_intermediate_file_path(result_file, "_acc", "csv")
 
         # Return existing results if available
         if os.path.exists(result_file):
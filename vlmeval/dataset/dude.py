@@ -166,7 +166,7 @@ class DUDE(ImageBaseDataset):
         model = judge_kwargs['model']
 
         suffix = eval_file.split('.')[-1]
-        storage = eval_file.replace(f'.{suffix}', f'_{model}.xlsx')
+        storage = get_intermediate_file_path(eval_file, f'_{model}')
         tmp_file = eval_file.replace(f'.{suffix}', f'_{model}.pkl')
 
         if osp.exists(storage):
@@ -203,7 +203,7 @@ class DUDE(ImageBaseDataset):
             dump(data, storage)
 
         score = DUDE_acc(storage)
-        score_pth = storage.replace('.xlsx', '_score.csv')
+        score_pth = get_intermediate_file_path(storage, '_score', 'csv')
 
         dump(score, score_pth)
         logger.info(f'DUDE successfully finished evaluating {eval_file}, results saved in {score_pth}')
@@ -11,7 +11,7 @@ import argparse
 from .image_base import ImageBaseDataset
 from .utils import build_judge
 from ..utils import track_progress_rich
-from ..smp import load, dump, d2df, toliststr
+from ..smp import load, dump, d2df, toliststr, get_intermediate_file_path
 
 
 def preprocess(str1):
@@ -172,7 +172,7 @@ Example of expected JSON response format:
         model = build_judge(model=judge_name, **judge_kwargs)
         suffix = eval_file.split('.')[-1]
 
-        storage = eval_file.replace(f'.{suffix}', f'_{judge_name}.xlsx')  # noqa: F841
+        storage = get_intermediate_file_path(eval_file, f'_{judge_name}')  # noqa: F841
         score_file = eval_file.replace(f'.{suffix}', f'_{judge_name}_score.csv')  # noqa: F841
         tmp_file = eval_file.replace(f'.{suffix}', f'_{judge_name}.pkl')  # noqa: F841
         nproc = judge_kwargs.pop('nproc', 6)  # noqa: F841
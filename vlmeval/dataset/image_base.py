@@ -42,7 +42,8 @@ class ImageBaseDataset:
         self.dataset_name = dataset
         self.img_root = osp.join(ROOT, 'images', img_root_map(dataset))
 
-        data = self.load_data(dataset)
+        with timer('load_data'):
+            data = self.load_data(dataset)
         self.skip_noimg = skip_noimg
         if skip_noimg and 'image' in data:
             data = data[~pd.isna(data['image'])]
@@ -73,7 +74,8 @@ class ImageBaseDataset:
             data['index'] = [int(x) for x in data['index']]
 
         self.data = data
-        self.post_build(dataset)
+        with timer('post_build'):
+            self.post_build(dataset)
 
     def __len__(self):
         return len(self.data)
@@ -92,14 +94,15 @@ class ImageBaseDataset:
 
         self.data_path = data_path
         if osp.exists(data_path):
-            if file_md5 is None or md5(data_path) == file_md5:
+            if file_md5 is None or self._timed_md5(data_path) == file_md5:
                 pass
             else:
                 warnings.warn(f'The tsv file is in {data_root}, but the md5 does not match, will re-download')
-                download_file(url, data_path)
+                with timer('download'):
+                    download_file(url, data_path)
                 update_flag = True
         else:
-            if osp.exists(data_path_legacy) and (file_md5 is None or md5(data_path_legacy) == file_md5):
+            if osp.exists(data_path_legacy) and (file_md5 is None or self._timed_md5(data_path_legacy) == file_md5):
                 warnings.warn(
                     'Due to a modification in #1055, the local target file name has changed. '
                     f'We detected the tsv file with legacy name {data_path_legacy} exists and will do the rename. '
@@ -107,18 +110,30 @@ class ImageBaseDataset:
                 import shutil
                 shutil.move(data_path_legacy, data_path)
             else:
-                download_file(url, data_path)
+                with timer('download'):
+                    download_file(url, data_path)
                 update_flag = True
 
         if file_size(data_path, 'GB') > 1:
             local_path = data_path.replace('.tsv', '_local.tsv')
             if not osp.exists(local_path) or os.environ.get('FORCE_LOCAL', None) or update_flag:
                 from ..tools import LOCALIZE
-                LOCALIZE(data_path, local_path)
+                with timer('localize'):
+                    LOCALIZE(data_path, local_path)
             data_path = local_path
-        return load(data_path)
+        with timer('load_tsv'):
+            return load(data_path)
+
+    @staticmethod
+    def _timed_md5(path):
+        with timer('md5'):
+            return md5(path)
 
     def dump_image(self, line):
+        with timer('dump_image'):
+            return self._dump_image(line)
+
+    def _dump_image(self, line):
         os.makedirs(self.img_root, exist_ok=True)
 
         if 'image' in line:
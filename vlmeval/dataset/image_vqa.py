@@ -8,7 +8,7 @@ import pandas as pd
 from .image_base import ImageBaseDataset
 from .utils import build_judge, DEBUG_MESSAGE
 from ..smp import *
-from ..utils import track_progress_rich
+from ..utils import track_progress_rich, eval_map
 
 
 class ImageVQADataset(ImageBaseDataset):
@@ -63,31 +63,28 @@ class ImageVQADataset(ImageBaseDataset):
         assert 'answer' in data and 'prediction' in data
         data['prediction'] = [str(x) for x in data['prediction']]
         data['answer'] = [str(x) for x in data['answer']]
-        lt = len(data)
-        pool = mp.Pool(16)
-        lines = [data.iloc[i] for i in range(lt)]
+        # Only send the fields required for scoring to the (shared) evaluation pool
+        lines = [dict(answer=a, prediction=p) for a, p in zip(data['answer'], data['prediction'])]
         if listinstr(['TextVQA'], dataset):
-            res = pool.map(partial(process_line, method='vqa_score'), lines)
+            res = eval_map(partial(process_line, method='vqa_score'), lines)
         elif listinstr(['ChartQA'], dataset):
-            res = pool.map(partial(process_line, method='relaxed_accuracy'),
-                           lines)
+            res = eval_map(partial(process_line, method='relaxed_accuracy'), lines)
         elif listinstr(['OCRVQA', 'GQA'], dataset):
-            res = pool.map(partial(process_line, method='accuracy'), lines)
+            res = eval_map(partial(process_line, method='accuracy'), lines)
         elif listinstr(['DocVQA', 'InfoVQA'], dataset):
-            res = pool.map(partial(process_line, method='anls'), lines)
+            res = eval_map(partial(process_line, method='anls'), lines)
         else:  # default using vqa_score to calculate score
-            res = pool.map(process_line, lines)
+            res = eval_map(process_line, lines)
         hit = hit_calculate(res, dataset)
         ret = dict()
         if 'split' in data:
             splits = set(data['split'])
             for sp in splits:
-                sub = [r for l, r in zip(lines, res) if l['split'] == sp]
+                sub = [r for s, r in zip(data['split'], res) if s == sp]
                 # [np.mean(x['match']) >= full_score_weight for x in sub]
                 hit = hit_calculate(sub, dataset)
                 ret[sp] = np.mean(hit) * 100
-            sub = [r for l, r in zip(lines, res)]
-            hit = hit_calculate(sub, dataset)
+            hit = hit_calculate(res, dataset)
             ret['Overall'] = np.mean(hit) * 100
         else:
             ret['Overall'] = np.mean(hit) * 100
@@ -95,7 +92,7 @@ class ImageVQADataset(ImageBaseDataset):
                 cates = list(set(data['category']))
                 cates.sort()
                 for c in cates:
-                    sub = [r for l, r in zip(lines, res) if l['category'] == c]
+                    sub = [r for x, r in zip(data['category'], res) if x == c]
                     # [np.mean(x['match']) >= full_score_weight for x in sub]
                     hit = hit_calculate(sub, dataset)
                     ret[c] = np.mean(hit) * 100
@@ -128,10 +125,8 @@ class VizWiz(ImageBaseDataset):
             data['prediction'] = [str(x) for x in data['prediction']]
             data['answer'] = [str(x) for x in data['answers']]
 
-            lt = len(data)
-            pool = mp.Pool(16)
-            lines = [data.iloc[i] for i in range(lt)]
-            res = pool.map(process_line, lines)
+            lines = [dict(answer=a, prediction=p) for a, p in zip(data['answer'], data['prediction'])]
+            res = eval_map(process_line, lines)
 
             hit = hit_calculate(res, 'VizWiz')
             ret = dict()
@@ -217,7 +212,7 @@ class OCRBench(ImageBaseDataset):
              + final_score_dict['Handwritten Mathematical Expression Recognition'])
         final_score_dict['Final Score Norm'] = (
             float(final_score_dict['Final Score']) / 10)
-        score_pth = eval_file.replace('.xlsx', '_score.json')
+        score_pth = get_intermediate_file_path(eval_file, '_score', 'json')
         dump(final_score_dict, score_pth)
         return final_score_dict
 
@@ -233,11 +228,12 @@ class MathVista(ImageBaseDataset):
     # It returns a DataFrame
     @classmethod
     def evaluate(self, eval_file, **judge_kwargs):
-        from .utils.mathvista import MathVista_auxeval, MathVista_acc
+        from .utils.mathvista import MathVista_auxeval, MathVista_auxeval_batch, MathVista_acc
+        from .utils.judge_util import get_judge_batch_size
 
         model = judge_kwargs['model']
         suffix = eval_file.split('.')[-1]
-        storage = eval_file.replace(f'.{suffix}', f'_{model}.xlsx')
+        storage = get_intermediate_file_path(eval_file, f'_{model}')
         tmp_file = eval_file.replace(f'.{suffix}', f'_{model}.pkl')
         nproc = judge_kwargs.pop('nproc', 4)
 
@@ -256,9 +252,16 @@ class MathVista(ImageBaseDataset):
             tups = [x for x, i in zip(tups, indices) if i not in ans]
             indices = [i for i in indices if i not in ans]
 
+            func, batch_size = MathVista_auxeval, get_judge_batch_size()
+            if batch_size > 1:
+                # Pack multiple items into a single judge request
+                func = MathVista_auxeval_batch
+                tups = [(model, [x[1] for x in tups[i: i + batch_size]]) for i in range(0, len(tups), batch_size)]
+                indices = [tuple(indices[i: i + batch_size]) for i in range(0, len(indices), batch_size)]
+
             if len(indices):
                 new_results = track_progress_rich(
-                    MathVista_auxeval,
+                    func,
                     tups,
                     nproc=nproc,
                     chunksize=nproc,
@@ -266,6 +269,9 @@ class MathVista(ImageBaseDataset):
                     save=tmp_file,
                 )
                 ans = load(tmp_file)
+                if batch_size > 1:
+                    indices = sum([list(x) for x in indices], [])
+                    new_results = sum(new_results, [])
                 for k, v in zip(indices, new_results):
                     assert k in ans
                     assert ans[k]['log'] == v['log'] and ans[k]['res'] == v[
@@ -276,7 +282,7 @@ class MathVista(ImageBaseDataset):
             dump(data, storage)
 
         score = MathVista_acc(storage)
-        score_pth = storage.replace('.xlsx', '_score.csv')
+        score_pth = get_intermediate_file_path(storage, '_score', 'csv')
         dump(score, score_pth)
         return score
 
@@ -338,9 +344,9 @@ class MathVerse(ImageBaseDataset):
 
         model = judge_kwargs['model']
         suffix = eval_file.split('.')[-1]
-        storage_extract = eval_file.replace(f'.{suffix}', f'_{model}_extract.xlsx')
+        storage_extract = get_intermediate_file_path(eval_file, f'_{model}_extract')
         tmp_file_extract = eval_file.replace(f'.{suffix}', f'_{model}_extract.pkl')
-        storage_score = eval_file.replace(f'.{suffix}', f'_{model}_score.xlsx')
+        storage_score = get_intermediate_file_path(eval_file, f'_{model}_score')
         tmp_file_score = eval_file.replace(f'.{suffix}', f'_{model}_score.pkl')
         nproc = judge_kwargs.pop('nproc', 4)
         # stage1: extract the answer
@@ -418,7 +424,7 @@ class MathVerse(ImageBaseDataset):
             dump(data, storage_score)
 
         score = MathVerse_acc(storage_score)
-        score_pth = storage_score.replace('.xlsx', '.csv')
+        score_pth = get_intermediate_file_path(storage_score, '', 'csv')
         dump(score, score_pth)
         return score
 
@@ -446,7 +452,7 @@ class MathVision(ImageBaseDataset):
         else:
             model = os.path.basename(os.environ.get('LOCAL_LLM'))
         suffix = eval_file.split('.')[-1]
-        storage = eval_file.replace(f'.{suffix}', f'_{model}.xlsx')
+        storage = get_intermediate_file_path(eval_file, f'_{model}')
         tmp_file = eval_file.replace(f'.{suffix}', f'_{model}.pkl')
         nproc = judge_kwargs.pop('nproc', 4)
 
@@ -485,7 +491,7 @@ class MathVision(ImageBaseDataset):
             dump(data, storage)
 
         score = MATH_V_acc(storage)
-        score_pth = storage.replace('.xlsx', '_score.csv')
+        score_pth = get_intermediate_file_path(storage, '_score', 'csv')
         dump(score, score_pth)
         return score
 
@@ -586,7 +592,7 @@ class Physics_yale(ImageBaseDataset):
         else:
             model = judge_kwargs.setdefault('model', 'gpt-4o-mini')
         suffix = eval_file.split('.')[-1]
-        storage = eval_file.replace(f'.{suffix}', f'_{model}.xlsx')
+        storage = get_intermediate_file_path(eval_file, f'_{model}')
         tmp_file = eval_file.replace(f'.{suffix}', f'_{model}.pkl')
         nproc = judge_kwargs.pop('nproc', 4)
 
@@ -627,7 +633,7 @@ class Physics_yale(ImageBaseDataset):
             dump(data, storage)
 
         score = PHYSIC_acc(storage)
-        score_pth = storage.replace('.xlsx', '_score.csv')
+        score_pth = get_intermediate_file_path(storage, '_score', 'csv')
         dump(score, score_pth)
         return score
 
@@ -752,8 +758,7 @@ class OlympiadBench(ImageBaseDataset):
         suffix = eval_file.split('.')[-1]
         name_str1 = 'judge'
         name_str2 = 'score'
-        result_file = eval_file.replace(f'.{suffix}',
-                                        f'_{name_str1}_result.xlsx')
+        result_file = get_intermediate_file_path(eval_file, f'_{name_str1}_result')
         score_file = eval_file.replace(f'.{suffix}',
                                        f'_{name_str2}_result.csv')
 
@@ -936,7 +941,7 @@ class SeePhys(ImageBaseDataset):
 
         model = judge_kwargs.pop('model', 'deepseek')
         suffix = eval_file.split('.')[-1]
-        storage = eval_file.replace(f'.{suffix}', f'_{model}.xlsx')
+        storage = get_intermediate_file_path(eval_file, f'_{model}')
         tmp_file = eval_file.replace(f'.{suffix}', f'_{model}.pkl')
         nproc = judge_kwargs.pop('nproc', 4)
         if not osp.exists(storage):
@@ -975,7 +980,7 @@ class SeePhys(ImageBaseDataset):
             dump(data, storage)
 
         score = eval_acc(storage)
-        score_pth = storage.replace('.xlsx', '_score.json')
+        score_pth = get_intermediate_file_path(storage, '_score', 'json')
         dump(score, score_pth)
         return score
 
@@ -1020,7 +1025,7 @@ class LogicVista(ImageBaseDataset):
             model = None
 
         suffix = eval_file.split('.')[-1]
-        storage = eval_file.replace(f'.{suffix}', f'_{name_str}.xlsx')
+        storage = get_intermediate_file_path(eval_file, f'_{name_str}')
         tmp_file = eval_file.replace(f'.{suffix}', f'_{name_str}.pkl')
         nproc = judge_kwargs.pop('nproc', 4)
 
@@ -1061,7 +1066,7 @@ class LogicVista(ImageBaseDataset):
             dump(data, storage)
         if osp.exists(storage):
             accuracy_scores = evaluate_logicvista(storage)
-            score_pth = storage.replace('.xlsx', '_score.csv')
+            score_pth = get_intermediate_file_path(storage, '_score', 'csv')
             dump(accuracy_scores, score_pth)
 
             return accuracy_scores
@@ -1311,7 +1316,7 @@ class MMVet(ImageBaseDataset):
 
         suffix = eval_file.split('.')[-1]
         model = judge_kwargs['model']
-        storage = eval_file.replace(f'.{suffix}', f'_{model}.xlsx')
+        storage = get_intermediate_file_path(eval_file, f'_{model}')
         tmp_file = eval_file.replace(f'.{suffix}', f'_{model}.pkl')
         nproc = judge_kwargs.pop('nproc', 4)
         if not osp.exists(storage):
@@ -1347,8 +1352,8 @@ class MMVet(ImageBaseDataset):
             dump(data, storage)
 
         score, score_fine = MMVet_acc(storage)
-        score_pth = storage.replace('.xlsx', '_score.csv')
-        score_fine_pth = storage.replace('.xlsx', '_score_fine.csv')
+        score_pth = get_intermediate_file_path(storage, '_score', 'csv')
+        score_fine_pth = get_intermediate_file_path(storage, '_score_fine', 'csv')
         dump(score, score_pth)
         dump(score_fine, score_fine_pth)
         return score
@@ -1445,11 +1450,10 @@ class WildDocBenchmark(ImageBaseDataset):
         assert 'answer' in data and 'prediction' in data
         data['prediction'] = [str(x) for x in data['prediction']]
         data['answer'] = [str(x) for x in data['answer']]
-        lt = len(data)
-        pool = mp.Pool(16)
-        lines = [data.iloc[i] for i in range(lt)]
-        DocVQA_res = pool.map(partial(process_line_WildDoc, method='anls'),
-                              lines)
+        lines = [
+            dict(index=i, answer=a, prediction=p) for i, a, p in zip(data['index'], data['answer'], data['prediction'])
+        ]
+        DocVQA_res = eval_map(partial(process_line_WildDoc, method='anls'), lines)
         hit = hit_calculate(DocVQA_res, "DocVQA")
         DocVQA_overall = np.mean(hit) * 100
         DocVQA_consistency_score = calculate_consistency_WildDoc(DocVQA_res)
@@ -1459,11 +1463,10 @@ class WildDocBenchmark(ImageBaseDataset):
         assert 'answer' in data and 'prediction' in data
         data['prediction'] = [str(x) for x in data['prediction']]
         data['answer'] = [str(x) for x in data['answer']]
-        lt = len(data)
-        pool = mp.Pool(16)
-        lines = [data.iloc[i] for i in range(lt)]
-        ChartQA_res = pool.map(
-            partial(process_line_WildDoc, method='relaxed_accuracy'), lines)
+        lines = [
+            dict(index=i, answer=a, prediction=p) for i, a, p in zip(data['index'], data['answer'], data['prediction'])
+        ]
+        ChartQA_res = eval_map(partial(process_line_WildDoc, method='relaxed_accuracy'), lines)
         hit = hit_calculate(ChartQA_res, "ChartQA")
         ChartQA_overall = np.mean(hit) * 100
         ChartQA_consistency_score = calculate_consistency_WildDoc(ChartQA_res)
@@ -1745,7 +1748,7 @@ class CRPE(ImageBaseDataset):
             else:
                 final_score_dict[category] = None
 
-        score_pth = eval_file.replace('.xlsx', '_score.json')
+        score_pth = get_intermediate_file_path(eval_file, '_score', 'json')
         dump(final_score_dict, score_pth)
         return final_score_dict
 
@@ -1912,7 +1915,7 @@ class QSpatial(ImageBaseDataset):
             # extract using model
             model = judge_kwargs['model']
             suffix = eval_file.split('.')[-1]
-            storage = eval_file.replace(f'.{suffix}', f'_{model}.xlsx')
+            storage = get_intermediate_file_path(eval_file, f'_{model}')
             tmp_file = eval_file.replace(f'.{suffix}', f'_{model}.pkl')
             nproc = judge_kwargs.pop('nproc', 4)
 
@@ -2009,7 +2012,7 @@ class QSpatial(ImageBaseDataset):
                 delta_1_point_5_per_question_type
             })
 
-        score_pth = eval_file.replace('.xlsx', '_score.json')
+        score_pth = get_intermediate_file_path(eval_file, '_score', 'json')
         dump(final_score_dict, score_pth)
         return final_score_dict
 
@@ -2133,7 +2136,7 @@ class MMNIAH(ImageBaseDataset):
             else:
                 final_score_dict[category] = None
 
-        score_pth = eval_file.replace('.xlsx', '_score.json')
+        score_pth = get_intermediate_file_path(eval_file, '_score', 'json')
         dump(final_score_dict, score_pth)
         return final_score_dict
 
@@ -2218,12 +2221,9 @@ class MMSci_Captioning(ImageBaseDataset):
         from .utils.mmsci import (get_all_metrics_for_g_eval_score,
                                   get_all_metrics_for_reference_based_metrics,
                                   merge_rating, fact_score_generate)
-        refer_based_metrics_output_file = eval_file.replace(
-            '.xlsx', '_reference_based_metrics.xlsx')
-        g_eval_metrics_output_file = eval_file.replace('.xlsx',
-                                                       '_g_eval_metrics.xlsx')
-        fact_score_metrics_output_file = eval_file.replace(
-            '.xlsx', '_fact_score.xlsx')
+        refer_based_metrics_output_file = get_intermediate_file_path(eval_file, '_reference_based_metrics')
+        g_eval_metrics_output_file = get_intermediate_file_path(eval_file, '_g_eval_metrics')
+        fact_score_metrics_output_file = get_intermediate_file_path(eval_file, '_fact_score')
 
         # calculate reference-based metrics
         if not osp.exists(refer_based_metrics_output_file):
@@ -2248,8 +2248,7 @@ class MMSci_Captioning(ImageBaseDataset):
             if isinstance(references[0], str):
                 references = [[r] for r in references]
 
-            reference_based_metrics_file = eval_file.replace(
-                '.xlsx', '_reference_based_metrics.pkl')
+            reference_based_metrics_file = get_intermediate_file_path(eval_file, '_reference_based_metrics', 'pkl')
             existing_data = get_all_metrics_for_reference_based_metrics(
                 references, candidates, image_id_list,
                 reference_based_metrics_file)
@@ -2322,7 +2321,7 @@ class MMSci_Captioning(ImageBaseDataset):
         rating = merge_rating(refer_based_metrics_output_file,
                               g_eval_metrics_output_file,
                               fact_score_metrics_output_file)
-        dump(rating, eval_file.replace('.xlsx', '_final_rating.xlsx'))
+        dump(rating, get_intermediate_file_path(eval_file, '_final_rating'))
         return rating
 
 
@@ -2335,7 +2334,7 @@ class BMMR(ImageBaseDataset):
 
     def evaluate(self, eval_file, **judge_kwargs):
         from .utils.bmmr import get_acc_for_reference_based_metrics, merge_rating
-        refer_based_metrics_output_file = eval_file.replace('.xlsx', '_reference_based_metrics.xlsx')
+        refer_based_metrics_output_file = get_intermediate_file_path(eval_file, '_reference_based_metrics')
         if not osp.exists(refer_based_metrics_output_file):
             data = load(eval_file)
             old_candidates = {}
@@ -2361,7 +2360,7 @@ class BMMR(ImageBaseDataset):
             if isinstance(references[0], str):
                 references = [[r] for r in references]
 
-            reference_based_metrics_file = eval_file.replace('.xlsx', '_reference_based_metrics.pkl')
+            reference_based_metrics_file = get_intermediate_file_path(eval_file, '_reference_based_metrics', 'pkl')
             assert len(references) == len(candidates) == len(image_id_list) == len(task_type_list)
             existing_data = get_acc_for_reference_based_metrics(
                 references, candidates, image_id_list, task_type_list, reference_based_metrics_file
@@ -2374,7 +2373,7 @@ class BMMR(ImageBaseDataset):
         rating = merge_rating(
             refer_based_metrics_output_file,
         )
-        dump(rating, eval_file.replace('.xlsx', '_final_rating.xlsx'))
+        dump(rating, get_intermediate_file_path(eval_file, '_final_rating'))
         return rating
 
     def build_prompt(self, line):
@@ -2440,8 +2439,8 @@ class TDBenchGrounding(ImageVQADataset):
 
         data['hit'] = scores
         data['category'] = 'visual_grounding'
-        result_file = eval_file.replace(f'.{suffix}', f'_{method}_result.xlsx')
-        data.to_excel(result_file, index=False)
+        result_file = get_intermediate_file_path(eval_file, f'_{method}_result')
+        dump(data, result_file)
 
         metric_name = 'Average Centroid Containment' if method == 'centroid' else 'Average IoU'
         summary_scores = {metric_name: avg_score, 'Total Samples': len(scores)}
@@ -2574,7 +2573,7 @@ class OCR_Reasoning(ImageBaseDataset):
 
         model = judge_kwargs['model']
         suffix = eval_file.split('.')[-1]
-        storage = eval_file.replace(f'.{suffix}', f'_{model}.xlsx')
+        storage = get_intermediate_file_path(eval_file, f'_{model}')
         tmp_file = eval_file.replace(f'.{suffix}', f'_{model}.pkl')
         nproc = judge_kwargs.pop('nproc', 4)
         nproc = 1
@@ -2615,7 +2614,7 @@ class OCR_Reasoning(ImageBaseDataset):
             ]
             dump(data, storage)
         score = OcrR_acc(storage)
-        score_pth = storage.replace('.xlsx', '_score.csv')
+        score_pth = get_intermediate_file_path(storage, '_score', 'csv')
         dump(score, score_pth)
         return score
 
@@ -2713,9 +2712,9 @@ class PhyX(ImageBaseDataset):
                 res = pool.map(partial(PhyX_process_line), lines)
 
             suffix = eval_file.split('.')[-1]
-            result_file = eval_file.replace(f'.{suffix}', '_predict.xlsx')
+            result_file = get_intermediate_file_path(eval_file, '_predict')
             df = pd.DataFrame(res)
-            df.to_excel(result_file, index=False)
+            dump(df, result_file)
 
             hit = [x['match'] for x in res]
             ret = dict()
@@ -2741,7 +2740,7 @@ class PhyX(ImageBaseDataset):
 
             model = judge_kwargs['model']
             suffix = eval_file.split('.')[-1]
-            storage = eval_file.replace(f'.{suffix}', f'_{model}.xlsx')
+            storage = get_intermediate_file_path(eval_file, f'_{model}')
             tmp_file = eval_file.replace(f'.{suffix}', f'_{model}.pkl')
             nproc = judge_kwargs.pop('nproc', 4)
 
@@ -2795,7 +2794,7 @@ class PhyX(ImageBaseDataset):
                 dump(data, storage)
 
             score = PhyX_acc(storage)
-            score_pth = storage.replace('.xlsx', '_score.csv')
+            score_pth = get_intermediate_file_path(storage, '_score', 'csv')
             dump(score, score_pth)
             return score
 
@@ -2887,7 +2886,7 @@ class MMEReasoning(ImageBaseDataset):
 
         model = judge_kwargs.get('model', 'gpt-4o-mini')
         suffix = eval_file.split('.')[-1]
-        storage_extract = eval_file.replace(f'.{suffix}', f'_{model}_extract.xlsx')
+        storage_extract = get_intermediate_file_path(eval_file, f'_{model}_extract')
         tmp_file_extract = eval_file.replace(f'.{suffix}', f'_{model}_extract.pkl')
         nproc = judge_kwargs.pop('nproc', 4)
 
@@ -2936,7 +2935,7 @@ class MMEReasoning(ImageBaseDataset):
             data['log'] = log_list
             dump(data, storage_extract)
 
-        storage_score = eval_file.replace(f'.{suffix}', f'_{model}_score.xlsx')
+        storage_score = get_intermediate_file_path(eval_file, f'_{model}_score')
         tmp_file_score = eval_file.replace(f'.{suffix}', f'_{model}_score.pkl')
 
         # stage 2: evaluate score
@@ -3047,7 +3046,7 @@ class MMEReasoning(ImageBaseDataset):
             dump(data, storage_score)
 
         score = MMEReasoning_acc(storage_score)
-        score_pth = storage_score.replace('.xlsx', '.csv')
+        score_pth = get_intermediate_file_path(storage_score, '', 'csv')
         dump(score, score_pth)
         return score
 
@@ -3108,13 +3107,12 @@ class MMVMBench(ImageBaseDataset):
 
     @classmethod
     def evaluate(self, eval_file, **judge_kwargs):
-        assert eval_file.endswith('.xlsx'), 'data file should be an xlsx file'
         judge = judge_kwargs['model']
         nproc = judge_kwargs.pop('nproc', 4)
 
-        tmp_file = eval_file.replace('.xlsx', f'_{judge}_tmp.pkl')
-        score_file = eval_file.replace('.xlsx', f'_{judge}_score.xlsx')
-        acc_file = eval_file.replace('.xlsx', f'_{judge}_acc.xlsx')
+        tmp_file = get_intermediate_file_path(eval_file, f'_{judge}_tmp', 'pkl')
+        score_file = get_intermediate_file_path(eval_file, f'_{judge}_score')
+        acc_file = get_intermediate_file_path(eval_file, f'_{judge}_acc')
 
         judge_kwargs['temperature'] = 0.0
         model = build_judge(**judge_kwargs)
@@ -3225,6 +3223,6 @@ class OCRBench_v2(ImageBaseDataset):
         final_score_dict = {**en_scores, **cn_scores}
         final_score_dict["English Overall Score"] = score_en_overall
         final_score_dict["Chinese Overall Score"] = score_cn_overall
-        score_pth = eval_file.replace('.xlsx', '_score.json')
+        score_pth = get_intermediate_file_path(eval_file, '_score', 'json')
         dump(final_score_dict, score_pth)
         return final_score_dict
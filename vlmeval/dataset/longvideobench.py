@@ -1,6 +1,7 @@
 from huggingface_hub import snapshot_download
 from ..smp import *
 from .video_base import VideoBaseDataset
+from .utils.frame_extractor import save_frames
 from .utils import build_judge, DEBUG_MESSAGE
 from glob import glob
 import os
@@ -225,11 +226,8 @@ class LongVideoBench(VideoBaseDataset):
             lock_path = osp.splitext(vid_path)[0] + '.lock'
             with portalocker.Lock(lock_path, 'w', timeout=30):
                 if not np.all([osp.exists(p) for p in frame_paths]):
-                    images = [vid[i].asnumpy() for i in indices]
-                    images = [Image.fromarray(arr) for arr in images]
-                    for im, pth in zip(images, frame_paths):
-                        if not osp.exists(pth) and not video_llm:
-                            im.save(pth)
+                    if not video_llm:
+                        save_frames(vid, indices, frame_paths)
 
         return frame_paths, indices, video_info
 
@@ -278,11 +276,9 @@ class LongVideoBench(VideoBaseDataset):
     def evaluate(self, eval_file, **judge_kwargs):
         from .utils.longvideobench import get_dimension_rating, extract_characters_regex, extract_option
 
-        assert eval_file.endswith('.xlsx'), 'data file should be an xlsx file'
-
-        tmp_file = eval_file.replace('.xlsx', '_tmp.pkl')
-        tgt_file = eval_file.replace('.xlsx', '_rating.json')
-        score_file = eval_file.replace('.xlsx', '_score.xlsx')
+        tmp_file = get_intermediate_file_path(eval_file, '_tmp', 'pkl')
+        tgt_file = get_intermediate_file_path(eval_file, '_rating', 'json')
+        score_file = get_intermediate_file_path(eval_file, '_score')
 
         if not osp.exists(score_file):
             model = judge_kwargs.get('model', 'exact_matching')
@@ -395,7 +395,6 @@ class MEGABench(VideoBaseDataset):
         return message
 
     def evaluate(self, eval_file, **judge_kwargs):
-        assert eval_file.endswith('.xlsx'), 'data file should be an xlsx file'
         data = load(eval_file)
         result = []
 
@@ -424,7 +423,7 @@ class MEGABench(VideoBaseDataset):
         # save the result to json
         output_path = os.path.join(os.path.dirname(eval_file), f'megabench_result_{self.subset_name}.json')
         result_path = os.path.join(os.path.dirname(eval_file), f'megabench_score_{self.subset_name}.json')
-        score_path = eval_file.replace('.xlsx','_acc_{self.subset_name}.json')
+        score_path = get_intermediate_file_path(eval_file, '_acc_{self.subset_name}', 'json')
         if not os.path.exists(output_path) or not os.path.exists(result_path):
             for task_name, group in data.groupby('task_name'):
                 task_dict = {
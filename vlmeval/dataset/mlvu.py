@@ -3,6 +3,7 @@ from huggingface_hub import snapshot_download
 from ..smp import *
 from .video_concat_dataset import ConcatVideoDataset
 from .video_base import VideoBaseDataset
+from .utils.frame_extractor import save_frames
 from .utils import build_judge, DEBUG_MESSAGE
 from ..utils import track_progress_rich
 import torchvision.transforms as T
@@ -179,11 +180,7 @@ class MLVU_MCQ(VideoBaseDataset):
             lock_path = osp.splitext(vid_path)[0] + '.lock'
             with portalocker.Lock(lock_path, 'w', timeout=30):
                 if not np.all([osp.exists(p) for p in frame_paths]):
-                    images = [vid[i].asnumpy() for i in indices]
-                    images = [Image.fromarray(arr) for arr in images]
-                    for im, pth in zip(images, frame_paths):
-                        if not osp.exists(pth):
-                            im.save(pth)
+                    save_frames(vid, indices, frame_paths)
 
         return frame_paths
 
@@ -211,10 +208,9 @@ class MLVU_MCQ(VideoBaseDataset):
 
     @classmethod
     def evaluate(self, eval_file, **judge_kwargs):
-        assert eval_file.endswith('.xlsx'), 'data file should be an xlsx file'
 
-        tmp_file = eval_file.replace('.xlsx', '_tmp.pkl')
-        score_file = eval_file.replace('.xlsx', '_score.xlsx')
+        tmp_file = get_intermediate_file_path(eval_file, '_tmp', 'pkl')
+        score_file = get_intermediate_file_path(eval_file, '_score')
 
         if not osp.exists(score_file):
             model = judge_kwargs.setdefault('model', 'chatgpt-0125')
@@ -386,11 +382,7 @@ class MLVU_OpenEnded(VideoBaseDataset):
             lock_path = osp.splitext(vid_path)[0] + '.lock'
             with portalocker.Lock(lock_path, 'w', timeout=30):
                 if not np.all([osp.exists(p) for p in frame_paths]):
-                    images = [vid[i].asnumpy() for i in indices]
-                    images = [Image.fromarray(arr) for arr in images]
-                    for im, pth in zip(images, frame_paths):
-                        if not osp.exists(pth):
-                            im.save(pth)
+                    save_frames(vid, indices, frame_paths)
 
         return frame_paths
 
@@ -424,7 +416,7 @@ class MLVU_OpenEnded(VideoBaseDataset):
             judge_kwargs['model'] = 'gpt-4-0125'
 
         suffix = eval_file.split('.')[-1]
-        score_file = eval_file.replace(f'.{suffix}', f'_{model}_score.xlsx')
+        score_file = get_intermediate_file_path(eval_file, f'_{model}_score')
         tmp_file = eval_file.replace(f'.{suffix}', f'_{model}.pkl')
         nproc = judge_kwargs.pop('nproc', 4)
 
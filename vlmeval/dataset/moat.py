@@ -100,7 +100,7 @@ class MOAT(ImageBaseDataset):
     def evaluate(self, eval_file, **judge_kwargs):
         model = judge_kwargs['model']
         suffix = eval_file.split('.')[-1]
-        result_path = eval_file.replace(f'.{suffix}', f"_{model}.xlsx")
+        result_path = get_intermediate_file_path(eval_file, f"_{model}")
         nproc = judge_kwargs.pop('nproc', 4)
 
         if not osp.exists(result_path):
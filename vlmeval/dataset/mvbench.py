@@ -2,6 +2,7 @@ import huggingface_hub
 from huggingface_hub import snapshot_download
 from ..smp import *
 from .video_base import VideoBaseDataset
+from .utils.frame_extractor import decode_frames
 from .utils import build_judge, DEBUG_MESSAGE
 from ..utils import track_progress_rich
 import torchvision.transforms as T
@@ -219,9 +220,7 @@ Based on your observations, select the best option that accurately addresses the
 
         images_group = list()
         frame_indices = self.get_index(bound, fps, max_frame, first_idx=0)
-        for frame_index in frame_indices:
-            img = Image.fromarray(vr[frame_index].asnumpy())
-            images_group.append(img)
+        images_group = [Image.fromarray(arr) for arr in decode_frames(vr, frame_indices)]
         torch_imgs = self.transform(images_group)
         return torch_imgs
 
@@ -362,11 +361,9 @@ Based on your observations, select the best option that accurately addresses the
     @classmethod
     def evaluate(self, eval_file, **judge_kwargs):
 
-        assert eval_file.endswith('.xlsx'), 'data file should be an xlsx file'
-
-        tmp_file = eval_file.replace('.xlsx', '_tmp.pkl')
-        tgt_file = eval_file.replace('.xlsx', '_rating.json')
-        score_file = eval_file.replace('.xlsx', '_score.xlsx')
+        tmp_file = get_intermediate_file_path(eval_file, '_tmp', 'pkl')
+        tgt_file = get_intermediate_file_path(eval_file, '_rating', 'json')
+        score_file = get_intermediate_file_path(eval_file, '_score')
 
         if not osp.exists(score_file):
             model = judge_kwargs.setdefault('model', 'chatgpt-0125')
@@ -550,9 +547,7 @@ Based on your observations, select the best option that accurately addresses the
         else:
             frame_indices = self.get_index_by_fps(vr, self.fps)
 
-        for frame_index in frame_indices:
-            img = Image.fromarray(vr[frame_index].asnumpy())
-            images_group.append(img)
+        images_group = [Image.fromarray(arr) for arr in decode_frames(vr, frame_indices)]
         torch_imgs = self.transform(images_group)
         return torch_imgs
 
@@ -609,11 +604,9 @@ Based on your observations, select the best option that accurately addresses the
     @classmethod
     def evaluate(self, eval_file, **judge_kwargs):
 
-        assert eval_file.endswith('.xlsx'), 'data file should be an xlsx file'
-
-        tmp_file = eval_file.replace('.xlsx', '_tmp.pkl')
-        tgt_file = eval_file.replace('.xlsx', '_rating.json')
-        score_file = eval_file.replace('.xlsx', '_score.xlsx')
+        tmp_file = get_intermediate_file_path(eval_file, '_tmp', 'pkl')
+        tgt_file = get_intermediate_file_path(eval_file, '_rating', 'json')
+        score_file = get_intermediate_file_path(eval_file, '_score')
 
         if not osp.exists(score_file):
             model = judge_kwargs.setdefault('model', 'chatgpt-0125')
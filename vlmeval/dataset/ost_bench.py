@@ -250,7 +250,7 @@ class OSTDataset(ImageILDataset):
 
     def evaluate(self, eval_file, **judge_kwargs):
         sum_ = 0
-        df = pd.read_excel(eval_file, sheet_name=0)
+        df = load(eval_file)
 
         total_cnt = {}
         correct_cnt = {}
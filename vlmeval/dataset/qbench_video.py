@@ -4,6 +4,7 @@ from huggingface_hub import snapshot_download
 from ..smp import *
 from .video_concat_dataset import ConcatVideoDataset
 from .video_base import VideoBaseDataset
+from .utils.frame_extractor import save_frames
 from .utils import build_judge, DEBUG_MESSAGE
 from ..utils import track_progress_rich
 import torchvision.transforms as T
@@ -125,11 +126,7 @@ Please do not add any other answers beyond this.
             lock_path = osp.splitext(vid_path)[0] + '.lock'
             with portalocker.Lock(lock_path, 'w', timeout=30):
                 if not np.all([osp.exists(p) for p in frame_paths]):
-                    images = [vid[i].asnumpy() for i in indices]
-                    images = [Image.fromarray(arr) for arr in images]
-                    for im, pth in zip(images, frame_paths):
-                        if not osp.exists(pth):
-                            im.save(pth)
+                    save_frames(vid, indices, frame_paths)
 
         return frame_paths
 
@@ -159,10 +156,9 @@ Please do not add any other answers beyond this.
 
     @classmethod
     def evaluate(self, eval_file, **judge_kwargs):
-        assert eval_file.endswith('.xlsx'), 'data file should be an xlsx file'
 
-        tmp_file = eval_file.replace('.xlsx', '_tmp.pkl')
-        score_file = eval_file.replace('.xlsx', '_score.xlsx')
+        tmp_file = get_intermediate_file_path(eval_file, '_tmp', 'pkl')
+        score_file = get_intermediate_file_path(eval_file, '_score')
 
         if not osp.exists(score_file):
             model = judge_kwargs.setdefault('model', 'exact_matching')
@@ -283,11 +279,7 @@ Please analyze these frames and provide a detailed and accurate answer from the
             lock_path = osp.splitext(vid_path)[0] + '.lock'
             with portalocker.Lock(lock_path, 'w', timeout=30):
                 if not np.all([osp.exists(p) for p in frame_paths]):
-                    images = [vid[i].asnumpy() for i in indices]
-                    images = [Image.fromarray(arr) for arr in images]
-                    for im, pth in zip(images, frame_paths):
-                        if not osp.exists(pth):
-                            im.save(pth)
+                    save_frames(vid, indices, frame_paths)
 
         return frame_paths
 
@@ -319,7 +311,7 @@ Please analyze these frames and provide a detailed and accurate answer from the
         assert model in ['gpt-4o-0806', 'gpt-4o']
 
         suffix = eval_file.split('.')[-1]
-        score_file = eval_file.replace(f'.{suffix}', f'_{model}_score.xlsx')
+        score_file = get_intermediate_file_path(eval_file, f'_{model}_score')
         tmp_file = eval_file.replace(f'.{suffix}', f'_{model}.pkl')
         nproc = judge_kwargs.pop('nproc', 4)
 
@@ -2,6 +2,7 @@ import huggingface_hub
 from huggingface_hub import snapshot_download
 from ..smp import *
 from .video_base import VideoBaseDataset
+from .utils.frame_extractor import decode_frames
 from .utils import build_judge, DEBUG_MESSAGE
 import torchvision.transforms as T
 from torchvision import transforms
@@ -237,9 +238,7 @@ Based on your observations, select the best option that accurately addresses the
 
         images_group = list()
         frame_indices = self.get_index(bound, fps, max_frame, first_idx=0)
-        for frame_index in frame_indices:
-            img = Image.fromarray(vr[frame_index].asnumpy())
-            images_group.append(img)
+        images_group = [Image.fromarray(arr) for arr in decode_frames(vr, frame_indices)]
         torch_imgs = self.transform(images_group)
         return torch_imgs
 
@@ -436,14 +435,13 @@ Based on your observations, select the best option that accurately addresses the
         Evaluates the given evaluation file and generates ratings based on different dimensions.
 
         Args:
-            eval_file (str): Path to the evaluation file. The file should be in .xlsx format.
+            eval_file (str): Path to the evaluation file (prediction file, e.g. .parquet or .xlsx).
             **judge_kwargs: Additional keyword arguments for the judge model.
 
         Returns:
             dict: A dictionary containing ratings for task type, tamper type, and task-tamper type.
 
         Raises:
-            AssertionError: If the eval_file does not end with '.xlsx'.
             Warning: If the OPENAI API is not working properly or the API key is not set,
                      exact matching will be used for evaluation.
 
@@ -454,15 +452,13 @@ Based on your observations, select the best option that accurately addresses the
             - Ratings are generated for different dimensions and saved to respective files.
         """
 
-        assert eval_file.endswith('.xlsx'), 'data file should be an xlsx file'
-
-        tmp_file = eval_file.replace('.xlsx', '_tmp.pkl')
-        tgt_task_type_file = eval_file.replace('.xlsx', '_task_type_rating.json')
-        tgt_tamper_type_file = eval_file.replace('.xlsx', '_tamper_type_rating.json')
-        tgt_task_tamper_type_file = eval_file.replace('.xlsx', '_task_tamper_type_rating.json')
-        score_file = eval_file.replace('.xlsx', '_score.xlsx')
-        score_metrics_file = eval_file.replace('.xlsx', '_score_f1.xlsx')
-        action_metrics_file = eval_file.replace('.xlsx', '_action_f1.xlsx')
+        tmp_file = get_intermediate_file_path(eval_file, '_tmp', 'pkl')
+        tgt_task_type_file = get_intermediate_file_path(eval_file, '_task_type_rating', 'json')
+        tgt_tamper_type_file = get_intermediate_file_path(eval_file, '_tamper_type_rating', 'json')
+        tgt_task_tamper_type_file = get_intermediate_file_path(eval_file, '_task_tamper_type_rating', 'json')
+        score_file = get_intermediate_file_path(eval_file, '_score')
+        score_metrics_file = get_intermediate_file_path(eval_file, '_score_f1')
+        action_metrics_file = get_intermediate_file_path(eval_file, '_action_f1')
 
         if not osp.exists(score_file):
             model = judge_kwargs.setdefault('model', 'chatgpt-0125')
@@ -3,6 +3,7 @@ from huggingface_hub import snapshot_download
 from ..smp import *
 from .video_concat_dataset import ConcatVideoDataset
 from .video_base import VideoBaseDataset
+from .utils.frame_extractor import save_frames
 from .utils import build_judge, DEBUG_MESSAGE
 from ..utils import track_progress_rich
 import torchvision.transforms as T
@@ -173,11 +174,7 @@ class TempCompass_MCQ(VideoBaseDataset):
             lock_path = osp.splitext(vid_path)[0] + '.lock'
             with portalocker.Lock(lock_path, 'w', timeout=30):
                 if not np.all([osp.exists(p) for p in frame_paths]):
-                    images = [vid[i].asnumpy() for i in indices]
-                    images = [Image.fromarray(arr) for arr in images]
-                    for im, pth in zip(images, frame_paths):
-                        if not osp.exists(pth):
-                            im.save(pth)
+                    save_frames(vid, indices, frame_paths)
 
         return frame_paths
 
@@ -215,7 +212,7 @@ class TempCompass_MCQ(VideoBaseDataset):
         })
 
         suffix = eval_file.split('.')[-1]
-        score_file = eval_file.replace(f'.{suffix}', f'_{model}_score.xlsx')
+        score_file = get_intermediate_file_path(eval_file, f'_{model}_score')
         tmp_file = eval_file.replace(f'.{suffix}', f'_{model}.pkl')
         nproc = judge_kwargs.pop('nproc', 4)
 
@@ -372,11 +369,7 @@ class TempCompass_Captioning(VideoBaseDataset):
             lock_path = osp.splitext(vid_path)[0] + '.lock'
             with portalocker.Lock(lock_path, 'w', timeout=30):
                 if not np.all([osp.exists(p) for p in frame_paths]):
-                    images = [vid[i].asnumpy() for i in indices]
-                    images = [Image.fromarray(arr) for arr in images]
-                    for im, pth in zip(images, frame_paths):
-                        if not osp.exists(pth):
-                            im.save(pth)
+                    save_frames(vid, indices, frame_paths)
 
         return frame_paths
 
@@ -413,7 +406,7 @@ class TempCompass_Captioning(VideoBaseDataset):
         })
 
         suffix = eval_file.split('.')[-1]
-        score_file = eval_file.replace(f'.{suffix}', f'_{model}_score.xlsx')
+        score_file = get_intermediate_file_path(eval_file, f'_{model}_score')
         tmp_file = eval_file.replace(f'.{suffix}', f'_{model}.pkl')
         nproc = judge_kwargs.pop('nproc', 4)
 
@@ -568,11 +561,7 @@ class TempCompass_YorN(VideoBaseDataset):
             lock_path = osp.splitext(vid_path)[0] + '.lock'
             with portalocker.Lock(lock_path, 'w', timeout=30):
                 if not np.all([osp.exists(p) for p in frame_paths]):
-                    images = [vid[i].asnumpy() for i in indices]
-                    images = [Image.fromarray(arr) for arr in images]
-                    for im, pth in zip(images, frame_paths):
-                        if not osp.exists(pth):
-                            im.save(pth)
+                    save_frames(vid, indices, frame_paths)
 
         return frame_paths
 
@@ -610,7 +599,7 @@ class TempCompass_YorN(VideoBaseDataset):
         })
 
         suffix = eval_file.split('.')[-1]
-        score_file = eval_file.replace(f'.{suffix}', f'_{model}_score.xlsx')
+        score_file = get_intermediate_file_path(eval_file, f'_{model}_score')
         tmp_file = eval_file.replace(f'.{suffix}', f'_{model}.pkl')
         nproc = judge_kwargs.pop('nproc', 4)
 
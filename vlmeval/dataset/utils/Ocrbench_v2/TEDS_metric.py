@@ -11,10 +11,12 @@
 # Apache 2.0 License for more details.
 
 import re
+import os
 import ast
 import json
+import pickle
+import hashlib
 import ipdb
-import distance
 from apted import APTED, Config
 from itertools import product
 from apted.helpers import Tree
@@ -26,8 +28,11 @@ from zss import simple_distance, Node
 import string
 from typing import Any, Callable, Optional, Sequence
 import numpy as np
-import Levenshtein
-import editdistance
+from ..string_distance import levenshtein_distance
+from vlmeval.smp import LMUDataRoot
+
+# Parsed ground-truth trees of the current process, {content hash: (tree, n_nodes) or None}
+TREE_CACHE = {}
 
 
 class TableTree(Tree):
@@ -60,7 +65,7 @@ class CustomConfig(Config):
     def normalized_distance(self, *sequences):
         """Get distance from 0 to 1
         """
-        return float(distance.levenshtein(*sequences)) / self.maximum(*sequences)
+        return float(levenshtein_distance(*sequences)) / self.maximum(*sequences)
 
     def rename(self, node1, node2):
         """Compares attributes of trees"""
@@ -75,12 +80,16 @@ class CustomConfig(Config):
 class TEDS(object):
     ''' Tree Edit Distance basead Similarity
     '''
-    def __init__(self, structure_only=False, n_jobs=1, ignore_nodes=None):
+    def __init__(self, structure_only=False, n_jobs=1, ignore_nodes=None, cache_dir=None):
         assert isinstance(n_jobs, int) and (n_jobs >= 1), 'n_jobs must be an integer greather than 1'
         self.structure_only = structure_only
         self.n_jobs = n_jobs
         self.ignore_nodes = ignore_nodes
         self.__tokens__ = []
+        # Parsed ground-truth trees are also cached on disk, set `TEDS_CACHE_DIR=''` to disable
+        if cache_dir is None:
+            cache_dir = os.environ.get('TEDS_CACHE_DIR', os.path.join(LMUDataRoot(), 'cache', 'TEDS'))
+        self.cache_dir = cache_dir
 
     def tokenize(self, node):
         ''' Tokenizes table cells
@@ -120,26 +129,54 @@ class TEDS(object):
         if parent is None:
             return new_node
 
+    def parse_table(self, text):
+        ''' Parses an HTML table into (apted tree, number of nodes), None if there is no table
+        '''
+        parser = html.HTMLParser(remove_comments=True, encoding='utf-8')
+        node = html.fromstring(text, parser=parser)
+        if not node.xpath('body/table'):
+            return None
+        node = node.xpath('body/table')[0]
+        if self.ignore_nodes:
+            etree.strip_tags(node, *self.ignore_nodes)
+        return self.load_html_tree(node), len(node.xpath(".//*"))
+
+    def load_true_table(self, true):
+        ''' Parses the ground-truth table once, cached in memory and on disk by content hash
+        '''
+        key = hashlib.md5(repr((true, self.structure_only, self.ignore_nodes)).encode('utf-8')).hexdigest()
+        if key in TREE_CACHE:
+            return TREE_CACHE[key]
+        cache_file = os.path.join(self.cache_dir, key[:2], f'{key}.pkl') if self.cache_dir else None
+        if cache_file and os.path.exists(cache_file):
+            try:
+                with open(cache_file, 'rb') as f:
+                    TREE_CACHE[key] = pickle.load(f)
+                return TREE_CACHE[key]
+            except Exception:
+                pass
+        table = self.parse_table(true)
+        TREE_CACHE[key] = table
+        if cache_file:
+            os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+            tmp_file = f'{cache_file}.{os.getpid()}.tmp'
+            with open(tmp_file, 'wb') as f:
+                pickle.dump(table, f)
+            os.replace(tmp_file, cache_file)
+        return table
+
     def evaluate(self, pred, true):
         ''' Computes TEDS score between the prediction and the ground truth of a
             given sample
         '''
         if (not pred) or (not true):
             return 0.0
-        parser = html.HTMLParser(remove_comments=True, encoding='utf-8')
-        pred = html.fromstring(pred, parser=parser)
-        true = html.fromstring(true, parser=parser)
-        if pred.xpath('body/table') and true.xpath('body/table'):
-            pred = pred.xpath('body/table')[0]
-            true = true.xpath('body/table')[0]
-            if self.ignore_nodes:
-                etree.strip_tags(pred, *self.ignore_nodes)
-                etree.strip_tags(true, *self.ignore_nodes)
-            n_nodes_pred = len(pred.xpath(".//*"))
-            n_nodes_true = len(true.xpath(".//*"))
+        pred = self.parse_table(pred)
+        true = self.load_true_table(true)
+        if pred is not None and true is not None:
+            tree_pred, n_nodes_pred = pred
+            tree_true, n_nodes_true = true
             n_nodes = max(n_nodes_pred, n_nodes_true)
-            tree_pred = self.load_html_tree(pred)
-            tree_true = self.load_html_tree(true)
             distance = APTED(tree_pred, tree_true, CustomConfig()).compute_edit_distance()
             return 1.0 - (float(distance) / n_nodes)
         else:
@@ -532,7 +569,7 @@ def get_anls(s1, s2):
         pass
     if s1 == s2:
         return 1.0
-    iou = 1 - editdistance.eval(s1, s2) / max(len(s1), len(s2))
+    iou = 1 - levenshtein_distance(s1, s2) / max(len(s1), len(s2))
     anls = iou
     return anls
 
@@ -709,12 +746,12 @@ def csv_eval(predictions,references,easy, pred_type='json'):
         for elem1 in a:
             for elem2 in b:
                 if is_float(elem1[-1]) and is_float(elem2[-1]):
-                    if ((Levenshtein.distance(''.join(elem1[:-1]),''.join(elem2[:-1])) <= tol_word) and (abs(elem1[-1] - elem2[-1]) / (abs(elem2[-1])+0.000001) <= tol_num))or \
+                    if ((levenshtein_distance(''.join(elem1[:-1]),''.join(elem2[:-1])) <= tol_word) and (abs(elem1[-1] - elem2[-1]) / (abs(elem2[-1])+0.000001) <= tol_num))or \
                     ((''.join(elem1[:-1]) in ''.join(elem2[:-1])) and (abs(elem1[-1] - elem2[-1]) / (abs(elem2[-1])+0.000001) <= tol_num)) or \
                     ((''.join(elem2[:-1]) in ''.join(elem1[:-1])) and (abs(elem1[-1] - elem2[-1]) / (abs(elem2[-1])+0.000001) <= tol_num)):
                         c.add(elem1)
                 else:
-                    if (Levenshtein.distance(''.join([str(i) for i in elem1]),''.join([str(j) for j in elem2])) <= tol_word):
+                    if (levenshtein_distance(''.join([str(i) for i in elem1]),''.join([str(j) for j in elem2])) <= tol_word):
                         c.add(elem1)
         return list(c)
 
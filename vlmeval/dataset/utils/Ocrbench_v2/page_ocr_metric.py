@@ -6,6 +6,7 @@ import numpy as np
 import jieba
 import re
 from nltk.translate import meteor_score
+from ..string_distance import levenshtein_distance
 
 
 def contain_chinese_string(text):
@@ -32,7 +33,7 @@ def cal_per_metrics(pred, gt):
 
     metrics["precision"] = precision(reference, hypothesis)
     metrics["recall"] = recall(reference, hypothesis)
-    metrics["edit_dist"] = nltk.edit_distance(pred, gt) / max(len(pred), len(gt))
+    metrics["edit_dist"] = levenshtein_distance(pred, gt) / max(len(pred), len(gt))
     return metrics
 
 
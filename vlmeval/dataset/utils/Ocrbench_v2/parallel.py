@@ -2,7 +2,18 @@ from tqdm import tqdm
 from concurrent.futures import ProcessPoolExecutor, as_completed
 
 
-def parallel_process(array, function, n_jobs=16, use_kwargs=False, front_num=0):
+def _process_chunk(function, chunk, use_kwargs=False):
+    # Errors are returned per element, as in `parallel_process`
+    out = []
+    for a in chunk:
+        try:
+            out.append(function(**a) if use_kwargs else function(a))
+        except Exception as e:
+            out.append(e)
+    return out
+
+
+def parallel_process(array, function, n_jobs=16, use_kwargs=False, front_num=0, chunksize=1):
     """
         A parallel version of the map function with a progress bar.
 
@@ -14,6 +25,8 @@ def parallel_process(array, function, n_jobs=16, use_kwargs=False, front_num=0):
                 keyword arguments to function
             front_num (int, default=3): The number of iterations to run serially before kicking off the parallel job.
                 Useful for catching bugs
+            chunksize (int, default=1): The number of elements sent to a worker at once, larger chunks reduce the
+                inter-process overhead for many small jobs
         Returns:
             [function(array[0]), function(array[1]), ...]
     """
@@ -28,7 +41,11 @@ def parallel_process(array, function, n_jobs=16, use_kwargs=False, front_num=0):
     # Assemble the workers
     with ProcessPoolExecutor(max_workers=n_jobs) as pool:
         # Pass the elements of array into function
-        if use_kwargs:
+        if chunksize > 1:
+            rest = array[front_num:]
+            chunks = [rest[i: i + chunksize] for i in range(0, len(rest), chunksize)]
+            futures = [pool.submit(_process_chunk, function, chunk, use_kwargs) for chunk in chunks]
+        elif use_kwargs:
             futures = [pool.submit(function, **a) for a in array[front_num:]]
         else:
             futures = [pool.submit(function, a) for a in array[front_num:]]
@@ -45,7 +62,10 @@ def parallel_process(array, function, n_jobs=16, use_kwargs=False, front_num=0):
     # Get the results from the futures.
     for i, future in tqdm(enumerate(futures)):
         try:
-            out.append(future.result())
+            if chunksize > 1:
+                out.extend(future.result())
+            else:
+                out.append(future.result())
         except Exception as e:
-            out.append(e)
+            out.extend([e] * len(chunks[i]) if chunksize > 1 else [e])
     return front + out
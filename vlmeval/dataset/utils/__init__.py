@@ -1,11 +1,11 @@
-from .judge_util import build_judge, DEBUG_MESSAGE
+from .judge_util import build_judge, DEBUG_MESSAGE, get_judge_batch_size, judge_in_batch
 from .multiple_choice import extract_answer_from_item, prefetch_answer
-from .vqa_eval import levenshtein_distance
+from .string_distance import levenshtein_distance, normalized_levenshtein, levenshtein_matrix
 from .spatial457 import Spatial457_utils
 
 
 __all__ = [
-    'build_judge', 'extract_answer_from_item', 'prefetch_answer',
-    'levenshtein_distance', 'DEBUG_MESSAGE',
+    'build_judge', 'extract_answer_from_item', 'prefetch_answer', 'get_judge_batch_size', 'judge_in_batch',
+    'levenshtein_distance', 'normalized_levenshtein', 'levenshtein_matrix', 'DEBUG_MESSAGE',
     'Spatial457_utils'
 ]
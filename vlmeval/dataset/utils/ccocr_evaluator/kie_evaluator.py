@@ -14,10 +14,10 @@ from typing import Any, Dict, List, Tuple, Union
 import zss
 from zss import Node
 from collections import Counter
-from nltk import edit_distance
 
 # local import
 from .common import BaseMetric
+from ..string_distance import levenshtein_distance as edit_distance
 
 
 def flatten(data: dict):
@@ -1,5 +1,6 @@
 from ...smp import *
 from .multiple_choice import extract_answer_from_item
+from .frame_extractor import frame_size_tag, save_frames
 import pandas as pd
 import numpy as np
 import re
@@ -540,9 +541,11 @@ def save_step_2_steps(data, step_1_results):
 
 
 def clue_frame_paths(clue_frame_root, qid, num_frames=8):
+    # One directory per question: a question refers to a single video, as expected by `save_frames`
     frame_root = osp.join(clue_frame_root, str(qid))
     os.makedirs(frame_root, exist_ok=True)
-    return [osp.join(frame_root, frame_tmpl.format(i, num_frames)) for i in range(1, num_frames + 1)]
+    tmpl = osp.splitext(frame_tmpl)[0] + frame_size_tag() + '.jpg'
+    return [osp.join(frame_root, tmpl.format(i, num_frames)) for i in range(1, num_frames + 1)]
 
 
 def save_clue_video_frames(data_root, clue_frame_root, video, uid, clue_intervals=None, num_frames=8, fps=-1):
@@ -570,11 +573,7 @@ def save_clue_video_frames(data_root, clue_frame_root, video, uid, clue_interval
         lock_path = osp.splitext(vid_path)[0] + '.lock'
         with portalocker.Lock(lock_path, 'w', timeout=30):
             if not np.all([osp.exists(p) for p in frame_paths]):
-                images = [vid[i].asnumpy() for i in indices]
-                images = [Image.fromarray(arr) for arr in images]
-                for im, pth in zip(images, frame_paths):
-                    if not osp.exists(pth):
-                        im.save(pth)
+                save_frames(vid, indices, frame_paths)
 
     return frame_paths, indices, vid_fps
 
@@ -1,4 +1,3 @@
-import subprocess
 texts = []
 images = []
 markers = []
@@ -44,18 +43,10 @@ def get_markers():
     return markers
 
 
-def run_script_safe(script_path):
-    try:
-        subprocess.run(
-            ["python3", script_path],
-            check=True,
-            capture_output=True,
-            text=True
-        )
+def run_script_safe(script_path, timeout=120):
+    # Imported lazily: the instrumented scripts import this module as a top-level package
+    from ..executor import run_script
+    if run_script(script_path, timeout=timeout):
         return True  # success
-    except subprocess.CalledProcessError as e:
-        print(f"[ERROR] Failed to run {script_path}")
-        print(f"[Return Code]: {e.returncode}")
-        print(f"[Stdout]:\n{e.stdout}")
-        print(f"[Stderr]:\n{e.stderr}")
-        return False  # failed
+    print(f"[ERROR] Failed to run {script_path}")
+    return False  # failed
@@ -0,0 +1,124 @@
+"""Warm executor for the generated / instrumented ChartMimic plotting scripts.
+
+Spawning a fresh `python` interpreter per script pays the interpreter startup plus the import of matplotlib & co.
+(~1-2s) for every one of the ~9 scripts of a sample. Instead, the calling process (an evaluation worker) imports
+the plotting stack once and forks a child per script: the child starts with the libraries already loaded, runs the
+script in a clean `__main__` namespace and exits, so monkey-patching / figure state never leaks between scripts.
+Each child is killed after `timeout` seconds and can be capped in address space: it may map at most
+`CHARTMIMIC_MEM_LIMIT` GB on top of the address space it inherits from the calling process.
+"""
+import os
+import sys
+import time
+import signal
+import subprocess
+
+# Libraries used by the instrumented scripts, preloaded once before forking
+PRELOAD_MODULES = [
+    'numpy', 'pandas', 'matplotlib.pyplot', 'matplotlib.colors', 'matplotlib.gridspec',
+    'seaborn', 'scipy.stats', 'networkx', 'matplotlib_venn', 'squarify'
+]
+_WARM = False
+
+
+def _warmup():
+    global _WARM
+    if _WARM:
+        return
+    import importlib
+    import matplotlib
+    matplotlib.use('Agg')
+    for name in PRELOAD_MODULES:
+        try:
+            importlib.import_module(name)
+        except Exception:
+            pass
+    _WARM = True
+
+
+def get_mem_limit():
+    # In GB, on top of the address space inherited from the parent, 0 means no limit
+    return float(os.environ.get('CHARTMIMIC_MEM_LIMIT', 8))
+
+
+def _vm_size():
+    # The address space (in bytes) mapped by the current process, None if unknown (no procfs)
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[0]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return None
+
+
+def _run_in_child(script_path, mem_limit):
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 1)
+    os.dup2(devnull, 2)
+    vm_size = _vm_size()
+    if mem_limit > 0 and vm_size is not None:
+        # The parent (an evaluation worker) may already map more than `mem_limit`, so the limit is relative
+        import resource
+        limit = vm_size + int(mem_limit * 1024 ** 3)
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    import atexit
+    import runpy
+    import matplotlib.pyplot as plt
+    plt.close('all')
+    # Drop the exit handlers inherited from the parent, only those registered by the script are run (at its end)
+    atexit._clear()
+    sys.argv = [script_path]
+    sys.path.insert(0, os.path.dirname(os.path.abspath(script_path)))
+    try:
+        runpy.run_path(script_path, run_name='__main__')
+    finally:
+        atexit._run_exitfuncs()
+
+
+def _run_subprocess(script_path, timeout):
+    try:
+        ret = subprocess.run(
+            [sys.executable, script_path], timeout=timeout, capture_output=True, text=True)
+        return ret.returncode == 0
+    except subprocess.TimeoutExpired:
+        return False
+
+
+def run_script(script_path, timeout=120):
+    """Run the python script `script_path` (in the current working directory), return True if it exits with 0.
+
+    Falls back to a fresh interpreter on platforms without `fork` or if `CHARTMIMIC_WARM_EXECUTOR=0`.
+    """
+    if not hasattr(os, 'fork') or os.environ.get('CHARTMIMIC_WARM_EXECUTOR', '1') == '0':
+        return _run_subprocess(script_path, timeout)
+
+    _warmup()
+    mem_limit = get_mem_limit()
+    sys.stdout.flush()
+    sys.stderr.flush()
+    pid = os.fork()
+    if pid == 0:
+        code = 1
+        try:
+            _run_in_child(script_path, mem_limit)
+            code = 0
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else int(e.code is not None)
+        except BaseException:
+            code = 1
+        finally:
+            # Skip the finalizers inherited from the parent (the exit handlers of the script have been run)
+            os._exit(code)
+
+    deadline = time.time() + timeout
+    delay = 0.001
+    while True:
+        wpid, status = os.waitpid(pid, os.WNOHANG)
+        if wpid != 0:
+            return os.WIFEXITED(status) and os.WEXITSTATUS(status) == 0
+        if time.time() > deadline:
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+            return False
+        time.sleep(delay)
+        delay = min(delay * 2, 0.05)
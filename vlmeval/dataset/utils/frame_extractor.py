@@ -0,0 +1,152 @@
+"""Shared frame extraction for the video datasets.
+
+Frames are decoded with `VideoReader.get_batch` over the sorted (unique) indices, in chunks to bound the memory,
+instead of one random access `vid[i]` per frame. They are encoded & saved by a shared thread pool. Files are
+written to a temporary path and renamed, so a frame file that exists is always complete.
+
+Decoded frames are kept in a per-video frame store (the `src` sub-directory of the video's frame directory), keyed
+by the source frame index. The frame files of a sampling configuration (e.g., `frame-3-of-8.jpg`) are hard links to
+the store, so sweeping nframe / fps settings only decodes the source frames that no previous setting used.
+With `VIDEO_FRAME_MAX_SIZE` set, the frame file names carry the size (e.g., `frame-3-of-8-448px.jpg`, see
+`frame_size_tag`), so that frames saved with another size are never served from the "all frames exist" check.
+"""
+import os
+import shutil
+import os.path as osp
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
+
+DECODE_CHUNK_SIZE = 32
+FRAME_STORE_DIR = 'src'
+
+_SAVE_POOL = None
+_SAVE_POOL_LOCK = threading.Lock()
+
+
+def get_save_pool():
+    # The number of encoding threads is set with the env var `FRAME_SAVE_NPROC`
+    global _SAVE_POOL
+    with _SAVE_POOL_LOCK:
+        if _SAVE_POOL is None:
+            nproc = int(os.environ.get('FRAME_SAVE_NPROC', min(8, os.cpu_count() or 1)))
+            _SAVE_POOL = ThreadPoolExecutor(max_workers=nproc)
+    return _SAVE_POOL
+
+
+def get_frame_max_size():
+    return int(os.environ.get('VIDEO_FRAME_MAX_SIZE', 0))
+
+
+def frame_size_tag(max_size=None):
+    """The tag of the frame size in the frame file names: `-{max_size}px`, or empty for frames of the source size.
+    `max_size` defaults to the env var `VIDEO_FRAME_MAX_SIZE`."""
+    max_size = get_frame_max_size() if max_size is None else max_size
+    return f'-{max_size}px' if max_size > 0 else ''
+
+
+def _decode_sorted(vid, indices):
+    try:
+        return list(vid.get_batch(indices).asnumpy())
+    except Exception:
+        # Fallback to random access if the batch decoding fails (e.g., for some broken streams)
+        return [vid[i].asnumpy() for i in indices]
+
+
+def decode_frames(vid, indices):
+    """Decode the frames at `indices` (in the given order, duplicates allowed) from a `decord.VideoReader`,
+    returns a list of [H, W, 3] uint8 arrays."""
+    indices = [int(i) for i in indices]
+    uniq = sorted(set(indices))
+    frames = {}
+    for i in range(0, len(uniq), DECODE_CHUNK_SIZE):
+        chunk = uniq[i: i + DECODE_CHUNK_SIZE]
+        frames.update(zip(chunk, _decode_sorted(vid, chunk)))
+    return [frames[i] for i in indices]
+
+
+def save_frame(arr, path):
+    root, ext = osp.splitext(path)
+    tmp_path = f'{root}.{os.getpid()}.{threading.get_ident()}.tmp{ext}'
+    Image.fromarray(arr).save(tmp_path)
+    os.replace(tmp_path, path)
+    return path
+
+
+def source_frame_path(store_dir, idx, max_size=0):
+    """The path of source frame `idx` in a frame store, or of its variant downscaled to `max_size` (longer side)."""
+    return osp.join(store_dir, f'{idx:06d}.jpg' if max_size <= 0 else f'{idx:06d}-{max_size}px.jpg')
+
+
+def save_variant(src_path, path, max_size):
+    im = Image.open(src_path)
+    im.thumbnail((max_size, max_size), Image.BICUBIC)
+    root, ext = osp.splitext(path)
+    tmp_path = f'{root}.{os.getpid()}.{threading.get_ident()}.tmp{ext}'
+    im.save(tmp_path)
+    os.replace(tmp_path, path)
+    return path
+
+
+def link_frame(src_path, path):
+    root, ext = osp.splitext(path)
+    tmp_path = f'{root}.{os.getpid()}.{threading.get_ident()}.tmp{ext}'
+    try:
+        os.link(src_path, tmp_path)
+    except OSError:
+        # Hard links are not supported by the file system
+        shutil.copyfile(src_path, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def save_frames(vid, indices, frame_paths, max_size=None):
+    """Save the frames at `indices` to `frame_paths`, frames that already exist are skipped. The frames are taken
+    from the frame store next to `frame_paths`, only the source frames missing in the store are decoded.
+    All `frame_paths` must be in one directory, which holds the frames of a single video only (as given by
+    `VideoBaseDataset.frame_paths`): the frame store is keyed by the source frame index, not by the video.
+    If `max_size` (default to the env var `VIDEO_FRAME_MAX_SIZE`) is positive, the frames are downscaled so that
+    their longer side is at most `max_size`, the downscaled variants are also kept in the frame store. The callers
+    must tag `frame_paths` with the size (`frame_size_tag`), frames that already exist are not resized."""
+    if max_size is None:
+        max_size = get_frame_max_size()
+    assert len(set(osp.dirname(p) for p in frame_paths)) <= 1, 'Frames of a video must be in one directory'
+    todo = [(int(idx), pth) for idx, pth in zip(indices, frame_paths) if not osp.exists(pth)]
+    if len(todo) == 0:
+        return frame_paths
+    store_dir = osp.join(osp.dirname(todo[0][1]), FRAME_STORE_DIR)
+    os.makedirs(store_dir, exist_ok=True)
+    pool = get_save_pool()
+
+    # Decode chunk by chunk, the encoding of a chunk overlaps with the decoding of the next one
+    missing = sorted(set(idx for idx, _ in todo if not osp.exists(source_frame_path(store_dir, idx))))
+    futures = []
+    for i in range(0, len(missing), DECODE_CHUNK_SIZE):
+        chunk = missing[i: i + DECODE_CHUNK_SIZE]
+        for idx, arr in zip(chunk, _decode_sorted(vid, chunk)):
+            futures.append(pool.submit(save_frame, arr, source_frame_path(store_dir, idx)))
+    for f in futures:
+        f.result()
+
+    if max_size > 0:
+        variants = sorted(set(idx for idx, _ in todo if not osp.exists(source_frame_path(store_dir, idx, max_size))))
+        futures = [
+            pool.submit(save_variant, source_frame_path(store_dir, idx), source_frame_path(store_dir, idx, max_size),
+                        max_size) for idx in variants
+        ]
+        for f in futures:
+            f.result()
+
+    for idx, pth in todo:
+        link_frame(source_frame_path(store_dir, idx, max_size), pth)
+    return frame_paths
+
+
+def extract_dataset_frames(dataset, nproc=4):
+    """Pre-extract the frames of all videos in a video dataset ahead of inference, with the frame sampling of the
+    dataset (nframe / fps). Frames that already exist are skipped, so an interrupted extraction can be resumed.
+    Frames are saved by the dataset's own `build_prompt`, one sample per video."""
+    from ...utils import track_progress_rich
+    from functools import partial
+    lines = [i for i, dup in enumerate(dataset.data['video'].duplicated()) if not dup]
+    track_progress_rich(partial(dataset.build_prompt, video_llm=False), lines, nproc=nproc)
+    return len(lines)
@@ -1,7 +1,23 @@
 import os
-from ...smp import load_env
+import json
+import copy as cp
+import threading
+from ...smp import load_env, timer
 
 INTERNAL = os.environ.get('INTERNAL', 0)
+FAIL_MSG = 'Failed to obtain answer via API.'
+BATCH_JUDGE_MAX_TOKENS = 4096
+
+# Judge instances are built once per (model, kwargs) and reused for the life of the process
+JUDGE_POOL = {}
+JUDGE_POOL_LOCK = threading.Lock()
+
+BATCH_JUDGE_PROMPT = (
+    'You will be given {n} independent tasks, each starts with a line like "### Task i". '
+    'Complete every task independently, following its own instructions. '
+    'Respond with a JSON array of {n} strings and nothing else, where the i-th string is exactly '
+    'the output you would give for task i.\n\n{tasks}'
+)
 
 
 def build_judge(**kwargs):
@@ -31,13 +47,72 @@ def build_judge(**kwargs):
     else:
         model_version = LOCAL_LLM
 
-    if model in ['qwen-7b', 'qwen-72b', 'deepseek']:
-        model = SiliconFlowAPI(model_version, **kwargs)
-    elif model == 'llama31-8b':
-        model = HFChatModel(model_version, **kwargs)
-    else:
-        model = OpenAIWrapper(model_version, **kwargs)
-    return model
+    key = (model, model_version, tuple(sorted((k, repr(v)) for k, v in kwargs.items())))
+    with JUDGE_POOL_LOCK:
+        if key not in JUDGE_POOL:
+            with timer('build_judge', model=model_version):
+                if model in ['qwen-7b', 'qwen-72b', 'deepseek']:
+                    judge = SiliconFlowAPI(model_version, **kwargs)
+                elif model == 'llama31-8b':
+                    judge = HFChatModel(model_version, **kwargs)
+                else:
+                    judge = OpenAIWrapper(model_version, **kwargs)
+            # Start the (cached) health probe in the background, so that `working()` rarely needs to wait
+            if hasattr(judge, 'check_health'):
+                judge.check_health()
+            JUDGE_POOL[key] = judge
+    return copy_judge(JUDGE_POOL[key])
+
+
+def copy_judge(judge):
+    """A copy of a pooled judge that evaluators can modify (e.g., set `system_prompt`, update `kwargs`).
+
+    Clients and loaded weights are shared with the pooled instance, while the mutable config (dict / list / set
+    attributes such as `headers`, `default_kwargs` or `kwargs`) is copied, so that changes do not leak between
+    evaluators.
+    """
+    ret = cp.copy(judge)
+    for k, v in vars(judge).items():
+        if isinstance(v, (dict, list, set)):
+            setattr(ret, k, cp.copy(v))
+    return ret
+
+
+def get_judge_batch_size():
+    """The number of items packed into a single judge request, set with the env var `JUDGE_BATCH_SIZE`.
+    Defaults to 1 (one item per request)."""
+    return max(int(os.environ.get('JUDGE_BATCH_SIZE', 1)), 1)
+
+
+def parse_batch_response(response, n):
+    """Parse the JSON array of `n` answers in a batched judge response, returns None if failed."""
+    st, ed = response.find('['), response.rfind(']')
+    if st == -1 or ed <= st:
+        return None
+    try:
+        answers = json.loads(response[st: ed + 1])
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(answers, list) or len(answers) != n:
+        return None
+    return [None if x is None else (x if isinstance(x, str) else json.dumps(x)) for x in answers]
+
+
+def judge_in_batch(model, prompts, **kwargs):
+    """Pack several judge prompts (str) into one request, and return the per-item answers.
+
+    Items that can not be parsed from the response are None, callers are expected to fall back to single-item
+    requests for them.
+    """
+    if len(prompts) == 1:
+        answer = model.generate(prompts[0], **kwargs)
+        return [None if FAIL_MSG in answer else answer]
+    if hasattr(model, 'max_tokens'):
+        kwargs.setdefault('max_tokens', min(model.max_tokens * len(prompts), BATCH_JUDGE_MAX_TOKENS))
+    tasks = '\n\n'.join([f'### Task {i + 1}\n{p}' for i, p in enumerate(prompts)])
+    response = model.generate(BATCH_JUDGE_PROMPT.format(n=len(prompts), tasks=tasks), **kwargs)
+    answers = None if FAIL_MSG in response else parse_batch_response(response, len(prompts))
+    return answers if answers is not None else [None] * len(prompts)
 
 
 DEBUG_MESSAGE = """
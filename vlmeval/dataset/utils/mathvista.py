@@ -1,5 +1,6 @@
 from ...smp import *
 from ...utils import can_infer
+from .judge_util import judge_in_batch
 
 
 FAIL_MSG = 'Failed to obtain answer via API.'
@@ -121,6 +122,23 @@ def MathVista_auxeval(model, line):
     return dict(log=log, res='')
 
 
+def MathVista_auxeval_batch(model, lines):
+    ret = [None] * len(lines)
+    pending = []
+    for i, line in enumerate(lines):
+        res = post_check(line, prefetch=True)
+        if res:
+            ret[i] = dict(log='Prefetch succeed', res=res)
+        else:
+            pending.append(i)
+    if len(pending):
+        answers = judge_in_batch(model, [build_mathvista_gpt4_prompt(lines[i]) for i in pending])
+        for i, ans in zip(pending, answers):
+            # Fall back to single-item requests for the items failed in the batched request
+            ret[i] = dict(log='Succeed', res=ans) if ans is not None else MathVista_auxeval(model, lines[i])
+    return ret
+
+
 def MathVista_acc(result_file):
     data = load(result_file)
     tot = defaultdict(lambda: 0)
@@ -3,12 +3,28 @@ import json
 import os
 from typing import Any, Dict, List
 import ast
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
 from vlmeval import load, dump
 
 
 from . import MetricType, AggregationType, ResponseParseType
 from .parsing.common.utils import evaluate_as_string
 
+# The evaluator used by the (forked) task scoring workers
+_EVALUATOR = None
+# The partial records of a task are checkpointed every `CHECKPOINT_EVERY` queries
+CHECKPOINT_EVERY = 10
+
+
+def _init_worker(sandbox_nproc):
+    # Each worker has a sandbox pool of its own (see `get_sandbox_pool`), share the program judge processes
+    os.environ["PROGRAM_JUDGE_NPROC"] = str(sandbox_nproc)
+
+
+def _score_task(args):
+    return _EVALUATOR.score_task(*args)
+
 
 class MEGABenchEvaluator:
     def __init__(
@@ -16,23 +32,36 @@ class MEGABenchEvaluator:
         subset_name: str,
         responses_file: str,
         output_file: str,
+        nproc: int = None,
     ):
         """
         :param hf_data_file: Path to a file containing HF dataset tasks + their metric configs
         :param model_responses_file: Path to a JSON file with tasks + model responses
         :param output_file: Path to store evaluated results
+        :param nproc: Number of processes scoring tasks in parallel (default to the env var `EVAL_NPROC`)
         """
         self.hf_data = self._load_hf(subset_name)  # e.g. same structure used previously
         self.data = self._load_json(responses_file)  # The model's output
         self.output_file = output_file
         self.tmp_output_file = output_file.replace(".json", "_tmp.pkl")
+        # The partial records of the unfinished tasks, one file per task
+        self.tmp_task_dir = output_file.replace(".json", "_tmp")
+
+        if nproc is None:
+            nproc = int(os.environ.get('EVAL_NPROC', min(16, os.cpu_count() or 1)))
+        self.nproc = nproc
 
         # Build a dict of {task_name -> metric configuration} for quick lookup
         self.scoring_functions = {}
+        # And a dict of {task_name -> {sample id -> sample}} for the queries identified by `global_idx`
+        self.id_to_sample = {}
         for task_name, task_samples in self.hf_data.items():
             self.scoring_functions[task_name] = ast.literal_eval(
                 task_samples[0]["metric_info"]
             )
+            self.id_to_sample[task_name] = {sample["id"]: sample for sample in task_samples}
+        # Parsed eval contexts, {(task_name, query key) -> eval_context}
+        self.eval_contexts = {}
 
     def _load_hf(self, subset_name: str) -> List[Dict[str, Any]]:
         """
@@ -50,16 +79,15 @@ class MEGABenchEvaluator:
         return task_dict
 
     def _get_eval_context(self, task_name, query):
-        if "query_idx" in query:
-            query_idx = query["query_idx"]
-            eval_context = self.hf_data[task_name][query_idx]["eval_context"]
-        else:
-            global_idx = query["global_idx"]
-            global_idx_to_sample = {sample["id"]: sample for sample in self.hf_data[task_name]}
-            eval_context = global_idx_to_sample[global_idx]["eval_context"]
-
-        eval_context = ast.literal_eval(eval_context)
-        return eval_context
+        key = (task_name, "query_idx", query["query_idx"]) if "query_idx" in query \
+            else (task_name, "global_idx", query["global_idx"])
+        if key not in self.eval_contexts:
+            if "query_idx" in query:
+                eval_context = self.hf_data[task_name][query["query_idx"]]["eval_context"]
+            else:
+                eval_context = self.id_to_sample[task_name][query["global_idx"]]["eval_context"]
+            self.eval_contexts[key] = ast.literal_eval(eval_context)
+        return self.eval_contexts[key]
     
     def _determine_eval_style(self, task):
         metric_info = self.scoring_functions[task["task_name"]]
@@ -77,6 +105,7 @@ class MEGABenchEvaluator:
     def evaluate(self):
         """
         The main entry point to evaluate all tasks in self.data based on the HF dataset’s metric info.
+        Tasks are scored in parallel, and the results are merged in the task order.
         """
         if os.path.exists(self.tmp_output_file):
             exist_records = load(self.tmp_output_file)
@@ -87,120 +116,39 @@ class MEGABenchEvaluator:
         total_query_score = 0.0
         total_task_score = 0.0
 
-        # Evaluate each task
-        for task in self.data:
+        task_indices = []
+        for i, task in enumerate(self.data):
             task_name = task.get("task_name", "")
             if task_name not in exist_records:
                 exist_records[task_name] = {}
+            if task.get("query_response"):
+                task_indices.append(i)
+                # Resume from the partial records of a task interrupted in a previous run
+                if os.path.exists(self._task_checkpoint(i)):
+                    ckpt_task_name, task_records = load(self._task_checkpoint(i))
+                    if ckpt_task_name == task_name:
+                        exist_records[task_name].update(task_records)
+            # else: no queries to score
 
-            # If no scoring config is found for the given task_name, skip
-            score_config = self.scoring_functions.get(
-                task_name,
-                {
-                    "field_score_function": {},
-                    "aggregation": {"function": None, "field_weights": {}},
-                    "response_parse_function": None,
-                },
-            )
-            if not task.get("query_response"):
-                # No queries to score
-                continue
+        # Evaluate each task
+        tasks = [
+            (self.data[i], exist_records[self.data[i].get("task_name", "")], self._task_checkpoint(i))
+            for i in task_indices
+        ]
+        for i, (task, task_records) in zip(task_indices, self._score_tasks(tasks)):
+            task_name = task.get("task_name", "")
+            self.data[i] = task
+            exist_records[task_name] = task_records
+            dump(exist_records, self.tmp_output_file)
+            if os.path.exists(self._task_checkpoint(i)):
+                os.remove(self._task_checkpoint(i))
 
             num_tasks += 1
-            task_score_sum = 0.0
-            # Prepare the aggregator
-            aggregator = AggregationType.from_string(score_config["aggregation"]["function"])
-            field_weights = score_config["aggregation"]["field_weights"]
-
-            # Parse the metric definitions
-            field_score_functions = score_config.get("field_score_function", {})
-            global_aux_metrics = score_config.get("global_aux_metrics", {})
-            parser_type_str = score_config.get("response_parse_function", "dummy")
-            parser = ResponseParseType.from_string(parser_type_str)
-
-            # Extract the fields from the first correct_answer (assuming uniform)
-            first_correct = task["query_response"][0]["correct_answer"]
-            all_fields = list(first_correct.keys())
-            # Usually, we only treat “##something” fields as metadata, so skip them:
-            answer_fields = [f for f in all_fields if not f.startswith("##")]
-
-            # For each query in the task
-            for idx, query in enumerate(task["query_response"]):
-                num_queries += 1
-                response_text = query.get("response", "")
-                correct_answer = query["correct_answer"]
-
-                # 1) Parse the response according to the specified parser
-                response_obj = self._parse_response(
-                    task_name,
-                    parser,
-                    response_text,
-                    correct_answer,
-                    answer_fields,
-                    query,
-                    task,
-                )
-
-                if idx in exist_records[task_name]:
-                    query["scores"] = exist_records[task_name][idx]
-                else:
-                    # Initialize scores for this query
-                    query["scores"] = {"field": {}, "info": {}}
-
-                    # 2) Evaluate each field
-                    for fld, fld_metric_name in field_score_functions.items():
-                        metric = self._build_metric(fld_metric_name, score_config)
-                        self._evaluate_field(
-                            task_name,
-                            metric,
-                            fld,
-                            response_obj,
-                            correct_answer,
-                            query
-                        )
-
-                    # Evaluate global auxiliary metrics (if any)
-                    for fld, fld_metric_name in global_aux_metrics.items():
-                        metric = self._build_metric(fld_metric_name, score_config)
-                        # Some tasks want the entire response object to do an additional check
-                        # So, pass original `response_obj` under `fld` key:
-                        tmp_obj = {fld: response_obj}
-                        self._evaluate_field(
-                            task_name,
-                            metric,
-                            fld,
-                            tmp_obj,
-                            correct_answer,
-                            query,
-                            is_aux=True,
-                        )
-
-                    exist_records[task_name][idx] = query["scores"]
-                    if idx % 10 == 0 or idx == len(task["query_response"]) - 1:
-                        dump(exist_records, self.tmp_output_file)
-
-                # 3) Aggregate the query-level score
-                query["scores"]["query"] = aggregator.aggregate(
-                    query["scores"]["field"],
-                    field_weights,
-                )
-
-                if query["scores"]["query"] >= 0:
-                    task_score_sum += query["scores"]["query"]
+            num_queries += len(task["query_response"])
+            total_query_score += task["task_score"]
+            total_task_score += task["mean_task_score"]
 
-            # Calculate overall task score
-            if task["query_response"]:
-                mean_score = task_score_sum / len(task["query_response"])
-            else:
-                mean_score = 0.0
-            task["task_score"] = task_score_sum
-            task["mean_task_score"] = mean_score
-            task["eval_type"] = self._determine_eval_style(task)
-
-            total_query_score += task_score_sum
-            total_task_score += mean_score
-
-            print(f"[Task: {task_name}] Score = {task_score_sum} / {len(task['query_response'])}")
+            print(f"[Task: {task_name}] Score = {task['task_score']} / {len(task['query_response'])}")
 
         # Produce overall summary stats
         summary = {}
@@ -226,8 +174,186 @@ class MEGABenchEvaluator:
             "summary": summary,
         }
         self._save_results(self.output_file, output_data)
+        if os.path.isdir(self.tmp_task_dir) and not os.listdir(self.tmp_task_dir):
+            os.rmdir(self.tmp_task_dir)
         print(f"Evaluation complete! Results saved to {self.output_file}")
 
+    def _task_checkpoint(self, i):
+        return os.path.join(self.tmp_task_dir, f"{i}.pkl")
+
+    def _score_tasks(self, tasks):
+        """
+        Yield the results of `score_task` for each (task, task_records, checkpoint_file) in `tasks`, in order.
+        """
+        if self.nproc <= 1 or len(tasks) <= 1 or "fork" not in mp.get_all_start_methods():
+            for task in tasks:
+                yield self.score_task(*task)
+            return
+
+        # The workers are forked, so they share the HF data & indexes without pickling them
+        global _EVALUATOR
+        _EVALUATOR = self
+        # Split the program judge processes among the workers, instead of a full sandbox pool per worker
+        sandbox_nproc = int(os.environ.get("PROGRAM_JUDGE_NPROC", min(8, os.cpu_count() or 1)))
+        sandbox_nproc = max(sandbox_nproc // self.nproc, 1)
+        with ProcessPoolExecutor(
+            max_workers=self.nproc,
+            mp_context=mp.get_context("fork"),
+            initializer=_init_worker,
+            initargs=(sandbox_nproc,),
+        ) as executor:
+            yield from executor.map(_score_task, tasks)
+
+    def score_task(self, task, task_records, checkpoint_file=None):
+        """
+        Score all queries of a task, `task_records` holds the field scores of already scored queries
+        ({query idx -> scores}). Return the scored task and the updated records. If `checkpoint_file` is given,
+        the records are dumped to it (as `(task_name, task_records)`) every `CHECKPOINT_EVERY` queries.
+        """
+        task_name = task.get("task_name", "")
+        task_records = dict(task_records)
+
+        # If no scoring config is found for the given task_name, use an empty config
+        score_config = self.scoring_functions.get(
+            task_name,
+            {
+                "field_score_function": {},
+                "aggregation": {"function": None, "field_weights": {}},
+                "response_parse_function": None,
+            },
+        )
+
+        task_score_sum = 0.0
+        # Prepare the aggregator
+        aggregator = AggregationType.from_string(score_config["aggregation"]["function"])
+        field_weights = score_config["aggregation"]["field_weights"]
+
+        # Parse the metric definitions, the metric objects are built once per task
+        field_score_functions = score_config.get("field_score_function", {})
+        global_aux_metrics = score_config.get("global_aux_metrics", {})
+        field_metrics = {
+            fld: self._build_metric(fld_metric_name, score_config)
+            for fld, fld_metric_name in field_score_functions.items()
+        }
+        aux_metrics = {
+            fld: self._build_metric(fld_metric_name, score_config)
+            for fld, fld_metric_name in global_aux_metrics.items()
+        }
+        parser_type_str = score_config.get("response_parse_function", "dummy")
+        parser = ResponseParseType.from_string(parser_type_str)
+
+        # Extract the fields from the first correct_answer (assuming uniform)
+        first_correct = task["query_response"][0]["correct_answer"]
+        all_fields = list(first_correct.keys())
+        # Usually, we only treat “##something” fields as metadata, so skip them:
+        answer_fields = [f for f in all_fields if not f.startswith("##")]
+
+        # The program judge fields are scored in batches, (query, field, program, eval_context), the records of
+        # their queries are completed once the batch is scored
+        program_jobs = []
+        program_queries = []
+        # The test case results are appended to a per-task log next to the output file
+        log_dir = os.path.join(os.path.dirname(os.path.abspath(self.output_file)), "code_eval")
+
+        def score_program_jobs():
+            if program_jobs:
+                program_scores = MetricType.PROGRAM_JUDGE.class_impl.match_batch(
+                    [program for _, _, program, _ in program_jobs],
+                    [eval_context for _, _, _, eval_context in program_jobs],
+                    task_name=task_name,
+                    log_dir=log_dir,
+                )
+                for (query, fld, _, _), score in zip(program_jobs, program_scores):
+                    query["scores"]["field"][fld] = score
+            for idx, query in program_queries:
+                task_records[idx] = query["scores"]
+            program_jobs.clear()
+            program_queries.clear()
+
+        # For each query in the task
+        num_new = 0
+        for idx, query in enumerate(task["query_response"]):
+            response_text = query.get("response", "")
+            correct_answer = query["correct_answer"]
+
+            # 1) Parse the response according to the specified parser
+            response_obj = self._parse_response(
+                task_name,
+                parser,
+                response_text,
+                correct_answer,
+                answer_fields,
+                query,
+                task,
+            )
+
+            if idx in task_records:
+                query["scores"] = task_records[idx]
+            else:
+                # Initialize scores for this query
+                query["scores"] = {"field": {}, "info": {}}
+
+                # 2) Evaluate each field
+                for fld, metric in field_metrics.items():
+                    if metric == MetricType.PROGRAM_JUDGE:
+                        query["scores"]["field"][fld] = None
+                        program_jobs.append(
+                            (query, fld, response_obj.get(fld), self._get_eval_context(task_name, query))
+                        )
+                        continue
+                    self._evaluate_field(
+                        task_name,
+                        metric,
+                        fld,
+                        response_obj,
+                        correct_answer,
+                        query
+                    )
+
+                # Evaluate global auxiliary metrics (if any)
+                for fld, metric in aux_metrics.items():
+                    # Some tasks want the entire response object to do an additional check
+                    # So, pass original `response_obj` under `fld` key:
+                    tmp_obj = {fld: response_obj}
+                    self._evaluate_field(
+                        task_name,
+                        metric,
+                        fld,
+                        tmp_obj,
+                        correct_answer,
+                        query,
+                        is_aux=True,
+                    )
+
+                if program_jobs and program_jobs[-1][0] is query:
+                    program_queries.append((idx, query))
+                else:
+                    task_records[idx] = query["scores"]
+                num_new += 1
+
+            if num_new >= CHECKPOINT_EVERY or (num_new and idx == len(task["query_response"]) - 1):
+                score_program_jobs()
+                if checkpoint_file is not None:
+                    os.makedirs(os.path.dirname(checkpoint_file), exist_ok=True)
+                    dump((task_name, task_records), checkpoint_file)
+                num_new = 0
+
+        for query in task["query_response"]:
+            # 3) Aggregate the query-level score
+            query["scores"]["query"] = aggregator.aggregate(
+                query["scores"]["field"],
+                field_weights,
+            )
+
+            if query["scores"]["query"] >= 0:
+                task_score_sum += query["scores"]["query"]
+
+        # Calculate overall task score
+        task["task_score"] = task_score_sum
+        task["mean_task_score"] = task_score_sum / len(task["query_response"])
+        task["eval_type"] = self._determine_eval_style(task)
+        return task, task_records
+
     def _evaluate_field(
         self,
         task_name: str,
@@ -1,37 +1,36 @@
 import io
-import pathlib
+import os
 import json
+import time
+import signal
+import pathlib
+import threading
+import collections
 import multiprocessing
+from multiprocessing.connection import wait
 from unittest.mock import patch
-from multiprocessing.queues import Empty
 
 BIG_BENCH_PATH = pathlib.Path(__file__).resolve().parent.parent.parent
 
+TIMEOUT_MESSAGE = "ERROR: Code execution exceeded the time limit."
+NO_OUTPUT_MESSAGE = "ERROR: No output was produced before timeout."
+
 
 class ProgramJudge:
     """Program Judging."""
 
-    # Check if results have been saved for this metric instance
-    # prevent duplicate saving results
-    task_saved = {}
-
-    @classmethod
-    def save_test_results(cls, task_name, results, query_file):
-        query_base = pathlib.Path(query_file).parent
-        output_dir = query_base / "code_eval"
-        output_dir.mkdir(parents=True, exist_ok=True)
-        output_file = output_dir / f"{task_name}_test_case.json"
-
-        saved = cls.task_saved.get(task_name, False)
-        if output_file.is_file() and saved:
-            with open(output_file, "r") as f:
-                existing_data = json.load(f)
-            existing_data.extend(results)
-        else:
-            existing_data = results
-            cls.task_saved[task_name] = True
-        with open(output_file, "w") as f:
-            json.dump(existing_data, f, indent=4)
+    @staticmethod
+    def log_test_results(task_name, results, log_dir):
+        """Append the test case results to the per-task log in `log_dir` (one JSON object per line)."""
+        log_dir = pathlib.Path(log_dir)
+        log_dir.mkdir(parents=True, exist_ok=True)
+        with open(log_dir / f"{task_name}_test_case.jsonl", "a") as f:
+            for result in results:
+                f.write(json.dumps(result) + "\n")
+
+    @staticmethod
+    def save_test_results(task_name, results, query_file):
+        ProgramJudge.log_test_results(task_name, results, pathlib.Path(query_file).parent / "code_eval")
 
     @staticmethod
     def match(response: str, eval_context: str, task_info: str = None) -> int:
@@ -49,74 +48,328 @@ class ProgramJudge:
         # ProgramJudge.save_test_results(task_name, results, query_results_file)
         return score
 
+    @staticmethod
+    def match_batch(responses, eval_contexts, task_name=None, log_dir=None):
+        """
+        Score a batch of responses (programs) against the test cases of their eval contexts. All test cases of the
+        batch are run at once by the sandbox pool. If `task_name` and `log_dir` are given, the test results of
+        each response are appended to the per-task log as soon as its test cases are done.
+        """
+        testers = [CodeTester(response, ctx["test_case"]) for response, ctx in zip(responses, eval_contexts)]
+        jobs, owners, offsets = [], [], []
+        for i, tester in enumerate(testers):
+            offsets.append(len(jobs))
+            jobs.extend(tester.jobs())
+            owners.extend([i] * len(tester.test_cases))
+
+        outputs = [[None] * len(tester.test_cases) for tester in testers]
+        remaining = [len(tester.test_cases) for tester in testers]
+        # Responses without test cases are scored right away
+        scores = [tester.score([])[0] if len(tester.test_cases) == 0 else None for tester in testers]
+
+        for job_idx, output in get_sandbox_pool().imap(jobs, timeout=CodeTester.TIMEOUT):
+            i = owners[job_idx]
+            outputs[i][job_idx - offsets[i]] = output
+            remaining[i] -= 1
+            if remaining[i] == 0:
+                scores[i], results = testers[i].score(outputs[i])
+                if task_name is not None and log_dir is not None:
+                    ProgramJudge.log_test_results(task_name, results, log_dir)
+        return scores
+
 
 #########################################################
-### Implementation of the automatic code tester
+### Sandbox pool running the test cases
 #########################################################
 
 
-class CodeTester:
-    def __init__(self, user_code, test_cases, timeout=2, verbose=True):
-        self.user_code = user_code
-        self.test_cases = test_cases
-        self.timeout = timeout
-        self.verbose = verbose
+class _Timeout(BaseException):
+    pass
+
+
+def _raise_timeout(signum, frame):
+    raise _Timeout()
 
-    def run_user_code(self, input_data):
-        input_str = "\n".join(input_data) + "\n"
-        output_queue = multiprocessing.Queue()
-        process = multiprocessing.Process(
-            target=self.target, args=(output_queue, input_str)
-        )
-        process.start()
 
-        process.join(self.timeout)
-        if process.is_alive():
-            process.terminate()
-            return f"ERROR: Code execution exceeded the time limit."
+def _vm_size():
+    # The address space (in bytes) mapped by the current process, None if unknown (no procfs)
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
 
+
+def _isolate_network():
+    """
+    Move the current (single-threaded) process to new user & network namespaces, which only have a loopback
+    interface, so that no program can reach the network (whatever the API it uses). Returns False if the kernel
+    does not allow it (e.g., unprivileged user namespaces are disabled or not on Linux).
+    """
+    import ctypes
+    CLONE_NEWUSER, CLONE_NEWNET = 0x10000000, 0x40000000
+    uid, gid = os.getuid(), os.getgid()
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        if libc.unshare(CLONE_NEWUSER | CLONE_NEWNET) != 0:
+            return False
+    except (OSError, AttributeError):
+        return False
+    # Keep the same uid / gid inside the namespace (best effort, they are shown as `nobody` otherwise)
+    for path, content in [("/proc/self/setgroups", "deny"), ("/proc/self/uid_map", f"{uid} {uid} 1"),
+                          ("/proc/self/gid_map", f"{gid} {gid} 1")]:
         try:
-            result = output_queue.get(timeout=10)  # Add timeout for queue retrieval
-        except Empty:
-            return "ERROR: No output was produced before timeout."
-        finally:
-            output_queue.close()  # Close the queue to release resources
-            output_queue.join_thread()  # Ensure all items in the queue are processed
+            with open(path, "w") as f:
+                f.write(content)
+        except OSError:
+            break
+    return True
 
-        return result
 
-    def target(self, output_queue, input_str):
-        contains_main_block = 'if __name__ == "__main__":' in self.user_code
-        stdout = io.StringIO()
+def _sandbox_init(mem_limit):
+    # Read stdin from /dev/null, cap the address space and cut the network off
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(devnull, 0)
+    vm_size = _vm_size()
+    if mem_limit > 0 and vm_size is not None:
+        # The worker is forked from the evaluator and already maps its address space (several GB with the
+        # libraries loaded), the limit is a budget on top of it rather than an absolute cap
+        import resource
+        limit = vm_size + int(mem_limit * 1024 ** 3)
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    return _isolate_network()
+
+
+def _run_user_code(user_code, input_str, timeout):
+    contains_main_block = 'if __name__ == "__main__":' in user_code
+    stdout = io.StringIO()
+    signal.signal(signal.SIGALRM, _raise_timeout)
+    try:
+        signal.setitimer(signal.ITIMER_REAL, timeout)
         try:
             with patch("builtins.input", side_effect=input_str.splitlines()):
                 with patch("sys.stdout", new=stdout):
                     if contains_main_block:
                         # If the user code contains the main block, execute in the context of __name__ == "__main__"
-                        exec(self.user_code, {"__name__": "__main__"})
+                        exec(user_code, {"__name__": "__main__"})
                     else:
-                        # Otherwise, just execute the user code directly
-                        exec(self.user_code)
+                        # Otherwise, just execute the user code directly, in fresh globals (top-level names are
+                        # locals, as for a plain `exec` inside a function)
+                        exec(user_code, {"__name__": "__sandbox__"}, {})
+        except SystemExit:
+            return NO_OUTPUT_MESSAGE
         except Exception as e:
-            output_queue.put(f"ERROR during execution: {e}")
-        else:
-            output_queue.put(stdout.getvalue().rstrip())
+            return f"ERROR during execution: {e}"
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    except _Timeout:
+        return TIMEOUT_MESSAGE
+    return stdout.getvalue().rstrip()
+
+
+def _run_test_case(user_code, input_str, timeout, grace):
+    """
+    Run a test case in a child forked from the sandbox worker: the imports of the worker are shared, while the
+    changes of the program to the interpreter state (modules, builtins, signal handlers, ...) die with the child.
+    """
+    import select
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        # Bound before running the program, which may patch the modules used to report its output
+        dumps, write, _exit, _len = json.dumps, os.write, os._exit, len
+        try:
+            os.close(read_fd)
+            data = memoryview(dumps(_run_user_code(user_code, input_str, timeout)).encode())
+            while _len(data):
+                data = data[write(write_fd, data):]
+        finally:
+            _exit(0)
+
+    os.close(write_fd)
+    chunks, done = [], False
+    deadline = time.time() + timeout + grace
+    try:
+        # Read while the child runs, as a long output does not fit in the pipe buffer
+        while time.time() < deadline:
+            if select.select([read_fd], [], [], max(deadline - time.time(), 0))[0]:
+                chunk = os.read(read_fd, 1 << 16)
+                if not chunk:
+                    done = True
+                    break
+                chunks.append(chunk)
+    finally:
+        os.close(read_fd)
+        if not done:
+            # Stuck out of the reach of the timer (e.g., in C code)
+            os.kill(pid, signal.SIGKILL)
+        os.waitpid(pid, 0)
+    if not done:
+        return TIMEOUT_MESSAGE
+    try:
+        return json.loads(b"".join(chunks).decode())
+    except ValueError:
+        # The child died before reporting (e.g., `os._exit` or a crash)
+        return NO_OUTPUT_MESSAGE
+
+
+def _sandbox_worker(conn, mem_limit, grace):
+    _sandbox_init(mem_limit)
+    while True:
+        try:
+            user_code, input_str, timeout = conn.recv()
+        except EOFError:
+            break
+        conn.send(_run_test_case(user_code, input_str, timeout, grace))
+
+
+class SandboxPool:
+    """
+    A persistent pool of sandbox worker processes running test cases (a program & its stdin). Each test case runs
+    in a child forked from a warm worker, so that the workers are set up once while no state is shared between
+    programs. The workers have a capped address space and stdin from /dev/null. The cap is the address space
+    inherited from the forking process plus a budget (in GB, env var `PROGRAM_JUDGE_MEM_LIMIT`, default to 4, 0
+    means no limit). Where the kernel allows unprivileged user namespaces, the workers run in a network namespace
+    of their own, without network access; otherwise the network is NOT isolated. A test case is interrupted after
+    `timeout` seconds (its child is killed if the timer cannot interrupt it); a worker that does not respond in
+    time or that crashes is killed and replaced.
+    """
+
+    GRACE = 1.0
+
+    def __init__(self, nproc=None, mem_limit=None):
+        if nproc is None:
+            nproc = int(os.environ.get("PROGRAM_JUDGE_NPROC", min(8, os.cpu_count() or 1)))
+        if mem_limit is None:
+            mem_limit = float(os.environ.get("PROGRAM_JUDGE_MEM_LIMIT", 4))
+        self.nproc = max(nproc, 1)
+        self.mem_limit = mem_limit
+        methods = multiprocessing.get_all_start_methods()
+        self.ctx = multiprocessing.get_context("fork" if "fork" in methods else None)
+        self.workers = []
+        self.lock = threading.Lock()
+
+    def _spawn(self):
+        parent_conn, child_conn = self.ctx.Pipe()
+        process = self.ctx.Process(target=_sandbox_worker, args=(child_conn, self.mem_limit, self.GRACE), daemon=True)
+        process.start()
+        child_conn.close()
+        return [process, parent_conn]
+
+    def _replace(self, worker):
+        worker[0].kill()
+        worker[0].join()
+        worker[1].close()
+        self.workers.remove(worker)
+        new_worker = self._spawn()
+        self.workers.append(new_worker)
+        return new_worker
+
+    def imap(self, jobs, timeout=2):
+        """
+        Run `jobs` [(user_code, input_str), ...], yield (job index, output) in completion order. The output is the
+        (stripped) stdout of the program, or an error message.
+        """
+        with self.lock:
+            while len(self.workers) < self.nproc:
+                self.workers.append(self._spawn())
+            pending = collections.deque(range(len(jobs)))
+            idle = list(self.workers)
+            busy = {}  # conn -> (worker, job index, deadline)
+            try:
+                yield from self._dispatch(jobs, timeout, pending, idle, busy)
+            finally:
+                # If the caller stops early, the busy workers would answer a stale job
+                for worker, _, _ in list(busy.values()):
+                    self._replace(worker)
+
+    def _dispatch(self, jobs, timeout, pending, idle, busy):
+        while pending or busy:
+            while pending and idle:
+                worker, job_idx = idle.pop(), pending.popleft()
+                user_code, input_str = jobs[job_idx]
+                worker[1].send((user_code, input_str, timeout))
+                # The worker enforces the timeout itself, the deadline only catches a worker that does not respond
+                busy[worker[1]] = (worker, job_idx, time.time() + timeout + 2 * self.GRACE)
+
+            next_deadline = min(deadline for _, _, deadline in busy.values())
+            for conn in wait(list(busy), timeout=max(next_deadline - time.time(), 0)):
+                worker, job_idx, _ = busy.pop(conn)
+                try:
+                    output = conn.recv()
+                except (EOFError, OSError):
+                    # The worker died
+                    output = None
+                if output is None:
+                    worker = self._replace(worker)
+                idle.append(worker)
+                yield job_idx, NO_OUTPUT_MESSAGE if output is None else output
+
+            now = time.time()
+            for conn, (worker, job_idx, deadline) in list(busy.items()):
+                if deadline < now:
+                    busy.pop(conn)
+                    idle.append(self._replace(worker))
+                    yield job_idx, TIMEOUT_MESSAGE
+
+    def run(self, jobs, timeout=2):
+        """Run `jobs` [(user_code, input_str), ...], return their outputs in order."""
+        outputs = [None] * len(jobs)
+        for job_idx, output in self.imap(jobs, timeout=timeout):
+            outputs[job_idx] = output
+        return outputs
+
+
+_SANDBOX_POOL = None
+
+
+def get_sandbox_pool():
+    # One pool per process, the pool of a parent process is not usable in a forked child
+    global _SANDBOX_POOL
+    if _SANDBOX_POOL is None or _SANDBOX_POOL[0] != os.getpid():
+        _SANDBOX_POOL = (os.getpid(), SandboxPool())
+    return _SANDBOX_POOL[1]
+
+
+#########################################################
+### Implementation of the automatic code tester
+#########################################################
+
+
+class CodeTester:
+
+    TIMEOUT = 2
+
+    def __init__(self, user_code, test_cases, timeout=TIMEOUT, verbose=True):
+        self.user_code = user_code
+        self.test_cases = [test_cases] if isinstance(test_cases, dict) else test_cases
+        self.timeout = timeout
+        self.verbose = verbose
+
+    def run_user_code(self, input_data):
+        input_str = "\n".join(input_data) + "\n"
+        return get_sandbox_pool().run([(self.user_code, input_str)], timeout=self.timeout)[0]
 
     def evaluate_test_case(self, input_data, expected_output):
         output = self.run_user_code(input_data)
         return output == expected_output.rstrip(), output
 
+    def jobs(self):
+        """The sandbox jobs (user_code, input_str) of the test cases."""
+        return [(self.user_code, "\n".join(test_case["input"]) + "\n") for test_case in self.test_cases]
+
     def run_tests(self):
-        if isinstance(self.test_cases, dict):
-            self.test_cases = [self.test_cases]
+        outputs = get_sandbox_pool().run(self.jobs(), timeout=self.timeout)
+        return self.score(outputs)
+
+    def score(self, outputs):
+        """Compare the outputs of the test cases with the expected ones, return (score, results)."""
         total_tests = len(self.test_cases)
         passed_tests = 0
         results = []
 
-        for i, test_case in enumerate(self.test_cases, 1):
-            result, output = self.evaluate_test_case(
-                test_case["input"], test_case["expected"]
-            )
+        for i, (test_case, output) in enumerate(zip(self.test_cases, outputs), 1):
+            result = output == test_case["expected"].rstrip()
 
             test_result = {
                 "response": self.user_code,
@@ -1,6 +1,7 @@
 import pandas as pd
 from ...utils import can_infer, track_progress_rich, can_infer_lego
 from ...smp import *
+from .judge_util import get_judge_batch_size, judge_in_batch
 import numpy as np
 import re
 
@@ -310,12 +311,14 @@ def prefetch_answer(item):
     return can_infer(item['prediction'], choices)
 
 
-def extract_answer_from_item(model, item, dataset_name=None):
-    logger = get_logger('Evaluation')
-    # It will return: (pred, raw, llm_time)
+def _prefetch_option(item, dataset_name=None):
+    # The rule-based matching of `extract_answer_from_item`, dataset aware (e.g. LEGO)
     choices = build_choices(item)
-    option_str = build_option_str(choices)
+    return infer_option(item['prediction'], item, choices, dataset_name=dataset_name)
+
 
+def build_judge_prompt(item, dataset_name=None):
+    option_str = build_option_str(build_choices(item))
     if dataset_name == 'BLINK':
         prompt = build_prompt_blink(item['question'], option_str, item['prediction'])
     elif dataset_name == 'WeMath':
@@ -326,12 +329,23 @@ def extract_answer_from_item(model, item, dataset_name=None):
         prompt = build_prompt_LEGO(item['question'], option_str, item['prediction'],item['question_type'])
     else:
         prompt = build_prompt(item['question'], option_str, item['prediction'])
-    retry = 3
+    return prompt
+
 
+def infer_option(answer, item, choices, dataset_name=None):
     if dataset_name is not None and 'LEGO' in dataset_name:
-        ret = can_infer_lego(item['prediction'], item['question_type'], choices)
-    else:
-        ret = can_infer(item['prediction'], choices)
+        return can_infer_lego(answer, item['question_type'], choices)
+    return can_infer(answer, choices)
+
+
+def extract_answer_from_item(model, item, dataset_name=None):
+    logger = get_logger('Evaluation')
+    # It will return: (pred, raw, llm_time)
+    choices = build_choices(item)
+    prompt = build_judge_prompt(item, dataset_name=dataset_name)
+    retry = 3
+
+    ret = infer_option(item['prediction'], item, choices, dataset_name=dataset_name)
     if ret:
         return dict(opt=ret, log=item['prediction'])
     if model is None:
@@ -342,10 +356,7 @@ def extract_answer_from_item(model, item, dataset_name=None):
         if 'Failed to obtain answer via API' in ans:
             logger.warning('GPT API failed to answer. ')
         else:
-            if dataset_name is not None and 'LEGO' in dataset_name:
-                ret = can_infer_lego(ans, item['question_type'], choices)
-            else:
-                ret = can_infer(ans, choices)
+            ret = infer_option(ans, item, choices, dataset_name=dataset_name)
             if ret:
                 return dict(opt=ret, log=ans)
             else:
@@ -383,6 +394,18 @@ def prefetch_circular_group(sub_data, verbose=False):
     return ret if len(ret) > 1 else ret[0]
 
 
+def extract_answers_in_batch(model, items, dataset_name=None):
+    """Send the judge prompts of `items` in a single request (see `judge_in_batch`). Returns a dict mapping
+    the position of an item to its extraction result, items whose answer can not be parsed are left out."""
+    answers = judge_in_batch(model, [build_judge_prompt(item, dataset_name=dataset_name) for item in items])
+    ret = {}
+    for i, (item, ans) in enumerate(zip(items, answers)):
+        opt = infer_option(ans, item, build_choices(item), dataset_name=dataset_name) if ans is not None else False
+        if opt:
+            ret[i] = dict(opt=opt, log=ans)
+    return ret
+
+
 def eval_vanilla(model, item, dataset_name=None):
     res = extract_answer_from_item(model, item, dataset_name=dataset_name)
     opt, match_log = res['opt'], res['log']
@@ -392,6 +415,16 @@ def eval_vanilla(model, item, dataset_name=None):
         return dict(hit=0, log=f'Match Log: {match_log}. ')
 
 
+def eval_vanilla_batch(model, items, dataset_name=None):
+    batched = extract_answers_in_batch(model, items, dataset_name=dataset_name)
+    ret = []
+    for i, item in enumerate(items):
+        # Fall back to single-item requests for the items failed in the batched request
+        res = batched[i] if i in batched else extract_answer_from_item(model, item, dataset_name=dataset_name)
+        ret.append(dict(hit=int(res['opt'] == item['GT']), log=f"Match Log: {res['log']}. "))
+    return ret
+
+
 # For Circular Evaluation
 def eval_circular_group(model, sub_data, dataset_name=None):
     prefetched = prefetch_circular_group(sub_data, verbose=True)
@@ -403,12 +436,21 @@ def eval_circular_group(model, sub_data, dataset_name=None):
         return res
 
     lt = len(sub_data)
+    batched = {}
+    unmatched = [i for i in range(lt) if not PRED[i]]
+    if get_judge_batch_size() > 1 and len(unmatched) > 1:
+        items = [sub_data.iloc[i] for i in unmatched]
+        batched = {unmatched[k]: v for k, v in extract_answers_in_batch(model, items, dataset_name).items()}
+
     log = ''
     for i in range(lt):
         if PRED[i]:
             log += f'Rolling {i} Matched.\n'
         else:
-            res = extract_answer_from_item(model, sub_data.iloc[i], dataset_name=dataset_name)
+            if i in batched:
+                res = batched[i]
+            else:
+                res = extract_answer_from_item(model, sub_data.iloc[i], dataset_name=dataset_name)
             opt, match_log = res['opt'], res['log']
             PRED[i] = opt
             if PRED[i] != GT[i]:
@@ -447,13 +489,29 @@ def mcq_vanilla_eval(model, data, meta, nproc, result_file, dataset_name=None):
         if item['index'] not in result:
             items.append(item)
 
-    tups = [dict(model=model, item=x, dataset_name=dataset_name) for x in items]
-    keys = [x['index'] for x in items]
+    batch_size = get_judge_batch_size()
+    if batch_size > 1 and model is not None:
+        # Items resolved by prefetching need no judge call, pack the others into batched requests
+        for item in items:
+            if _prefetch_option(item, dataset_name=dataset_name):
+                result[item['index']] = eval_vanilla(model, item, dataset_name=dataset_name)
+        items = [x for x in items if x['index'] not in result]
+        dump(result, result_file)
+        chunks = [items[i: i + batch_size] for i in range(0, len(items), batch_size)]
+        tups = [dict(model=model, items=x, dataset_name=dataset_name) for x in chunks]
+        keys = [tuple(x['index'] for x in chunk) for chunk in chunks]
+        func = eval_vanilla_batch
+    else:
+        tups = [dict(model=model, item=x, dataset_name=dataset_name) for x in items]
+        keys = [x['index'] for x in items]
+        func = eval_vanilla
     if len(tups):
-        res = track_progress_rich(eval_vanilla, tups, nproc=nproc, chunksize=nproc, save=result_file, keys=keys)
+        res = track_progress_rich(func, tups, nproc=nproc, chunksize=nproc, save=result_file, keys=keys)
         result = load(result_file)
         for k, v in zip(keys, res):
-            if k not in result:
+            if isinstance(k, tuple):
+                result.update({kk: vv for kk, vv in zip(k, v) if kk not in result})
+            elif k not in result:
                 result[k] = v
     data['hit'] = [result[i]['hit'] for i in data['index']]
     data['log'] = [result[i]['log'] for i in data['index']]
@@ -483,22 +541,36 @@ def mcq_circular_eval(model, data, meta, nproc, result_file, dataset_name=None):
     data_main = data[data['tmp_flag']]
     data_main.pop('tmp_flag')
 
-    data_groups = []
-    for i in range(len(data_main)):
-        # Dealing with the normal part
-        idx = data_main.iloc[i]['index']
-        if idx not in result:
-            sub_data = data[data['g_index'] == idx]
-            data_groups.append(sub_data)
-
-    if len(data_groups):
-        prefetched = [prefetch_circular_group(g, verbose=False) for g in data_groups]
-        remain = []
-        for dg, pf in zip(data_groups, prefetched):
-            if pf is not None:
-                result[dg.iloc[0]['g_index']] = pf
-            else:
-                remain.append(dg)
+    # Only groups without a saved result need to be evaluated
+    pending = data[data['g_index'].isin(set(data_main['index']) - set(result))]
+
+    if len(pending):
+        # Prefetch all rows at once, then resolve whole groups (same logic as `prefetch_circular_group`)
+        option_cols = [ch for ch in string.ascii_uppercase if ch in pending]
+        options = pending[option_cols].to_numpy(dtype=object)
+        pred = np.array([
+            can_infer(p, {ch: v for ch, v in zip(option_cols, opts) if not pd.isna(v)})
+            for p, opts in zip(pending['prediction'], options)
+        ], dtype=object)
+        gt = pending['GT'].to_numpy(dtype=object)
+        match = pred == gt
+        wrong = np.array([bool(p) for p in pred]) & ~match
+
+        groups = pending.groupby('g_index', sort=False)
+        rolling = groups.cumcount().to_numpy()
+        all_match = pd.Series(match, index=pending.index).groupby(pending['g_index'], sort=False).all()
+        for pos in np.where(wrong)[0]:
+            g = pending['g_index'].iat[pos]
+            if g in result:
+                continue
+            result[g] = dict(hit=0, log=(
+                f'Failed in Prefetching Rolling {rolling[pos]}: Answer is {gt[pos]}, '
+                f"Prediction is {pending['prediction'].iat[pos]}, Pre-fetched is {pred[pos]}. "
+            ))
+        for g in all_match.index[all_match.to_numpy()]:
+            result[g] = dict(hit=1, log='Succeed During Pre-fetching')
+        # Only materialize the groups that still require judge calls
+        remain = [groups.get_group(g) for g in all_match.index if g not in result]
         dump(result, result_file)
 
         tups = [dict(model=model, sub_data=x, dataset_name=dataset_name) for x in remain]
@@ -525,9 +597,8 @@ def mcq_circular_eval(model, data, meta, nproc, result_file, dataset_name=None):
                 if k not in result:
                     result[k] = v
 
-    tmp_pth = f'/tmp/{timestr()}.xlsx'
-    dump(data_main, tmp_pth)
-    data_main = load(tmp_pth)
+    # Reset the index and re-infer the dtypes of object columns (no need for a round-trip through a tmp file)
+    data_main = data_main.reset_index(drop=True).infer_objects()
     indices = data_main['index']
     data_main['hit'] = [result[i]['hit'] for i in indices]
     data_main['log'] = [result[i]['log'] for i in indices]
@@ -16,6 +16,7 @@ from .Ocrbench_v2.IoUscore_metric import vqa_with_position_evaluation, calculate
 from .Ocrbench_v2.TEDS_metric import TEDS, convert_markdown_table_to_html, convert_str_to_dict, convert_str_to_multi_dict, generate_combinations, dict_to_html, compute_f1_score, doc_parsing_evaluation, wrap_html_table
 from .Ocrbench_v2.page_ocr_metric import cal_per_metrics
 from .Ocrbench_v2.spotting_metric import extract_bounding_boxes_robust, spotting_evaluation
+from .Ocrbench_v2.parallel import parallel_process
 
 
 def is_nan_value(value):
@@ -41,10 +42,20 @@ def calculate_average(scores_dict):
     return averages
 
 
+def tree_edit_job(func, pred, gt):
+    try:
+        return func(pred, gt)
+    except Exception as e:
+        return e
+
+
 def process_predictions(predict_file):
     teds = TEDS(n_jobs=32)
 
     res_data_list = []
+    # The tree edit distance jobs (TEDS / STEDS) are collected as (data_item, func, pred, gt, score on error)
+    # and scored in parallel after the loop, error score None means the error is raised
+    tree_jobs = []
 
     for index, data_item in enumerate(tqdm(predict_file)):
         if data_item["type"] == "APP agent en" or data_item["type"] == "ASCII art classification en" or data_item["type"] == "math QA en" \
@@ -168,10 +179,7 @@ def process_predictions(predict_file):
                     else:
                         pred_table_html = wrap_html_table(predict_table)
                         gold_table_html = wrap_html_table(data_item["answers"][0])
-                        try:
-                            data_item["score"] = teds.evaluate(pred_table_html, gold_table_html)
-                        except:
-                            data_item["score"] = 0
+                        tree_jobs.append((data_item, teds.evaluate, pred_table_html, gold_table_html, 0))
 
                 elif "markdown" in data_item["question"].lower():
                     if not isinstance(data_item["predict"], str):
@@ -179,12 +187,12 @@ def process_predictions(predict_file):
                         prediction = str(data_item["predict"])
                         pred_table_html = convert_markdown_table_to_html(prediction)
                         gt_table_html = convert_markdown_table_to_html(data_item["answers"][0])
-                        data_item["score"] = teds.evaluate(pred_table_html, gt_table_html)
+                        tree_jobs.append((data_item, teds.evaluate, pred_table_html, gt_table_html, None))
 
                     else:
                         pred_table_html = convert_markdown_table_to_html(data_item["predict"])
                         gt_table_html = convert_markdown_table_to_html(data_item["answers"][0])
-                        data_item["score"] = teds.evaluate(pred_table_html, gt_table_html)
+                        tree_jobs.append((data_item, teds.evaluate, pred_table_html, gt_table_html, None))
             else:
                 raise ValueError
 
@@ -206,11 +214,7 @@ def process_predictions(predict_file):
                 else:
                     pred_table_html = wrap_html_table(predict_table)
                     gold_table_html = wrap_html_table(data_item["answers"][0])
-                    try:
-                        data_item["score"] = teds.evaluate(pred_table_html, gold_table_html)
-                    except:
-                        data_item["score"] = 0
-                        print("error")
+                    tree_jobs.append((data_item, teds.evaluate, pred_table_html, gold_table_html, 0))
 
         elif data_item["type"] == "chart parsing en":
             answer = data_item["answers"][0]
@@ -222,17 +226,17 @@ def process_predictions(predict_file):
                 else:
                     pred_chart_html = dict_to_html(pred_chart_dict)
                     gt_chart_html = dict_to_html(answer)
-                    data_item["score"] = teds.evaluate(pred_chart_html, gt_chart_html)
+                    tree_jobs.append((data_item, teds.evaluate, pred_chart_html, gt_chart_html, None))
             else:
                 data_item["score"] = 0
 
         elif data_item["type"] == "document parsing en":
             assert type(data_item["answers"])==list and len(data_item["answers"]) == 1
-            data_item["score"] = doc_parsing_evaluation(data_item["predict"], data_item["answers"][0])
+            tree_jobs.append((data_item, doc_parsing_evaluation, data_item["predict"], data_item["answers"][0], None))
 
         elif data_item["type"] == "document parsing cn":
             assert type(data_item["answers"])==list and len(data_item["answers"]) == 1
-            data_item["score"] = doc_parsing_evaluation(data_item["predict"], data_item["answers"][0])
+            tree_jobs.append((data_item, doc_parsing_evaluation, data_item["predict"], data_item["answers"][0], None))
 
         elif data_item["type"] == "key information extraction en" or data_item["type"] == "key information mapping en":
             assert len(data_item["answers"]) == 1
@@ -352,6 +356,17 @@ def process_predictions(predict_file):
 
         res_data_list.append(data_item)
 
+    if len(tree_jobs):
+        n_jobs = min(teds.n_jobs, os.cpu_count() or 1)
+        scores = parallel_process(
+            [dict(func=func, pred=pred, gt=gt) for _, func, pred, gt, _ in tree_jobs], tree_edit_job,
+            n_jobs=n_jobs, use_kwargs=True, chunksize=max(1, len(tree_jobs) // (n_jobs * 4)))
+        for (data_item, _, _, _, error_score), score in zip(tree_jobs, scores):
+            if isinstance(score, Exception):
+                if error_score is None:
+                    raise score
+                score = error_score
+            data_item["score"] = score
 
     return res_data_list
 
@@ -0,0 +1,68 @@
+"""Shared edit distance kernels for the evaluators (ANLS, normalized edit distance, matching cost matrices).
+
+The kernels are backed by `rapidfuzz` (a C++ extension), and fall back to a pure-Python implementation if it is not
+installed. Inputs can be strings or sequences of hashable items (e.g., token lists).
+"""
+import numpy as np
+from ...smp import get_logger
+
+try:
+    from rapidfuzz.distance import Levenshtein as _Levenshtein
+    from rapidfuzz.process import cdist as _cdist
+except ImportError:
+    get_logger('Evaluation').warning(
+        'rapidfuzz is not installed, will use the (slow) pure-Python edit distance. '
+        'Please install it with `pip install rapidfuzz`. ')
+    _Levenshtein, _cdist = None, None
+
+
+def _levenshtein_py(s1, s2):
+    if len(s1) > len(s2):
+        s1, s2 = s2, s1
+
+    distances = range(len(s1) + 1)
+    for i2, c2 in enumerate(s2):
+        distances_ = [i2 + 1]
+        for i1, c1 in enumerate(s1):
+            if c1 == c2:
+                distances_.append(distances[i1])
+            else:
+                distances_.append(1 + min((distances[i1], distances[i1 + 1], distances_[-1])))
+        distances = distances_
+    return distances[-1]
+
+
+def levenshtein_distance(s1, s2):
+    """The Levenshtein distance (insertion, deletion and substitution all cost 1) between two sequences."""
+    if _Levenshtein is None:
+        return _levenshtein_py(s1, s2)
+    return _Levenshtein.distance(s1, s2)
+
+
+def normalized_levenshtein(s1, s2):
+    """The Levenshtein distance divided by the length of the longer sequence, 0 if both are empty."""
+    length = max(len(s1), len(s2))
+    return 0.0 if length == 0 else levenshtein_distance(s1, s2) / length
+
+
+def levenshtein_matrix(queries, choices, normalize=False, workers=1):
+    """The pairwise distances between `queries` and `choices` (many-to-many), as a [len(queries), len(choices)]
+    array. If `normalize`, distances are divided by the length of the longer sequence (0 if both are empty).
+    `workers` is the number of threads used by rapidfuzz (-1 means all cores)."""
+    queries, choices = list(queries), list(choices)
+    if len(queries) == 0 or len(choices) == 0:
+        return np.zeros((len(queries), len(choices)), dtype=np.float64 if normalize else np.int64)
+    if _cdist is None:
+        dist = np.array([[_levenshtein_py(q, c) for c in choices] for q in queries], dtype=np.int64)
+    else:
+        dist = _cdist(queries, choices, scorer=_Levenshtein.distance, dtype=np.int64, workers=workers)
+    if not normalize:
+        return dist
+    length = np.maximum(
+        np.array([len(q) for q in queries])[:, None], np.array([len(c) for c in choices])[None, :])
+    return np.divide(dist, length, out=np.zeros(dist.shape, dtype=np.float64), where=length > 0)
+
+
+def levenshtein_one_to_many(query, choices, normalize=False):
+    """The distances between `query` and each of the `choices` (one-to-many), as a 1D array."""
+    return levenshtein_matrix([query], choices, normalize=normalize)[0]
@@ -2,6 +2,7 @@ import os
 import re
 import warnings
 import pandas as pd
+from ...smp import load
 from functools import reduce
 
 rotations_all = ['rot0', 'rot90', 'rot180', 'rot270']
@@ -74,7 +75,7 @@ def rotational_eval(eval_file):
     for rot, path in rotation_files.items():
         filename = os.path.basename(path)
         if os.path.exists(path):
-            df_rot = pd.read_excel(path)[['index', 'category', 'hit']]
+            df_rot = load(path)[['index', 'category', 'hit']]
             df_rot.rename(columns={'hit': f'hit_{rot}'}, inplace=True)
             data.append(df_rot)
         else:
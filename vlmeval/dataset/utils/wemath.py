@@ -1,6 +1,7 @@
 # pylint: skip-file
 
 import pandas as pd
+from ...smp import load
 import json
 import numpy as np
 import os
@@ -23,7 +24,7 @@ def evaluate_evaluate_steps(json, steps):  # noqa
 
 # Function to load and process JSON data
 def load_and_process_data(filepath):
-    df = pd.read_excel(filepath)
+    df = load(filepath)
     if 'hit' not in df.columns:
         df['processed_answer'] = (
             df['prediction']
@@ -1,5 +1,6 @@
 from abc import abstractmethod
 from ..smp import *
+from .utils.frame_extractor import frame_size_tag, save_frames
 
 
 class VideoBaseDataset:
@@ -23,8 +24,10 @@ class VideoBaseDataset:
         lmu_root = LMUDataRoot()
         self.frame_root = osp.join(lmu_root, 'images', dataset)
         os.makedirs(self.frame_root, exist_ok=True)
-        self.frame_tmpl = 'frame-{}-of-{}.jpg'
-        self.frame_tmpl_fps = 'frame-{}-of-{}-{}fps.jpg'
+        # Frames downscaled with `VIDEO_FRAME_MAX_SIZE` are saved to file names of their own
+        size_tag = frame_size_tag()
+        self.frame_tmpl = 'frame-{}-of-{}' + size_tag + '.jpg'
+        self.frame_tmpl_fps = 'frame-{}-of-{}-{}fps' + size_tag + '.jpg'
 
         self.data_root = ret['root']
         self.data_file = ret['data_file']
@@ -56,6 +59,7 @@ class VideoBaseDataset:
             assert idx < len(self.data)
             return dict(self.data.iloc[idx])
 
+    # Each video has a frame directory of its own, as expected by `save_frames`
     def frame_paths(self, video):
         frame_root = osp.join(self.frame_root, video)
         os.makedirs(frame_root, exist_ok=True)
@@ -97,11 +101,7 @@ class VideoBaseDataset:
             with portalocker.Lock(lock_path, 'w', timeout=30):
                 if np.all([osp.exists(p) for p in frame_paths]):
                     return frame_paths
-                images = [vid[i].asnumpy() for i in indices]
-                images = [Image.fromarray(arr) for arr in images]
-                for im, pth in zip(images, frame_paths):
-                    if not osp.exists(pth):
-                        im.save(pth)
+                save_frames(vid, indices, frame_paths)
             return frame_paths
 
         else:
@@ -117,11 +117,7 @@ class VideoBaseDataset:
                 vid = decord.VideoReader(vid_path)
                 step_size = len(vid) / (self.nframe + 1)
                 indices = [int(i * step_size) for i in range(1, self.nframe + 1)]
-                images = [vid[i].asnumpy() for i in indices]
-                images = [Image.fromarray(arr) for arr in images]
-                for im, pth in zip(images, frame_paths):
-                    if not osp.exists(pth):
-                        im.save(pth)
+                save_frames(vid, indices, frame_paths)
             return frame_paths
 
     # Return a list of dataset names that are supported by this class, can override
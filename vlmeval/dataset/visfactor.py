@@ -2,6 +2,9 @@ import re
 from vlmeval import *
 from .image_base import ImageBaseDataset
 
+JSON_ANSWER_PATTERN = re.compile(r'\{\s*"answer"\s*:\s*(.+?)\s*\}')
+NUMBER_PATTERN = re.compile(r'\d+')
+
 
 class VisFactor(ImageBaseDataset):
     TYPE = 'VQA'
@@ -28,6 +31,13 @@ class VisFactor(ImageBaseDataset):
         'VisFactor_GH_CoT': '03c902ea44da8469814a8c1933baa923',
     }
 
+    # Subtests grouped by the answer format
+    TF_SUBTESTS = ['CF1', 'CF2', 'MV1', 'MV2', 'MV3', 'P3', 'RL2', 'S1', 'S2', 'SS2', 'VZ1', 'VZ2']
+    CHOICE_SUBTESTS = ['CS1', 'CS2', 'CS3']
+    EXTRACT_SUBTESTS = ['CF3', 'I3', 'MA1', 'SS3', 'VZ3']
+    TRUE_WORDS = ['t', 'y', '1', 'true', 'yes']
+    FALSE_WORDS = ['f', 'n', '0', 'false', 'no']
+
     def replace_additional_tags(self, text, additional):
         def replacer(match):
             index = int(match.group(1))
@@ -42,12 +52,11 @@ class VisFactor(ImageBaseDataset):
         return [part for part in parts if part != '']
 
     def extract_last_json_answer(self, s):
-        pattern = r'\{\s*"answer"\s*:\s*(.+?)\s*\}'
-        matches = list(re.finditer(pattern, s))
+        matches = JSON_ANSWER_PATTERN.findall(s)
         if not matches:
             return ''
 
-        raw_value = matches[-1].group(1).strip()
+        raw_value = matches[-1].strip()
 
         if (raw_value.startswith('"') and raw_value.endswith('"')) or \
            (raw_value.startswith("'") and raw_value.endswith("'")):
@@ -55,7 +64,7 @@ class VisFactor(ImageBaseDataset):
         return raw_value
 
     def extract_last_numbers(self, s):
-        return [num for num in re.findall(r'\d+', s)]
+        return NUMBER_PATTERN.findall(s)
 
     def extract_last_uppercase_letter(self, s):
         for char in reversed(s):
@@ -86,63 +95,59 @@ class VisFactor(ImageBaseDataset):
 
         return msgs
 
-    def evaluate(self, eval_file, **judge_kwargs):
-        data = load(eval_file)
-        subtests = sorted(set([str(i) for i in data['category_id']]))
-        accuracy = {key: {} for key in subtests}
-
-        for index, row in data.iterrows():
-            cid = str(row['category_id'])
-            prediction = self.extract_last_json_answer(str(row['prediction']))
-            answer = str(row['answer'])
-            additional = str(row['additional'])
-
-            if (cid in ['CF1', 'CF2', 'MV1', 'MV2', 'MV3', 'P3', 'RL2', 'S1', 'S2', 'SS2', 'VZ1', 'VZ2']) or \
-               (cid == 'VZ3' and not additional.isdigit()):
-                if prediction.lower() in ['t', 'y', '1', 'true', 'yes']:
-                    data.at[index, 'pred'] = 'T'
-                elif prediction.lower() in ['f', 'n', '0', 'false', 'no']:
-                    data.at[index, 'pred'] = 'F'
-                else:
-                    data.at[index, 'pred'] = ''
-                data.at[index, 'correct'] = (data.at[index, 'pred'] == answer)
-            elif cid in ['CS1', 'CS2', 'CS3']:
-                data.at[index, 'pred'] = prediction
-                data.at[index, 'correct'] = (data.at[index, 'pred'].lower() in [i.lower() for i in answer.split(',')])
-            elif cid in ['CF3', 'I3', 'MA1', 'SS3', 'VZ3']:
-                if prediction == '':
-                    prediction = str(row['prediction'])
-                if cid == 'VZ3':
-                    prediction = self.extract_last_uppercase_letter(prediction)
-                elif cid == 'CF3':
-                    prediction = self.extract_last_numbers(prediction)
-                    prediction = '' if len(prediction) < 2 else f'({prediction[-2]}, {prediction[-1]})'
-                else:
-                    prediction = self.extract_last_numbers(prediction)
-                    prediction = '' if len(prediction) < 1 else prediction[-1]
-                data.at[index, 'pred'] = prediction
-                data.at[index, 'correct'] = (data.at[index, 'pred'] == answer)
-
-        for index, row in data.iterrows():
-            cid = str(row['category_id'])
-            eid = str(row['eval_index'])
-            if eid not in accuracy[cid]:
-                accuracy[cid][eid] = [row['correct']]
-            else:
-                accuracy[cid][eid].append(row['correct'])
-
-        for subtest in accuracy:
-            for eval_index in accuracy[subtest]:
-                accuracy[subtest][eval_index] = 1 if all(accuracy[subtest][eval_index]) else 0
+    def score(self, data):
+        """Add the `pred` and `correct` columns to `data`, processing each subtest family as a whole column."""
+        raw = data['prediction'].astype(str)
+        cid = data['category_id'].astype(str)
+        answer = data['answer'].astype(str)
+        # VZ3 items with a non-numeric `additional` field are true / false questions
+        tf = cid.isin(self.TF_SUBTESTS) | ((cid == 'VZ3') & ~data['additional'].astype(str).str.isdigit())
+        choice = cid.isin(self.CHOICE_SUBTESTS)
+        extract = cid.isin(self.EXTRACT_SUBTESTS) & ~tf
+
+        prediction = raw.str.findall(JSON_ANSWER_PATTERN).str[-1].fillna('').str.strip()
+        quoted = (prediction.str.startswith('"') & prediction.str.endswith('"')) | \
+            (prediction.str.startswith("'") & prediction.str.endswith("'"))
+        prediction[quoted] = prediction[quoted].str[1:-1]
+
+        pred = pd.Series(np.nan, index=data.index, dtype=object)
+        correct = pd.Series(np.nan, index=data.index, dtype=object)
+
+        lower = prediction[tf].str.lower()
+        pred[tf] = np.select([lower.isin(self.TRUE_WORDS), lower.isin(self.FALSE_WORDS)], ['T', 'F'], '')
+        correct[tf] = pred[tf] == answer[tf]
+
+        pred[choice] = prediction[choice]
+        correct[choice] = [
+            p.lower() in [x.lower() for x in a.split(',')] for p, a in zip(prediction[choice], answer[choice])
+        ]
+
+        # Fall back to the raw response if there is no json answer
+        text = prediction[extract].where(prediction[extract] != '', raw[extract])
+        numbers = text.str.findall(NUMBER_PATTERN)
+        sub_cid = cid[extract]
+        pred[extract] = numbers.str[-1].fillna('')
+        cf3 = sub_cid == 'CF3'
+        pred[cf3.index[cf3]] = [f'({x[-2]}, {x[-1]})' if len(x) >= 2 else '' for x in numbers[cf3]]
+        vz3 = sub_cid == 'VZ3'
+        pred[vz3.index[vz3]] = [self.extract_last_uppercase_letter(x) for x in text[vz3]]
+        correct[extract] = pred[extract] == answer[extract]
+
+        data['pred'] = pred
+        data['correct'] = correct
+        return data
 
-        for subtest in accuracy:
-            results = [accuracy[subtest][eval_index] for eval_index in accuracy[subtest]]
-            accuracy[subtest] = sum(results) / len(results)
+    def evaluate(self, eval_file, **judge_kwargs):
+        data = self.score(load(eval_file))
 
-        accuracy['ALL'] = sum([accuracy[s] for s in accuracy]) / len([accuracy[s] for s in accuracy])
+        # An item (eval_index) counts as correct only if all of its questions are answered correctly
+        correct = data['correct'].map(bool)
+        item_correct = correct.groupby([data['category_id'].astype(str), data['eval_index'].astype(str)]).all()
+        accuracy = {k: float(v) for k, v in item_correct.astype(int).groupby(level=0).mean().items()}
+        accuracy['ALL'] = sum(accuracy.values()) / len(accuracy)
 
-        data.to_csv(eval_file.replace('.xlsx', '.csv'), index=False)
-        with open(eval_file.replace('.xlsx', '_acc.csv'), 'w') as f:
+        data.to_csv(get_intermediate_file_path(eval_file, '', 'csv'), index=False)
+        with open(get_intermediate_file_path(eval_file, '_acc', 'csv'), 'w') as f:
             for key in accuracy:
                 f.write(f'{key},{accuracy[key]}\n')
 
@@ -104,7 +104,7 @@ class VLRewardBench(ImageBaseDataset):
     def evaluate(self, eval_file, **judge_kwargs):
         suffix = eval_file.split('.')[-1]
         model = judge_kwargs['model']
-        storage = eval_file.replace(f'.{suffix}', f'_{model}.xlsx')
+        storage = get_intermediate_file_path(eval_file, f'_{model}')
         score_file = eval_file.replace(f'.{suffix}', f'_{model}_score.csv')
         tmp_file = eval_file.replace(f'.{suffix}', f'_{model}.pkl')
         nproc = judge_kwargs.pop('nproc', 4)
@@ -1,6 +1,7 @@
 # flake8: noqa
 import os
 import pandas as pd
+from ..smp import load, get_intermediate_file_path
 from .image_base import ImageBaseDataset
 from .utils.vlm2bench import (
     common_process_results,
@@ -53,11 +54,17 @@ class VLM2Bench(ImageBaseDataset):
         msgs.append({"type": "text", "value": prompt})
         return msgs
 
+    @staticmethod
+    def _load_predictions(pth):
+        if pth.lower().endswith(".tsv"):
+            return pd.read_csv(pth, sep="\t", encoding="latin1", engine="python")
+        return load(pth)
+
     @classmethod
     def evaluate(cls, eval_file, **judge_kwargs):
         """
         Evaluation function:
-        - Automatically read the model prediction result file (xlsx or TSV), which contains fields: index, question, answer, category, prediction
+        - Automatically read the model prediction result file (parquet, xlsx or TSV), which contains fields: index, question, answer, category, prediction
         - Directly use the original fields for evaluation without additional conversion;
         - For categories "oc-cnt" or "pc-cnt", calculate image_seq_len based on the "image" field (stored as a regular multi-image encoding)
           and write it into each record;
@@ -70,24 +77,12 @@ class VLM2Bench(ImageBaseDataset):
         model = judge_kwargs.get("model")
         if model:
             suffix = eval_file.split('.')[-1]
-            storage = eval_file.replace(f'.{suffix}', f'_{model}.xlsx')
+            storage = get_intermediate_file_path(eval_file, f'_{model}')
             score_file = eval_file.replace(f'.{suffix}', f'_{model}_score.csv')
             tmp_file = eval_file.replace(f'.{suffix}', f'_{model}.pkl')
-            if os.path.exists(storage):
-                if storage.lower().endswith(".xlsx"):
-                    data = pd.read_excel(storage)
-                else:
-                    data = pd.read_csv(storage, sep="\t", encoding="latin1", engine="python")
-            else:
-                if eval_file.lower().endswith(".xlsx"):
-                    data = pd.read_excel(eval_file)
-                else:
-                    data = pd.read_csv(eval_file, sep="\t", encoding="latin1", engine="python")
+            data = cls._load_predictions(storage if os.path.exists(storage) else eval_file)
         else:
-            if eval_file.lower().endswith(".xlsx"):
-                data = pd.read_excel(eval_file)
-            else:
-                data = pd.read_csv(eval_file, sep="\t", encoding="latin1", engine="python")
+            data = cls._load_predictions(eval_file)
 
         results = data.to_dict(orient="records")
         processed = common_process_results(results)
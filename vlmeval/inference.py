@@ -1,12 +1,19 @@
 import torch
 import torch.distributed as dist
 from vlmeval.config import supported_VLM
-from vlmeval.utils import track_progress_rich
+from vlmeval.vlm.base import BaseModel
+from vlmeval.utils import track_progress_rich, ShardQueue, prefetch_map, prefetch_iter
+from vlmeval.api.metrics import summarize_api_metrics
 from vlmeval.smp import *
 
 FAIL_MSG = 'Failed to obtain answer via API.'
 
 
+def get_api_metrics_file(work_dir, model_name, dataset_name):
+    # The per-call telemetry of the API models (see `vlmeval/api/metrics.py`), kept next to the predictions
+    return osp.join(work_dir, f'{model_name}_{dataset_name}_api_metrics.jsonl')
+
+
 def parse_args():
     parser = argparse.ArgumentParser()
     parser.add_argument('--data', type=str, nargs='+', required=True)
@@ -31,28 +38,16 @@ def infer_data_api(model, work_dir, model_name, dataset, index_set=None, api_npr
     if hasattr(model, 'set_dump_image'):
         model.set_dump_image(dataset.dump_image)
 
-    lt, indices = len(data), list(data['index'])
-
-    structs = []
-    for i in range(lt):
-        item = data.iloc[i]
-        if hasattr(model, 'use_custom_prompt') and model.use_custom_prompt(dataset_name):
-            assert hasattr(model, 'build_prompt')
-            struct = model.build_prompt(item, dataset=dataset_name)
-        else:
-            struct = dataset.build_prompt(item)
-        structs.append(struct)
-
     out_file = f'{work_dir}/{model_name}_{dataset_name}_supp.pkl'
 
     # To reuse records in MMBench_V11
     if dataset_name in ['MMBench', 'MMBench_CN']:
-        v11_pred = f'{work_dir}/{model_name}_{dataset_name}_V11.xlsx'
-        if osp.exists(v11_pred):
+        v11_pred = find_pred_file(work_dir, model_name, f'{dataset_name}_V11')
+        if v11_pred is not None:
             try:
                 reuse_inds = load('http://opencompass.openxlab.space/utils/mmb_reuse.pkl')
-                data = load(v11_pred)
-                ans_map = {x: y for x, y in zip(data['index'], data['prediction']) if x in reuse_inds}
+                v11_data = load(v11_pred)
+                ans_map = {x: y for x, y in zip(v11_data['index'], v11_data['prediction']) if x in reuse_inds}
                 dump(ans_map, out_file)
             except Exception as err:
                 print(type(err), err)
@@ -63,14 +58,32 @@ def infer_data_api(model, work_dir, model_name, dataset, index_set=None, api_npr
         if ignore_failed:
             res = {k: v for k, v in res.items() if FAIL_MSG not in v}
 
-    structs = [s for i, s in zip(indices, structs) if i not in res]
-    indices = [i for i in indices if i not in res]
-
-    gen_func = model.generate
-    structs = [dict(message=struct, dataset=dataset_name) for struct in structs]
+    data = data[~data['index'].isin(list(res))]
+    indices = list(data['index'])
 
-    if len(structs):
-        track_progress_rich(gen_func, structs, nproc=api_nproc, chunksize=api_nproc, save=out_file, keys=indices)
+    def build_struct(i):
+        item = data.iloc[i]
+        if hasattr(model, 'use_custom_prompt') and model.use_custom_prompt(dataset_name):
+            assert hasattr(model, 'build_prompt')
+            return model.build_prompt(item, dataset=dataset_name)
+        return dataset.build_prompt(item)
+
+    def gen_func(prompt):
+        return model.generate(message=prompt(), dataset=dataset_name)
+
+    if len(indices):
+        if hasattr(model, 'set_metrics_file'):
+            model.set_metrics_file(get_api_metrics_file(work_dir, model_name, dataset_name))
+        # Prompts (and images) are prepared in the background while earlier requests are in flight,
+        # so the first request goes out immediately instead of after building all prompts
+        prompts = prefetch_map(build_struct, range(len(indices)), nproc=min(api_nproc, 8), buffer=2 * api_nproc)
+        try:
+            track_progress_rich(gen_func, prompts, nproc=api_nproc, chunksize=api_nproc, save=out_file, keys=indices)
+        finally:
+            # Stop preparing the remaining prompts if the generation aborted
+            prompts.close()
+            if hasattr(model, 'set_metrics_file'):
+                model.set_metrics_file(None)
 
     res = load(out_file)
     if index_set is not None:
@@ -79,34 +92,32 @@ def infer_data_api(model, work_dir, model_name, dataset, index_set=None, api_npr
     return res
 
 
-def infer_data(model, model_name, work_dir, dataset, out_file, verbose=False, api_nproc=4, use_vllm=False):
+def infer_data(
+    model, model_name, work_dir, dataset, out_file, verbose=False, api_nproc=4, use_vllm=False, queue=None
+):
     dataset_name = dataset.dataset_name
     prev_file = f'{work_dir}/{model_name}_{dataset_name}_PREV.pkl'
-    res = load(prev_file) if osp.exists(prev_file) else {}
-    if osp.exists(out_file):
-        res.update(load(out_file))
+    prev = load(prev_file) if osp.exists(prev_file) else {}
+    res = load(out_file) if osp.exists(out_file) else {}
+    # Finished items are appended to the log one by one, and compacted into `out_file` only once at the end
+    log = ResultLog(osp.splitext(out_file)[0] + '.records')
+    res.update(log.load())
 
     rank, world_size = get_rank_and_world_size()
-    sheet_indices = list(range(rank, len(dataset), world_size))
-    lt = len(sheet_indices)
-    data = dataset.data.iloc[sheet_indices]
-    data_indices = [i for i in data['index']]
+    # Finished records are shared by all ranks, only rank 0 carries them to the output file
+    if rank == 0:
+        res = {**prev, **res}
+    data = dataset.data
+    data_indices = list(data['index'])
+    index_set = set(data_indices)
 
     # If finished, will exit without building the model
-    all_finished = True
-    for i in range(lt):
-        idx = data.iloc[i]['index']
-        if idx not in res:
-            all_finished = False
-    if all_finished:
-        res = {k: res[k] for k in data_indices}
+    if all(idx in res or idx in prev for idx in data_indices):
+        res = {k: v for k, v in res.items() if k in index_set}
         dump(res, out_file)
+        log.remove()
         return model
 
-    # Data need to be inferred
-    data = data[~data['index'].isin(res)]
-    lt = len(data)
-
     kwargs = {}
     if model_name is not None and (
         'Llama-4' in model_name
@@ -120,61 +131,155 @@ def infer_data(model, model_name, work_dir, dataset, out_file, verbose=False, ap
     # (In VLMEvalKit, we use torchrun to launch multiple model instances on a single node).
     # To bypass this problem, we unset `WORLD_SIZE` before building the model to not use TP parallel.
     ws_bak = os.environ.pop('WORLD_SIZE', None)
-    model = supported_VLM[model_name](**kwargs) if isinstance(model, str) else model
+    if isinstance(model, str):
+        with timer('build_model', model=model_name):
+            model = supported_VLM[model_name](**kwargs)
     if ws_bak:
         os.environ['WORLD_SIZE'] = ws_bak
 
     is_api = getattr(model, 'is_api', False)
     if is_api:
-        lt, indices = len(data), list(data['index'])
-        supp = infer_data_api(
-            model=model,
-            work_dir=work_dir,
-            model_name=model_name,
-            dataset=dataset,
-            index_set=set(indices),
-            api_nproc=api_nproc)
+        indices = [i for i in data_indices if i not in res and i not in prev]
+        with timer('generate', samples=len(indices)):
+            supp = infer_data_api(
+                model=model,
+                work_dir=work_dir,
+                model_name=model_name,
+                dataset=dataset,
+                index_set=set(indices),
+                api_nproc=api_nproc)
         for idx in indices:
             assert idx in supp
         res.update(supp)
-        res = {k: res[k] for k in data_indices}
+        res = {k: v for k, v in res.items() if k in index_set}
         dump(res, out_file)
+        log.remove()
         return model
     else:
         model.set_dump_image(dataset.dump_image)
 
-    for i in tqdm(range(lt), desc=f'Infer {model_name}/{dataset_name}, Rank {rank}/{world_size}'):
-        idx = data.iloc[i]['index']
-        if idx in res:
-            continue
-
+    def build_struct(i):
         if hasattr(model, 'use_custom_prompt') and model.use_custom_prompt(dataset_name):
-            struct = model.build_prompt(data.iloc[i], dataset=dataset_name)
-        else:
-            struct = dataset.build_prompt(data.iloc[i])
+            return model.build_prompt(data.iloc[i], dataset=dataset_name)
+        return dataset.build_prompt(data.iloc[i])
 
+    def generate(struct):
         # If `SKIP_ERR` flag is set, the model will skip the generation if error is encountered
         if os.environ.get('SKIP_ERR', False) == '1':
             FAIL_MSG = 'Failed to obtain answer'
             try:
-                response = model.generate(message=struct, dataset=dataset_name)
+                return model.generate(message=struct, dataset=dataset_name)
             except RuntimeError as err:
                 torch.cuda.synchronize()
                 warnings.warn(f'{type(err)} {str(err)}')
-                response = f'{FAIL_MSG}: {type(err)} {str(err)}'
-        else:
-            response = model.generate(message=struct, dataset=dataset_name)
-        torch.cuda.empty_cache()
+                return f'{FAIL_MSG}: {type(err)} {str(err)}'
+        return model.generate(message=struct, dataset=dataset_name)
+
+    def generate_batch(structs):
+        if os.environ.get('SKIP_ERR', False) == '1':
+            try:
+                return model.generate_batch(structs, dataset=dataset_name, batch_size=batch_size)
+            except RuntimeError as err:
+                # Retry one by one, so that only the failed samples are skipped
+                torch.cuda.synchronize()
+                warnings.warn(f'{type(err)} {str(err)}')
+                torch.cuda.empty_cache()
+                return [generate(struct) for struct in structs]
+        return model.generate_batch(structs, dataset=dataset_name, batch_size=batch_size)
 
+    def record(i, response):
+        idx = data_indices[i]
         if verbose:
             print(response, flush=True)
-
         res[idx] = response
-        if (i + 1) % 10 == 0:
-            dump(res, out_file)
-
-    res = {k: res[k] for k in data_indices}
-    dump(res, out_file)
+        log.append(idx, response)
+        pbar.update(1)
+
+    # Models that support batch generation process `INFER_BATCH_SIZE` samples at once (opt-in, 1 by default)
+    batch_size = 1
+    if hasattr(model, 'support_batch_generate') and model.support_batch_generate(dataset_name):
+        if getattr(model, 'use_vllm', False):
+            # The vLLM engine schedules the requests itself (continuous batching), submit large chunks of samples
+            batch_size = int(os.environ.get('INFER_VLLM_BATCH_SIZE', 256))
+        else:
+            batch_size = int(os.environ.get('INFER_BATCH_SIZE', 1))
+    batched = batch_size > 1
+
+    # Chunks are prepared in background threads, their timings are attached to the stage of the caller
+    stage = current_stage()
+
+    def prepare(chunk):
+        # Build the prompts of the unfinished rows of a chunk, and let the model preprocess their inputs
+        rows = []
+        for i in chunk:
+            if data_indices[i] in res or data_indices[i] in prev:
+                continue
+            with timer('build_prompt', parent=stage):
+                struct = build_struct(i)
+            if hasattr(model, 'prefetch'):
+                try:
+                    with timer('prefetch', parent=stage):
+                        model.prefetch(struct, dataset=dataset_name)
+                except Exception as err:
+                    # The inputs will be prepared (and the error raised if any) by the generation itself
+                    warnings.warn(f'Failed to prefetch the inputs of sample {data_indices[i]}: {type(err)} {str(err)}')
+            rows.append((i, struct))
+        return rows
+
+    # Rows are pulled from the shared queue chunk by chunk, fall back to static striding without a queue
+    chunks = queue if queue is not None else [[i] for i in range(rank, len(data), world_size)]
+    # For the models that preprocess their inputs ahead (`prefetch_inner`), the next chunks are prepared by
+    # `INFER_PREFETCH_NPROC` background threads while the model generates
+    prefetch_nproc = int(os.environ.get('INFER_PREFETCH_NPROC', 2))
+    if not (isinstance(model, BaseModel) and type(model).prefetch_inner is not BaseModel.prefetch_inner):
+        prefetch_nproc = 0
+    if prefetch_nproc > 0 and queue is not None:
+        # Pull a single chunk ahead of the one being generated, so that the shared queue still balances the tail.
+        # The chunk being consumed holds one of the `buffer` slots
+        prepared = prefetch_iter(prepare, chunks, nproc=1, buffer=2)
+    elif prefetch_nproc > 0:
+        prepared = prefetch_iter(prepare, chunks, nproc=prefetch_nproc, buffer=2 * prefetch_nproc)
+    else:
+        prepared = map(prepare, chunks)
+
+    # The rows still to run by this rank; with the shared queue, its share is only known approximately
+    candidates = range(len(data)) if queue is not None else range(rank, len(data), world_size)
+    num_todo = sum(1 for i in candidates if data_indices[i] not in res and data_indices[i] not in prev)
+    if queue is not None:
+        num_todo = (num_todo + world_size - 1) // world_size
+    pbar = tqdm(total=num_todo, desc=f'Infer {model_name}/{dataset_name}, Rank {rank}/{world_size}')
+    pending = []
+    for rows in prepared:
+        if batched:
+            # Rows of several chunks are gathered to fill a batch
+            pending.extend(rows)
+            while len(pending) >= batch_size:
+                rows, pending = pending[:batch_size], pending[batch_size:]
+                with timer('generate', samples=len(rows)):
+                    responses = generate_batch([struct for _, struct in rows])
+                for (i, _), response in zip(rows, responses):
+                    record(i, response)
+                torch.cuda.empty_cache()
+        else:
+            for i, struct in rows:
+                with timer('generate', samples=1):
+                    response = generate(struct)
+                torch.cuda.empty_cache()
+                record(i, response)
+        # Make sure the results of each finished chunk are on disk
+        log.sync()
+    if len(pending):
+        with timer('generate', samples=len(pending)):
+            responses = generate_batch([struct for _, struct in pending])
+        for (i, _), response in zip(pending, responses):
+            record(i, response)
+        log.sync()
+    pbar.close()
+
+    res = {k: v for k, v in res.items() if k in index_set}
+    with timer('dump_results'):
+        dump(res, out_file)
+    log.remove()
     return model
 
 
@@ -184,32 +289,55 @@ def infer_data_job(
 ):
     rank, world_size = get_rank_and_world_size()
     dataset_name = dataset.dataset_name
-    result_file = osp.join(work_dir, f'{model_name}_{dataset_name}.xlsx')
+    result_file = get_pred_file_path(work_dir, model_name, dataset_name)
+    # Predictions may exist in another format (e.g., xlsx files from previous runs)
+    exist_file = find_pred_file(work_dir, model_name, dataset_name)
 
     prev_file = f'{work_dir}/{model_name}_{dataset_name}_PREV.pkl'
-    if osp.exists(result_file):
-        if rank == 0:
-            data = load(result_file)
-            results = {k: v for k, v in zip(data['index'], data['prediction'])}
-            if not ignore_failed:
-                results = {k: v for k, v in results.items() if FAIL_MSG not in str(v)}
-            dump(results, prev_file)
-        if world_size > 1:
-            dist.barrier()
-
     tmpl = osp.join(work_dir, '{}' + f'{world_size}_{dataset_name}.pkl')
     out_file = tmpl.format(rank)
+    # Rows are handed out to ranks dynamically in small chunks (work stealing)
+    queue = ShardQueue(
+        osp.join(work_dir, f'{model_name}_{dataset_name}_{world_size}_queue.txt'),
+        total=len(dataset),
+        chunk_size=int(os.environ.get('INFER_CHUNK_SIZE', 4)))
+
+    if rank == 0:
+        with timer('merge_previous'):
+            results = load(prev_file) if osp.exists(prev_file) else {}
+            if exist_file is not None:
+                data = load(exist_file)
+                results = {k: v for k, v in zip(data['index'], data['prediction'])}
+                if not ignore_failed:
+                    results = {k: v for k, v in results.items() if FAIL_MSG not in str(v)}
+            # Since rows are not bound to ranks, merge partial results of interrupted runs so that all ranks
+            # start from the same set of finished records
+            logs = [ResultLog(osp.splitext(tmpl.format(i))[0] + '.records') for i in range(world_size)]
+            for i in range(world_size):
+                if osp.exists(tmpl.format(i)):
+                    results.update(load(tmpl.format(i)))
+                results.update(logs[i].load())
+            if len(results):
+                dump(results, prev_file)
+            for i in range(world_size):
+                if osp.exists(tmpl.format(i)):
+                    os.remove(tmpl.format(i))
+                logs[i].remove()
+            queue.reset()
+    if world_size > 1:
+        dist.barrier()
 
     model = infer_data(
         model=model, work_dir=work_dir, model_name=model_name, dataset=dataset,
-        out_file=out_file, verbose=verbose, api_nproc=api_nproc, use_vllm=use_vllm)
+        out_file=out_file, verbose=verbose, api_nproc=api_nproc, use_vllm=use_vllm, queue=queue)
     if world_size > 1:
         dist.barrier()
 
     if rank == 0:
-        data_all = {}
-        for i in range(world_size):
-            data_all.update(load(tmpl.format(i)))
+        with timer('merge_results'):
+            data_all = {}
+            for i in range(world_size):
+                data_all.update(load(tmpl.format(i)))
 
         data = dataset.data
         for x in data['index']:
@@ -218,9 +346,17 @@ def infer_data_job(
         if 'image' in data:
             data.pop('image')
 
-        dump(data, result_file)
+        with timer('dump_predictions'):
+            dump(data, result_file)
         for i in range(world_size):
             os.remove(tmpl.format(i))
+        queue.remove()
+
+        metrics = summarize_api_metrics(get_api_metrics_file(work_dir, model_name, dataset_name))
+        if metrics is not None:
+            logger = get_logger('RUN')
+            logger.info(f'API call metrics of {model_name} on {dataset_name}:\n'
+                        + tabulate(metrics, headers='keys', tablefmt='simple', floatfmt='.2f', showindex=False))
     if world_size > 1:
         dist.barrier()
     return model
@@ -79,6 +79,9 @@ def infer_data(model, model_name, work_dir, dataset, out_file, verbose=False, ap
     res = {}
     if osp.exists(out_file):
         res.update(load(out_file))
+    # Finished items are appended to the log one by one, and compacted into `out_file` only once at the end
+    log = ResultLog(osp.splitext(out_file)[0] + '.records')
+    res.update(log.load())
 
     rank, world_size = get_rank_and_world_size()
     sheet_indices = list(range(rank, len(dataset), world_size))
@@ -95,6 +98,7 @@ def infer_data(model, model_name, work_dir, dataset, out_file, verbose=False, ap
     if all_finished:
         res = {k: res[k] for k in data_indices}
         dump(res, out_file)
+        log.remove()
         return model
 
     # Data need to be inferred
@@ -134,6 +138,7 @@ def infer_data(model, model_name, work_dir, dataset, out_file, verbose=False, ap
         res.update(supp)
         res = {k: res[k] for k in data_indices}
         dump(res, out_file)
+        log.remove()
         return model
     else:
         model.set_dump_image(dataset.dump_image)
@@ -155,11 +160,11 @@ def infer_data(model, model_name, work_dir, dataset, out_file, verbose=False, ap
             print(response, flush=True)
 
         res[idx] = response
-        if (i + 1) % 20 == 0:
-            dump(res, out_file)
+        log.append(idx, response)
 
     res = {k: res[k] for k in data_indices}
     dump(res, out_file)
+    log.remove()
     return model
 
 
@@ -78,6 +78,9 @@ def infer_data_api(model, work_dir, model_name, dataset, samples_dict={}, api_np
 
 def infer_data(model, model_name, work_dir, dataset, out_file, verbose=False, api_nproc=4, use_vllm=False):
     res = load(out_file) if osp.exists(out_file) else {}
+    # Finished items are appended to the log one by one, and compacted into `out_file` only once at the end
+    log = ResultLog(osp.splitext(out_file)[0] + '.records')
+    res.update(log.load())
     rank, world_size = get_rank_and_world_size()
     dataset_name = dataset.dataset_name
 
@@ -87,6 +90,8 @@ def infer_data(model, model_name, work_dir, dataset, out_file, verbose=False, ap
 
     sample_indices_sub = sample_indices[rank::world_size]
     if np.all([idx in res for idx in sample_indices_sub]):
+        dump(res, out_file)
+        log.remove()
         return model
     sample_indices_subrem = [x for x in sample_indices_sub if x not in res]
 
@@ -122,6 +127,7 @@ def infer_data(model, model_name, work_dir, dataset, out_file, verbose=False, ap
             assert k in supp
         res.update(supp)
         dump(res, out_file)
+        log.remove()
         return model
 
     assert not getattr(dataset, 'pack', False), 'Current model not supported pack mode!'
@@ -192,11 +198,11 @@ def infer_data(model, model_name, work_dir, dataset, out_file, verbose=False, ap
             print(response, flush=True)
 
         res[idx] = response
-        if (i + 1) % 20 == 0:
-            dump(res, out_file)
+        log.append(idx, response)
 
     res = {k: res[k] for k in sample_indices_sub}
     dump(res, out_file)
+    log.remove()
     return model
 
 
@@ -214,8 +220,13 @@ def infer_data_job_video(
     dataset_name = dataset.dataset_name
     rank, world_size = get_rank_and_world_size()
     result_file = osp.join(work_dir, result_file_name)
-    # Dump Predictions to Prev File if result file exists
-    if osp.exists(result_file):
+    # Predictions may exist in another format (e.g., xlsx files from previous runs)
+    stem = osp.splitext(result_file_name)[0]
+    assert stem.startswith(f'{model_name}_'), result_file_name
+    exist_file = find_pred_file(work_dir, model_name, stem[len(model_name) + 1:])
+    if exist_file is not None:
+        if rank == 0 and exist_file != result_file and not osp.exists(result_file):
+            dump(load(exist_file), result_file)
         return model
 
     tmpl = osp.join(work_dir, '{}' + f'{world_size}_{osp.splitext(result_file_name)[0]}.pkl')
@@ -2,3 +2,4 @@ from .file import *
 from .vlm import *
 from .misc import *
 from .log import *
+from .timing import *
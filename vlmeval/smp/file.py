@@ -133,6 +133,73 @@ class NumpyEncoder(json.JSONEncoder):
         return json.JSONEncoder.default(self, obj)
 
 
+def _columnar_safe(data):
+    # Arrow requires a single type per column, object columns mixing str / int / float (e.g. `answer`) are
+    # stored as str, missing values are kept as null
+    data = data.copy()
+    data.columns = [str(c) for c in data.columns]
+    for col in data.columns:
+        if data[col].dtype != object:
+            continue
+        types = set(type(x) for x in data[col] if not pd.isna(x))
+        if len(types) > 1 or not all(issubclass(t, (str, bytes, bool, int, float, np.generic)) for t in types):
+            data[col] = [x if pd.isna(x) else str(x) for x in data[col]]
+    return data
+
+
+def _restore_nan(data):
+    # Arrow returns None for nulls in str columns, keep NaN as other tabular formats do
+    for col in data.columns:
+        if data[col].dtype == object and data[col].isna().any():
+            data[col] = data[col].where(data[col].notna(), np.nan)
+    return data
+
+
+# Formats of the prediction file, the first one is the default
+PRED_FORMATS = ['parquet', 'feather', 'xlsx', 'tsv']
+
+
+def get_pred_file_format():
+    fmt = os.environ.get('PRED_FORMAT', '').lower().strip('.')
+    if fmt == '':
+        return PRED_FORMATS[0]
+    assert fmt in PRED_FORMATS, f'Unsupported PRED_FORMAT {fmt}, should be one of {PRED_FORMATS}'
+    return fmt
+
+
+def get_pred_file_path(work_dir, model_name, dataset_name, fmt=None):
+    fmt = get_pred_file_format() if fmt is None else fmt
+    return osp.join(work_dir, f'{model_name}_{dataset_name}.{fmt}')
+
+
+def find_pred_file(work_dir, model_name, dataset_name):
+    # Prefer the configured format, fall back to predictions dumped in other formats (e.g., legacy xlsx files)
+    fmt = get_pred_file_format()
+    for f in [fmt] + [x for x in PRED_FORMATS if x != fmt]:
+        pth = get_pred_file_path(work_dir, model_name, dataset_name, fmt=f)
+        if osp.exists(pth):
+            return pth
+    return None
+
+
+def get_intermediate_file_path(eval_file, suffix, target_format=None):
+    """Build the path of an auxiliary file derived from `eval_file`.
+
+    `suffix` is appended to the stem of `eval_file`. The extension is `target_format` if given,
+    otherwise the extension of `eval_file` (so that tabular intermediates follow the prediction format).
+    Tabular intermediates of previous runs were always stored in xlsx: if such a file exists (and none in the
+    prediction format), its path is returned so that the finished judge results are reused.
+    """
+    stem, ext = osp.splitext(eval_file)
+    if target_format is None:
+        pth = stem + suffix + ext
+        legacy = stem + suffix + '.xlsx'
+        if ext[1:] in PRED_FORMATS and not osp.exists(pth) and osp.exists(legacy):
+            return legacy
+        return pth
+    return stem + suffix + '.' + target_format.lstrip('.')
+
+
 # LOAD & DUMP
 def dump(data, f, **kwargs):
     def dump_pkl(data, pth, **kwargs):
@@ -149,13 +216,21 @@ def dump(data, f, **kwargs):
     def dump_xlsx(data, f, **kwargs):
         data.to_excel(f, index=False, engine='xlsxwriter')
 
+    def dump_parquet(data, f, **kwargs):
+        _columnar_safe(data).to_parquet(f, index=False)
+
+    def dump_feather(data, f, **kwargs):
+        _columnar_safe(data).reset_index(drop=True).to_feather(f)
+
     def dump_csv(data, f, quoting=csv.QUOTE_ALL):
         data.to_csv(f, index=False, encoding='utf-8', quoting=quoting)
 
     def dump_tsv(data, f, quoting=csv.QUOTE_ALL):
         data.to_csv(f, sep='\t', index=False, encoding='utf-8', quoting=quoting)
 
-    handlers = dict(pkl=dump_pkl, json=dump_json, jsonl=dump_jsonl, xlsx=dump_xlsx, csv=dump_csv, tsv=dump_tsv)
+    handlers = dict(
+        pkl=dump_pkl, json=dump_json, jsonl=dump_jsonl, xlsx=dump_xlsx, csv=dump_csv, tsv=dump_tsv,
+        parquet=dump_parquet, feather=dump_feather)
     suffix = f.split('.')[-1]
     return handlers[suffix](data, f, **kwargs)
 
@@ -184,6 +259,12 @@ def load(f, fmt=None):
     def load_tsv(f):
         return pd.read_csv(f, sep='\t')
 
+    def load_parquet(f):
+        return _restore_nan(pd.read_parquet(f))
+
+    def load_feather(f):
+        return _restore_nan(pd.read_feather(f))
+
     import validators
     if validators.url(f):
         tgt = osp.join(LMUDataRoot(), 'files', osp.basename(f))
@@ -191,7 +272,9 @@ def load(f, fmt=None):
             download_file(f, tgt)
         f = tgt
 
-    handlers = dict(pkl=load_pkl, json=load_json, jsonl=load_jsonl, xlsx=load_xlsx, csv=load_csv, tsv=load_tsv)
+    handlers = dict(
+        pkl=load_pkl, json=load_json, jsonl=load_jsonl, xlsx=load_xlsx, csv=load_csv, tsv=load_tsv,
+        parquet=load_parquet, feather=load_feather)
     if fmt is not None:
         return handlers[fmt](f)
 
@@ -199,6 +282,65 @@ def load(f, fmt=None):
     return handlers[suffix](f)
 
 
+class ResultLog:
+    """Append-only log of inference results, one pickled (key, value) record per finished item.
+
+    Appending a record costs the same regardless of how many results are already there (unlike re-dumping
+    the whole result dict), and records are fsync-ed every `sync_every` appends. `load` replays the log, a
+    record truncated by a crash is dropped and overwritten by the next append.
+    """
+
+    def __init__(self, pth, sync_every=16):
+        self.pth = pth
+        self.sync_every = sync_every
+        self.fout = None
+        self.valid_size = 0
+        self.n_unsynced = 0
+
+    def load(self):
+        res = {}
+        self.valid_size = 0
+        if not osp.exists(self.pth):
+            return res
+        with open(self.pth, 'rb') as fin:
+            while True:
+                try:
+                    k, v = pickle.load(fin)
+                except Exception:
+                    break
+                res[k] = v
+                self.valid_size = fin.tell()
+        return res
+
+    def append(self, key, value):
+        if self.fout is None:
+            if osp.exists(self.pth):
+                self.load()
+                os.truncate(self.pth, self.valid_size)
+            self.fout = open(self.pth, 'ab')
+        pickle.dump((key, value), self.fout)
+        self.fout.flush()
+        self.n_unsynced += 1
+        if self.n_unsynced >= self.sync_every:
+            self.sync()
+
+    def sync(self):
+        if self.fout is not None and self.n_unsynced > 0:
+            os.fsync(self.fout.fileno())
+            self.n_unsynced = 0
+
+    def close(self):
+        if self.fout is not None:
+            self.sync()
+            self.fout.close()
+            self.fout = None
+
+    def remove(self):
+        self.close()
+        if osp.exists(self.pth):
+            os.remove(self.pth)
+
+
 def download_file(url, filename=None):
     import urllib.request
     from tqdm import tqdm
@@ -413,6 +555,9 @@ def prepare_reuse_files(pred_root_meta, eval_id, model_name, dataset_name, reuse
     else:
         for root in prev_pred_roots[::-1]:
             fs = ls(root, match=f'{model_name}_{dataset_name}.')
+            # Prefer the prediction file in the configured format (e.g., over an exported xlsx copy)
+            fmt_order = [get_pred_file_format()] + PRED_FORMATS + [x.split('.')[-1] for x in fs]
+            fs.sort(key=lambda x: fmt_order.index(x.split('.')[-1]))
             if len(fs):
                 if len(fs) > 1:
                     warnings.warn(f'Multiple candidates in {root}: {fs}. Will use {fs[0]}')
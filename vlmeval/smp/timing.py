@@ -0,0 +1,115 @@
+"""Lightweight hierarchical stage timers.
+
+`with timer('stage'):` records the wall time of a stage. Stages nest per thread: a stage started inside another
+one is recorded under its path (e.g., `infer/generate`). Work handed to a background thread can be attached to
+a stage of the submitting thread with `timer(name, parent=current_stage())`. Concurrent stages overlap, so the
+time of the children of a stage may add up to more than the stage itself.
+
+`dump_timings` writes the recorded stages of a run, aggregated by path, to a JSON file, and optionally all the
+individual spans to a Chrome trace file (to be opened in `chrome://tracing` or https://ui.perfetto.dev).
+"""
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+_TIMER_LOCK = threading.Lock()
+_TIMER_LOCAL = threading.local()
+_SPANS = []
+
+
+def _stack():
+    if not hasattr(_TIMER_LOCAL, 'stack'):
+        _TIMER_LOCAL.stack = []
+    return _TIMER_LOCAL.stack
+
+
+def current_stage():
+    """The path of the innermost running stage of the current thread, None if there is no running stage."""
+    stack = _stack()
+    return stack[-1] if len(stack) else None
+
+
+@contextmanager
+def timer(name, parent=None, **meta):
+    """Time the enclosed block as stage `name`, nested under `parent` (a stage path) if given, else under the
+    innermost running stage of the current thread. Extra keyword arguments are kept as metadata of the span."""
+    if parent is None:
+        parent = current_stage()
+    path = name if parent is None else f'{parent}/{name}'
+    stack = _stack()
+    stack.append(path)
+    start = time.time()
+    try:
+        yield path
+    finally:
+        end = time.time()
+        stack.pop()
+        span = dict(path=path, start=start, end=end, pid=os.getpid(), tid=threading.get_ident(), meta=meta)
+        with _TIMER_LOCK:
+            _SPANS.append(span)
+
+
+def reset_timings():
+    with _TIMER_LOCK:
+        _SPANS.clear()
+
+
+def timing_spans():
+    with _TIMER_LOCK:
+        return list(_SPANS)
+
+
+def summarize_timings(spans=None):
+    """Aggregate the spans by stage path, returns a list of dicts (path, count, total / mean / max seconds),
+    parents before their children."""
+    spans = timing_spans() if spans is None else spans
+    stages = {}
+    for span in spans:
+        duration = span['end'] - span['start']
+        stage = stages.setdefault(
+            span['path'], dict(path=span['path'], count=0, total=0.0, max=0.0, first_start=span['start']))
+        stage['count'] += 1
+        stage['total'] += duration
+        stage['max'] = max(stage['max'], duration)
+        stage['first_start'] = min(stage['first_start'], span['start'])
+
+    def order_key(path):
+        # Siblings in the order they first started
+        parts = path.split('/')
+        return [stages['/'.join(parts[:i + 1])]['first_start'] if '/'.join(parts[:i + 1]) in stages else 0
+                for i in range(len(parts))]
+
+    ret = []
+    for path in sorted(stages, key=order_key):
+        stage = stages[path]
+        ret.append(dict(
+            path=path, depth=path.count('/'), count=stage['count'], total=stage['total'],
+            mean=stage['total'] / stage['count'], max=stage['max']))
+    return ret
+
+
+def dump_timings(timing_file, trace_file=None, **meta):
+    """Write the aggregated stages (and `meta`, e.g., the model & dataset names) to `timing_file` (JSON). If
+    `trace_file` is given, also write the individual spans to it in the Chrome trace event format."""
+    spans = timing_spans()
+    report = dict(meta)
+    if len(spans):
+        report['start'] = min(s['start'] for s in spans)
+        report['end'] = max(s['end'] for s in spans)
+        report['wall_time'] = report['end'] - report['start']
+    report['stages'] = summarize_timings(spans)
+    with open(timing_file, 'w') as fout:
+        json.dump(report, fout, indent=4)
+
+    if trace_file is not None:
+        events = []
+        for span in spans:
+            events.append(dict(
+                name=span['path'].split('/')[-1], cat=span['path'], ph='X',
+                ts=span['start'] * 1e6, dur=(span['end'] - span['start']) * 1e6,
+                pid=span['pid'], tid=span['tid'], args=span['meta']))
+        with open(trace_file, 'w') as fout:
+            json.dump(dict(traceEvents=events, displayTimeUnit='ms', otherData=meta), fout)
+    return report
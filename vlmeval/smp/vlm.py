@@ -159,7 +159,11 @@ def decode_base64_to_image_file(base64_string, image_path, target_size=-1):
     base_dir = osp.dirname(image_path)
     if not osp.exists(base_dir):
         os.makedirs(base_dir, exist_ok=True)
-    image.save(image_path)
+    # Write to a temporary file first, so that concurrent workers never read a partially written image
+    root, ext = osp.splitext(image_path)
+    tmp_path = f'{root}.{uuid4().hex}{ext}'
+    image.save(tmp_path)
+    os.replace(tmp_path, image_path)
 
 
 def build_option_str(option_dict):
@@ -5,7 +5,10 @@ from vlmeval.config import *
 from vlmeval.smp import *
 
 # Define valid modes
-MODES = ('dlist', 'mlist', 'missing', 'circular', 'localize', 'check', 'run', 'eval', 'merge_pkl', 'scan')
+MODES = (
+    'dlist', 'mlist', 'missing', 'circular', 'localize', 'check', 'run', 'eval', 'merge_pkl', 'scan', 'rescore',
+    'extract_frames'
+)
 
 CLI_HELP_MSG = \
     f"""
@@ -38,6 +41,10 @@ CLI_HELP_MSG = \
             vlmutil merge_pkl [pkl_dir] [world_size]
         10. Scan evaluation results and detect api failure
             vlmutil scan --model [model_list.txt or model_names] --data [dataset_names] --root [root_dir]
+        11. Re-evaluate all prediction files under a work dir and build a leaderboard
+            vlmutil rescore --root [root_dir] --model [model_names] --data [dataset_names] --nproc [nproc]
+        12. Pre-extract the frames of video datasets ahead of inference (resumable)
+            vlmutil extract_frames --data [dataset_names] --nproc [nproc]
     GitHub: https://github.com/open-compass/VLMEvalKit
     """  # noqa: E501
 
@@ -409,11 +416,7 @@ def RUN(lvl, model):
             os.system(cmd)
 
 
-def EVAL(dataset_name, data_file, **kwargs):
-    from vlmeval.dataset import build_dataset
-    logger = get_logger('VLMEvalKit Tool-Eval')
-    dataset = build_dataset(dataset_name)
-    # Set the judge kwargs first before evaluation or dumping
+def build_judge_kwargs(dataset_name, dataset, **kwargs):
     judge_kwargs = {'nproc': 4, 'verbose': True}
     if 'model' not in kwargs:
         if dataset.TYPE in ['MCQ', 'Y/N', 'MCQ_MMMU_Pro']:
@@ -429,6 +432,15 @@ def EVAL(dataset_name, data_file, **kwargs):
     else:
         judge_kwargs['model'] = kwargs['model']
     judge_kwargs['nproc'] = kwargs.get('nproc', 4)
+    return judge_kwargs
+
+
+def EVAL(dataset_name, data_file, **kwargs):
+    from vlmeval.dataset import build_dataset
+    logger = get_logger('VLMEvalKit Tool-Eval')
+    dataset = build_dataset(dataset_name)
+    # Set the judge kwargs first before evaluation or dumping
+    judge_kwargs = build_judge_kwargs(dataset_name, dataset, **kwargs)
     eval_results = dataset.evaluate(data_file, **judge_kwargs)
     if eval_results is not None:
         assert isinstance(eval_results, dict) or isinstance(eval_results, pd.DataFrame)
@@ -477,7 +489,7 @@ def MERGE_PKL(pkl_dir, world_size=1):
         prefs.extend([f'{i}{ws}_' for i in range(ws)])
     prefs = set(prefs)
     files = os.listdir(pkl_dir)
-    files = [x for x in files if x[:3] in prefs]
+    files = [x for x in files if x[:3] in prefs and x.endswith('.pkl')]
     # Merge the files
     res_all = defaultdict(dict)
     for f in files:
@@ -497,9 +509,8 @@ def SCAN_ONE(root, model, dataset):
     from termcolor import colored
     FAIL_MSG = 'Failed to obtain answer via API.'
     root = osp.join(root, model)
-    fname = f'{model}_{dataset}.xlsx'
-    pth = osp.join(root, fname)
-    if osp.exists(pth):
+    pth = find_pred_file(root, model, dataset)
+    if pth is not None:
         data = load(pth)
         # Detect Failure
         assert 'prediction' in data
@@ -511,7 +522,7 @@ def SCAN_ONE(root, model, dataset):
             print(colored(f'Model {model} x Dataset {dataset} Inference: {nfail} out of {ntot} failed. {nfail / ntot * 100: .2f}%. ', 'light_red'))  # noqa: E501
 
         eval_files = ls(root, match=f'{model}_{dataset}_')
-        eval_files = [x for x in eval_files if listinstr([f'{dataset}_openai', f'{dataset}_gpt'], x) and x.endswith('.xlsx')]  # noqa: E501
+        eval_files = [x for x in eval_files if listinstr([f'{dataset}_openai', f'{dataset}_gpt'], x) and x.split('.')[-1] in PRED_FORMATS]  # noqa: E501
 
         if len(eval_files) == 0:
             return
@@ -549,7 +560,7 @@ def SCAN(root, models, datasets):
         cur_datasets = []
         if len(datasets) == 0:
             for d in SUPPORTED_DATASETS:
-                if osp.exists(osp.join(root, m, f'{m}_{d}.xlsx')):
+                if find_pred_file(osp.join(root, m), m, d) is not None:
                     cur_datasets.append(d)
         else:
             cur_datasets = datasets
@@ -560,6 +571,141 @@ def SCAN(root, models, datasets):
         print(colored(f'Finished scanning datasets {cur_datasets} for model {m}.', 'green'))
 
 
+def parse_args_rescore():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('cmd', type=str)
+    parser.add_argument('--root', type=str, default=None)
+    parser.add_argument('--model', type=str, nargs='+', default=None)
+    parser.add_argument('--data', type=str, nargs='+', default=None)
+    parser.add_argument('--nproc', type=int, default=8, help='Number of processes for scoring prediction files')
+    parser.add_argument('--judge', type=str, default=None)
+    parser.add_argument('--api-nproc', type=int, default=4)
+    parser.add_argument('--out', type=str, default=None, help='Where to save the leaderboard')
+    args = parser.parse_args()
+    return args
+
+
+# Datasets are built once in the main process and inherited by the (forked) scoring workers
+_RESCORE_DATASETS = {}
+
+
+def _flatten_result(res, prefix=''):
+    flat = {}
+    if isinstance(res, pd.DataFrame):
+        if len(res) == 1:
+            res = res.iloc[0].to_dict()
+        else:
+            # The first column of a result table is usually the split / category
+            if res.columns[0] != 'value' and not pd.api.types.is_numeric_dtype(res[res.columns[0]]):
+                res = res.set_index(res.columns[0])
+            res = {f'{idx}/{col}': res.at[idx, col] for idx in res.index for col in res.columns}
+    if isinstance(res, dict):
+        for k, v in res.items():
+            flat.update(_flatten_result(v, f'{prefix}{k}/'))
+    elif isinstance(res, (int, float, np.integer, np.floating)) and not isinstance(res, bool):
+        flat[prefix.rstrip('/')] = float(res)
+    return flat
+
+
+def _init_rescore_worker(eval_nproc):
+    # Each scoring worker creates its own evaluation pool (see `get_eval_pool`), share the CPUs among them
+    os.environ['EVAL_NPROC'] = str(eval_nproc)
+
+
+def _rescore_one(model, dataset_name, pred_file, judge_kwargs):
+    dataset = _RESCORE_DATASETS[dataset_name]
+    try:
+        res = dataset.evaluate(pred_file, **judge_kwargs)
+    except Exception as err:
+        return model, dataset_name, None, f'{type(err).__name__}: {err}'
+    return model, dataset_name, _flatten_result(res), None
+
+
+def RESCORE(root, models=None, datasets=None, nproc=8, out=None, **kwargs):
+    """Re-evaluate all prediction files under `root` in a process pool, and build a single leaderboard."""
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    import multiprocessing as mp
+    from vlmeval.dataset import build_dataset
+    logger = get_logger('VLMEvalKit Tool-Rescore')
+
+    if not models:
+        models = sorted([x for x in os.listdir(root) if osp.isdir(osp.join(root, x))])
+    datasets = datasets if datasets else SUPPORTED_DATASETS
+    tasks = []
+    for m in models:
+        for d in sorted(set(datasets)):
+            pth = find_pred_file(osp.join(root, m), m, d)
+            if pth is not None:
+                tasks.append((m, d, pth))
+    if len(tasks) == 0:
+        logger.warning(f'No prediction files found under {root}. ')
+        return None
+
+    judge_kwargs = {}
+    records, failed = [], []
+    for d in sorted(set([t[1] for t in tasks])):
+        try:
+            dataset = build_dataset(d)
+            if dataset is None:
+                raise ValueError(f'Failed to build dataset {d}')
+            judge_kwargs[d] = build_judge_kwargs(d, dataset, **kwargs)
+            _RESCORE_DATASETS[d] = dataset
+        except Exception as err:
+            # The prediction files of this dataset are reported as failed, the other datasets are still scored
+            failed.extend([(m, d, f'{type(err).__name__}: {err}') for m, dd, _ in tasks if dd == d])
+    tasks = [t for t in tasks if t[1] in judge_kwargs]
+    logger.info(f'Scoring {len(tasks)} prediction files of {len(models)} models on {len(judge_kwargs)} datasets. ')
+
+    eval_nproc = int(os.environ.get('EVAL_NPROC', min(16, os.cpu_count() or 1)))
+    eval_nproc = max(eval_nproc // max(nproc, 1), 1)
+    with ProcessPoolExecutor(
+            max_workers=nproc, mp_context=mp.get_context('fork'),
+            initializer=_init_rescore_worker, initargs=(eval_nproc, )) as executor:
+        futures = [executor.submit(_rescore_one, m, d, pth, judge_kwargs[d]) for m, d, pth in tasks]
+        for future in tqdm(as_completed(futures), total=len(futures)):
+            m, d, res, err = future.result()
+            if err is not None:
+                failed.append((m, d, err))
+                continue
+            records.extend([dict(model=m, dataset=d, metric=k, value=v) for k, v in res.items()])
+    for m, d, err in failed:
+        logger.error(f'Failed to evaluate Model {m} x Dataset {d}: {err}')
+    if len(records) == 0:
+        return None
+
+    records = pd.DataFrame(records)
+    leaderboard = records.pivot_table(index='model', columns=['dataset', 'metric'], values='value', aggfunc='first')
+    leaderboard.columns = [f'{d}/{k}' for d, k in leaderboard.columns]
+    leaderboard = leaderboard.reset_index()
+    out = out if out is not None else osp.join(root, 'rescore_leaderboard.csv')
+    dump(leaderboard, out)
+    dump(records, get_intermediate_file_path(out, '_detail'))
+    logger.info(f'Leaderboard of {len(leaderboard)} models saved to {out}. ')
+    return leaderboard
+
+
+def parse_args_extract_frames():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('cmd', type=str)
+    parser.add_argument('--data', type=str, nargs='+', required=True)
+    parser.add_argument('--nproc', type=int, default=4, help='Number of videos processed in parallel')
+    args = parser.parse_args()
+    return args
+
+
+def EXTRACT_FRAMES(datasets, nproc=4):
+    from vlmeval.dataset import build_dataset
+    from vlmeval.dataset.utils.frame_extractor import extract_dataset_frames
+    logger = get_logger('Extract Frames')
+    for dataset_name in datasets:
+        dataset = build_dataset(dataset_name)
+        if dataset is None or getattr(dataset, 'MODALITY', None) != 'VIDEO':
+            logger.error(f'{dataset_name} is not a valid video dataset, will be skipped. ')
+            continue
+        num_videos = extract_dataset_frames(dataset, nproc=nproc)
+        logger.info(f'Frames of {num_videos} videos in {dataset_name} are extracted. ')
+
+
 def cli():
     logger = get_logger('VLMEvalKit Tools')
     args = sys.argv[1:]
@@ -651,6 +797,16 @@ def cli():
         assert len(models)
         datasets = args.data
         SCAN(root, models, datasets if datasets is not None else [])
+    elif args[0].lower() == 'rescore':
+        args = parse_args_rescore()
+        root = args.root if args.root is not None else os.getcwd()
+        kwargs = {'nproc': args.api_nproc}
+        if args.judge is not None:
+            kwargs['model'] = args.judge
+        RESCORE(root, args.model, args.data, nproc=args.nproc, out=args.out, **kwargs)
+    elif args[0].lower() == 'extract_frames':
+        args = parse_args_extract_frames()
+        EXTRACT_FRAMES(args.data, nproc=args.nproc)
     else:
         logger.error('WARNING: command error!')
         logger.info(CLI_HELP_MSG)
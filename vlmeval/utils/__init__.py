@@ -1,7 +1,9 @@
 from .matching_util import can_infer, can_infer_option, can_infer_text, can_infer_sequence, can_infer_lego
-from .mp_util import track_progress_rich
+from .mp_util import (track_progress_rich, ShardQueue, prefetch_map, prefetch_iter, get_eval_pool, shutdown_eval_pool,
+                      eval_map)
 
 
 __all__ = [
     'can_infer', 'can_infer_option', 'can_infer_text', 'track_progress_rich', 'can_infer_sequence', 'can_infer_lego',
+    'ShardQueue', 'prefetch_map', 'prefetch_iter', 'get_eval_pool', 'shutdown_eval_pool', 'eval_map',
 ]
@@ -7,10 +7,51 @@ from rich.progress import (BarColumn, MofNCompleteColumn, Progress, Task,
 from rich.text import Text
 import os.path as osp
 import time
+import threading
 import portalocker
 from ..smp import load, dump
 
 
+# The process pool shared by the rule-based evaluators, see `get_eval_pool`
+_EVAL_POOL = None
+_EVAL_POOL_NPROC = None
+_EVAL_POOL_LOCK = threading.Lock()
+
+
+def get_eval_pool():
+    """Get the process pool shared by the rule-based evaluators. It is created on first use and reused across
+    datasets within a run. The number of workers is set with the env var `EVAL_NPROC` (default to the number of
+    CPUs, at most 16)."""
+    global _EVAL_POOL, _EVAL_POOL_NPROC
+    with _EVAL_POOL_LOCK:
+        if _EVAL_POOL is None:
+            import atexit
+            import multiprocessing as mp
+            _EVAL_POOL_NPROC = int(os.environ.get('EVAL_NPROC', min(16, os.cpu_count() or 1)))
+            _EVAL_POOL = mp.Pool(_EVAL_POOL_NPROC)
+            atexit.register(shutdown_eval_pool)
+    return _EVAL_POOL
+
+
+def shutdown_eval_pool():
+    global _EVAL_POOL
+    with _EVAL_POOL_LOCK:
+        if _EVAL_POOL is not None:
+            _EVAL_POOL.close()
+            _EVAL_POOL.join()
+            _EVAL_POOL = None
+
+
+def eval_map(func: Callable, tasks: list, chunksize: int = None) -> list:
+    """Map `func` over `tasks` with the shared evaluation pool, tasks are sent to workers in chunks."""
+    if len(tasks) == 0:
+        return []
+    pool = get_eval_pool()
+    if chunksize is None:
+        chunksize = max(1, len(tasks) // (_EVAL_POOL_NPROC * 4))
+    return pool.map(func, tasks, chunksize=chunksize)
+
+
 def track_progress_rich(
         func: Callable,
         tasks: Iterable = tuple(),
@@ -57,7 +98,11 @@ def track_progress_rich(
                     results[idx] = futures[idx].result()
                     new_finished.add(idx)
                     if keys is not None:
-                        res[keys[idx]] = results[idx]
+                        # A task may handle several items at once (a tuple of keys), results are then saved per item
+                        if isinstance(keys[idx], tuple) and isinstance(results[idx], list):
+                            res.update(zip(keys[idx], results[idx]))
+                        else:
+                            res[keys[idx]] = results[idx]
             if len(new_finished):
                 if save is not None:
                     dump(res, save)
@@ -70,3 +115,165 @@ def track_progress_rich(
     if save is not None:
         dump(res, save)
     return results
+
+
+class ShardQueue:
+    """A work queue shared by all ranks, which hands out chunks of row positions on demand.
+
+    The cursor is kept in a small file guarded by a file lock, so it works for any number of processes on a
+    single node (or on multiple nodes sharing the work dir) without requiring a distributed backend.
+    Ranks that draw cheap items simply come back for more work, instead of idling at the barrier.
+    """
+
+    def __init__(self, path, total, chunk_size=4, timeout=60):
+        assert chunk_size > 0, 'chunk_size must be a positive number'
+        self.path = path
+        self.lock_file = path + '.lock'
+        self.total = total
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+
+    def reset(self):
+        with portalocker.Lock(self.lock_file, timeout=self.timeout):
+            with open(self.path, 'w') as fout:
+                fout.write('0')
+
+    def next_chunk(self) -> list:
+        with portalocker.Lock(self.lock_file, timeout=self.timeout):
+            with open(self.path) as fin:
+                start = int(fin.read().strip() or 0)
+            end = min(start + self.chunk_size, self.total)
+            if start < end:
+                with open(self.path, 'w') as fout:
+                    fout.write(str(end))
+        return list(range(start, end))
+
+    def __iter__(self):
+        chunk = self.next_chunk()
+        while len(chunk):
+            yield chunk
+            chunk = self.next_chunk()
+
+    def remove(self):
+        for f in [self.path, self.lock_file]:
+            if osp.exists(f):
+                os.remove(f)
+
+
+class PrefetchedList(list):
+    """The getters returned by `prefetch_map`, `close` stops the prefetching (e.g., if the consumer aborts)."""
+
+    def __init__(self, getters, close):
+        super().__init__(getters)
+        self._close = close
+
+    def close(self):
+        self._close()
+
+
+def prefetch_map(func: Callable, items: Iterable, nproc: int = 1, buffer: int = 16) -> PrefetchedList:
+    """Lazily apply `func` to `items` in a background thread pool (a producer / consumer pipeline).
+
+    Returns a list of getters, calling the i-th getter blocks until `func(items[i])` is ready and returns it.
+    Items are processed in order, and at most `buffer` results are kept ahead of the consumers, so expensive
+    preprocessing overlaps with the downstream work without materializing everything up front.
+    Getters are expected to be called (roughly) in order, and each of them exactly once. If the consumer stops
+    before calling all getters, it must call `close()` on the returned list: the remaining items are cancelled
+    (their getters raise `CancelledError`) and the background threads exit.
+    """
+    from concurrent.futures import Future, ThreadPoolExecutor
+    import threading
+
+    assert nproc > 0 and buffer > 0, 'nproc and buffer must be positive numbers'
+    items = list(items)
+    slots = threading.BoundedSemaphore(buffer)
+    stop = threading.Event()
+    futures = [Future() for _ in items]
+
+    def release():
+        try:
+            slots.release()
+        except ValueError:
+            # All slots are free already (after `close`)
+            pass
+
+    def run(i):
+        if not futures[i].set_running_or_notify_cancel():
+            return
+        try:
+            futures[i].set_result(func(items[i]))
+        except Exception as err:
+            futures[i].set_exception(err)
+
+    def feed():
+        with ThreadPoolExecutor(max_workers=nproc) as executor:
+            for i in range(len(items)):
+                slots.acquire()
+                if stop.is_set():
+                    break
+                executor.submit(run, i)
+
+    def getter(i):
+        def get():
+            try:
+                return futures[i].result()
+            finally:
+                release()
+        return get
+
+    def close():
+        stop.set()
+        for future in futures:
+            future.cancel()
+        # Wake the feeder up if it waits for a slot
+        release()
+
+    threading.Thread(target=feed, daemon=True).start()
+    return PrefetchedList([getter(i) for i in range(len(items))], close)
+
+
+def prefetch_iter(func: Callable, items: Iterable, nproc: int = 1, buffer: int = 4):
+    """Apply `func` to the items of a (possibly lazy) iterable in a background thread pool, yield the results in
+    order. At most `buffer` items are pulled & processed ahead of the consumer, so that the preprocessing of the
+    next items overlaps with the work on the current one. Exceptions (of `func` or of the iteration) are raised
+    when the corresponding result is reached."""
+    from concurrent.futures import ThreadPoolExecutor
+    import queue
+
+    assert nproc > 0 and buffer > 0, 'nproc and buffer must be positive numbers'
+    slots = threading.BoundedSemaphore(buffer)
+    futures = queue.Queue()
+    stop = threading.Event()
+    end = object()
+
+    def feed():
+        with ThreadPoolExecutor(max_workers=nproc) as executor:
+            try:
+                for item in items:
+                    slots.acquire()
+                    if stop.is_set():
+                        break
+                    futures.put(executor.submit(func, item))
+            except Exception as err:
+                futures.put(err)
+            futures.put(end)
+
+    threading.Thread(target=feed, daemon=True).start()
+    try:
+        while True:
+            future = futures.get()
+            if future is end:
+                return
+            if isinstance(future, Exception):
+                raise future
+            try:
+                yield future.result()
+            finally:
+                slots.release()
+    finally:
+        # The consumer stopped early, let the feeder exit without pulling more items
+        stop.set()
+        try:
+            slots.release()
+        except ValueError:
+            pass
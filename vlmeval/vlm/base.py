@@ -46,6 +46,79 @@ class BaseModel:
     def generate_inner(self, message, dataset=None):
         raise NotImplementedError
 
+    def prefetch(self, message, dataset=None):
+        """Prepare the model inputs of a message ahead of `generate` (e.g., load and preprocess the images). Called
+        from a background thread while the model generates for the previous messages, see `prefetch_inner`."""
+        self.prefetch_inner(self.preproc_message(message), dataset)
+
+    def prefetch_inner(self, message, dataset=None):
+        """The CPU-side preprocessing of a (preprocessed) message, whose results are kept by the model for the upcoming
+        `generate_inner` call of the same message. Must be thread-safe. Default to doing nothing."""
+        pass
+
+    def support_batch_generate(self, dataset=None):
+        """Whether the model can generate the outputs of a batch of messages at once (`generate_batch_inner`).
+
+        Args:
+            dataset (str, optional): The name of the dataset. Defaults to None.
+
+        Returns:
+            bool: Whether batch generation is supported. Default to False.
+        """
+        return False
+
+    def generate_batch_inner(self, messages, dataset=None):
+        """Generate the outputs of a batch of (preprocessed) messages, called only if `support_batch_generate` returns
+        True. The messages of a batch have similar lengths, as sorted by `message_length`.
+
+        Args:
+            messages (list[list[dict]]): The input messages.
+            dataset (str, optional): The name of the dataset. Defaults to None.
+
+        Returns:
+            list[str]: The generated messages.
+        """
+        raise NotImplementedError
+
+    def vllm_request(self, message, dataset=None):
+        """Build the vLLM request of a (preprocessed) message, implemented by the models with a vLLM backend.
+
+        Args:
+            message (list[dict]): The input message.
+            dataset (str, optional): The name of the dataset. Defaults to None.
+
+        Returns:
+            tuple: The inputs of `LLM.generate` for this message (a prompt dict), and its `SamplingParams`.
+        """
+        raise NotImplementedError
+
+    def vllm_output(self, text, dataset=None):
+        """Post-process the text generated by vLLM for a message. Default to returning it unchanged."""
+        return text
+
+    def generate_batch_vllm(self, messages, dataset=None):
+        """Generate the outputs of (preprocessed) messages with the vLLM engine `self.llm`. All requests, each with its
+        own sampling params, are submitted in one `LLM.generate` call, so that the engine batches them continuously.
+
+        Returns:
+            list[str]: The generated messages, in the order of the input messages.
+        """
+        requests = [self.vllm_request(message, dataset=dataset) for message in messages]
+        outputs = self.llm.generate(
+            [inputs for inputs, _ in requests],
+            sampling_params=[sampling_params for _, sampling_params in requests],
+        )
+        # `LLM.generate` returns the outputs in the order of the requests
+        assert len(outputs) == len(messages)
+        return [self.vllm_output(output.outputs[0].text, dataset=dataset) for output in outputs]
+
+    def message_length(self, message):
+        """The sort key for length bucketing: messages with close keys need little padding when batched together.
+        Default to the number of images & videos, then the length of the text."""
+        num_images = len([x for x in message if x['type'] == 'image'])
+        num_videos = len([x for x in message if x['type'] == 'video'])
+        return num_videos, num_images, sum(len(x['value']) for x in message if x['type'] == 'text')
+
     def check_content(self, msgs):
         """Check the content type of the input. Four types are allowed: str, dict, liststr, listdict.
         """
@@ -108,12 +181,45 @@ class BaseModel:
         Returns:
             str: The generated message.
         """
+        message = self.preproc_message(message)
+        return self.generate_inner(message, dataset)
+
+    def generate_batch(self, messages, dataset=None, batch_size=8):
+        """Generate the output messages of a list of input messages.
+
+        The messages are sorted by `message_length` and split into batches of `batch_size`, so that each batch needs
+        little padding. Falls back to generating message by message if the model does not support batch generation.
+
+        Args:
+            messages (list[list[dict]]): The input messages.
+            dataset (str, optional): The name of the dataset. Defaults to None.
+            batch_size (int, optional): The maximum batch size. Defaults to 8.
+
+        Returns:
+            list[str]: The generated messages, in the order of the input messages.
+        """
+        if not self.support_batch_generate(dataset):
+            return [self.generate(message, dataset) for message in messages]
+        messages = [self.preproc_message(message) for message in messages]
+
+        order = sorted(range(len(messages)), key=lambda i: self.message_length(messages[i]))
+        outputs = [None] * len(messages)
+        for st in range(0, len(order), batch_size):
+            batch = order[st: st + batch_size]
+            batch_outputs = self.generate_batch_inner([messages[i] for i in batch], dataset)
+            assert len(batch_outputs) == len(batch)
+            for i, output in zip(batch, batch_outputs):
+                outputs[i] = output
+        return outputs
+
+    def preproc_message(self, message):
+        """Check and convert an input message of `generate` to a list of dicts."""
         assert self.check_content(message) in ['str', 'dict', 'liststr', 'listdict'], f'Invalid input type: {message}'
         message = self.preproc_content(message)
         assert message is not None and self.check_content(message) == 'listdict'
         for item in message:
             assert item['type'] in self.allowed_types, f'Invalid input type: {item["type"]}'
-        return self.generate_inner(message, dataset)
+        return message
 
     def chat(self, messages, dataset=None):
         """The main function for multi-turn chatting. Will call `chat_inner` with the preprocessed input messages."""
@@ -197,7 +197,7 @@ class Gemma3(BaseModel):
         decoded = self.processor.decode(generation, skip_special_tokens=True)
         return decoded
 
-    def generate_inner_vllm(self, message, dataset=None):
+    def vllm_request(self, message, dataset=None):
         from vllm import LLM, SamplingParams
         prompt, images = self.message_to_promptimg_vllm(message, dataset=dataset)
         messages = [
@@ -210,18 +210,23 @@ class Gemma3(BaseModel):
         )
         sampling_params = SamplingParams(temperature=0.0,
                                          max_tokens=self.kwargs['max_new_tokens'])
-        outputs = self.llm.generate(
-            {
-                "prompt": prompt,
-                "multi_modal_data": {
-                    "image": images
-                },
+        inputs = {
+            "prompt": prompt,
+            "multi_modal_data": {
+                "image": images
             },
-            sampling_params=sampling_params
-        )
-        for o in outputs:
-            generated_text = o.outputs[0].text
-        return generated_text
+        }
+        return inputs, sampling_params
+
+    def generate_inner_vllm(self, message, dataset=None):
+        return self.generate_batch_vllm([message], dataset=dataset)[0]
+
+    def support_batch_generate(self, dataset=None):
+        # All the requests of a batch are submitted to the vLLM engine at once
+        return self.use_vllm
+
+    def generate_batch_inner(self, messages, dataset=None):
+        return self.generate_batch_vllm(messages, dataset=dataset)
 
     def generate_inner(self, message, dataset=None):
         if self.use_vllm:
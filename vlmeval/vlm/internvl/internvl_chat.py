@@ -9,7 +9,9 @@ import torch.distributed as dist
 import torchvision.transforms as T
 import transformers
 import warnings
+import threading
 from PIL import Image
+from collections import OrderedDict
 from functools import partial
 from torchvision.transforms.functional import InterpolationMode
 from transformers import AutoTokenizer, AutoConfig, AutoModel, CLIPImageProcessor
@@ -23,7 +25,7 @@ from .utils import (build_multi_choice_prompt,
                     format_nav_prompt,
                     pile_action_history,
                     reorganize_prompt,
-                    load_image)
+                    load_image as _load_image)
 from .utils import mpo_prompt_with_final_answer, mpo_prompt_without_final_answer, parse_bbox_internvl
 
 from ..base import BaseModel
@@ -224,6 +226,10 @@ class InternVLChat(BaseModel):
 
         warnings.warn(f'Following kwargs received: {self.kwargs}, will use as generation config. ')
 
+        # Image tiles preprocessed ahead of generation (see `prefetch_inner`), {(image, max_num, upscale): tiles}
+        self.prefetched = OrderedDict()
+        self.prefetch_lock = threading.Lock()
+
     def use_custom_prompt(self, dataset):
         assert dataset is not None
         if dataset in [
@@ -312,25 +318,62 @@ class InternVLChat(BaseModel):
     def set_max_num(self, dataset):
         # The total limit on the number of images processed, set to avoid Out-of-Memory issues.
         self.total_max_num = 64
+        self.max_num = self.get_max_num(dataset)
+
+    def get_max_num(self, dataset):
         if dataset is None:
-            self.max_num = 6
-            return None
+            return 6
         res_12_datasets = ['ChartQA_TEST', 'MMMU_DEV_VAL', 'MMMU_TEST', 'MME-RealWorld',
                            'VCR_EN', 'VCR_ZH', 'OCRVQA', 'BMMR']
         res_18_datasets = ['DocVQA_VAL', 'DocVQA_TEST', 'DUDE', 'MMLongBench_DOC', 'SLIDEVQA']
         res_24_datasets = ['InfoVQA_VAL', 'InfoVQA_TEST', 'OCRBench', 'HRBench4K', 'HRBench8K']
         if DATASET_MODALITY(dataset) == 'VIDEO':
-            self.max_num = 1
+            return 1
         elif listinstr(res_12_datasets, dataset):
-            self.max_num = 12
+            return 12
         elif listinstr(res_18_datasets, dataset):
-            self.max_num = 18
+            return 18
         elif listinstr(res_24_datasets, dataset):
-            self.max_num = 24
+            return 24
         elif DATASET_TYPE(dataset) == 'GUI':
-            self.max_num = 12
+            return 12
         else:
-            self.max_num = 6
+            return 6
+
+    def image_inputs(self, message, dataset=None):
+        """The images of a message to load with `load_image`, as a list of (image path, max_num, upscale)."""
+        image_path = [x['value'] for x in message if x['type'] == 'image']
+        if len(image_path) == 0:
+            return []
+        # Same limits as in `set_max_num`: at most `total_max_num` (64) tiles in total
+        max_num = max(1, min(self.get_max_num(dataset), 64 // len(image_path)))
+        if self.version == 'V1.5':
+            return [(file_name, max_num, False) for file_name in image_path]
+        # V2.0: The first image is upscaled for MMMU
+        upscale = dataset is not None and listinstr(['MMMU'], dataset)
+        return [(file_name, max_num, upscale and i == 0) for i, file_name in enumerate(image_path)]
+
+    def load_image(self, image_file, max_num=6, upscale=False):
+        # Use the tiles prepared by `prefetch_inner` if any
+        with self.prefetch_lock:
+            pixel_values = self.prefetched.pop((image_file, max_num, upscale), None)
+        if pixel_values is None:
+            pixel_values = _load_image(image_file, max_num=max_num, upscale=upscale)
+        return pixel_values
+
+    def prefetch_inner(self, message, dataset=None):
+        if self.version not in ['V1.5', 'V2.0'] or self.use_lmdeploy:
+            return
+        for key in self.image_inputs(message, dataset):
+            with self.prefetch_lock:
+                if key in self.prefetched:
+                    continue
+            pixel_values = _load_image(key[0], max_num=key[1], upscale=key[2])
+            with self.prefetch_lock:
+                self.prefetched[key] = pixel_values
+                # Bound the memory, in case prefetched messages are never generated
+                while len(self.prefetched) > 64:
+                    self.prefetched.popitem(last=False)
 
     def generate_v1_2(self, message, dataset=None):
         self.INTERLEAVE = False
@@ -357,11 +400,12 @@ class InternVLChat(BaseModel):
             image_path = [x['value'] for x in message if x['type'] == 'image']
             pixel_values_list = []
             for file_name in image_path:
-                pixel_values_list.append(load_image(file_name, max_num=max_num).to(self.device).to(torch.bfloat16))
+                pixel_values_list.append(
+                    self.load_image(file_name, max_num=max_num).to(self.device).to(torch.bfloat16))
             pixel_values = torch.cat(pixel_values_list, dim=0)
         elif image_num == 1:
             image_path = [x['value'] for x in message if x['type'] == 'image'][0]
-            pixel_values = load_image(image_path, max_num=max_num).to(self.device).to(torch.bfloat16)
+            pixel_values = self.load_image(image_path, max_num=max_num).to(self.device).to(torch.bfloat16)
         else:
             pixel_values = None
         with torch.no_grad():
@@ -390,7 +434,7 @@ class InternVLChat(BaseModel):
             num_patches_list, pixel_values_list = [], []
             for image_idx, file_name in enumerate(image_path):
                 upscale_flag = image_idx == 0 and dataset is not None and listinstr(['MMMU'], dataset)
-                curr_pixel_values = load_image(
+                curr_pixel_values = self.load_image(
                     file_name, max_num=max_num, upscale=upscale_flag).to(self.device).to(torch.bfloat16)
                 num_patches_list.append(curr_pixel_values.size(0))
                 pixel_values_list.append(curr_pixel_values)
@@ -398,7 +442,7 @@ class InternVLChat(BaseModel):
         elif image_num == 1:
             image_path = [x['value'] for x in message if x['type'] == 'image'][0]
             upscale_flag = dataset is not None and listinstr(['MMMU'], dataset)
-            pixel_values = load_image(
+            pixel_values = self.load_image(
                 image_path, max_num=max_num, upscale=upscale_flag).to(self.device).to(torch.bfloat16)
             num_patches_list = [pixel_values.size(0)]
         else:
@@ -527,14 +571,14 @@ class InternVLChat(BaseModel):
             pixel_values_list = []
             for image_idx, file_name in enumerate(image_path):
                 upscale_flag = image_idx == 0 and dataset is not None and listinstr(['MMMU_DEV_VAL'], dataset)
-                curr_pixel_values = load_image(
+                curr_pixel_values = _load_image(
                     file_name, max_num=self.max_num, upscale=upscale_flag).to(self.device).to(torch.bfloat16)
                 num_patches_list.append(curr_pixel_values.size(0))
                 pixel_values_list.append(curr_pixel_values)
             pixel_values = torch.cat(pixel_values_list, dim=0)
         elif image_cnt == 1:
             upscale_flag = listinstr(['MMMU_DEV_VAL'], dataset)
-            pixel_values = load_image(
+            pixel_values = _load_image(
                 image_path, max_num=self.max_num, upscale=upscale_flag).to(self.device).to(torch.bfloat16)
             num_patches_list = [pixel_values.size(0)]
         else:
@@ -8,6 +8,7 @@ import torch.distributed as dist
 import torchvision.transforms as T
 import transformers
 import warnings
+from functools import lru_cache
 from PIL import Image
 from torchvision.transforms.functional import InterpolationMode
 from transformers import AutoTokenizer, AutoConfig, AutoModel, CLIPImageProcessor
@@ -20,6 +21,7 @@ IMAGENET_MEAN = (0.485, 0.456, 0.406)
 IMAGENET_STD = (0.229, 0.224, 0.225)
 
 
+@lru_cache()
 def build_transform(input_size):
     MEAN, STD = IMAGENET_MEAN, IMAGENET_STD
     transform = T.Compose([
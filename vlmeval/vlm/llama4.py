@@ -226,7 +226,7 @@ class llama4(BaseModel):
             )
         return processed_message, images
 
-    def generate_inner_vllm(self, message, dataset=None):
+    def vllm_request(self, message, dataset=None):
         from vllm import LLM, SamplingParams
         prompt, images = self.message_to_promptimg_vllm(message, dataset=dataset)
         messages = [
@@ -239,24 +239,30 @@ class llama4(BaseModel):
         )
         sampling_params = SamplingParams(temperature=self.generate_kwargs['temperature'],
                                          max_tokens=self.generate_kwargs['max_new_tokens'])
-        outputs = self.llm.generate(
-            {
-                "prompt": prompt,
-                "multi_modal_data": {
-                    "image": images
-                },
+        inputs = {
+            "prompt": prompt,
+            "multi_modal_data": {
+                "image": images
             },
-            sampling_params=sampling_params
-        )
-
-        for o in outputs:
-            generated_text = o.outputs[0].text
+        }
+        return inputs, sampling_params
 
+    def vllm_output(self, generated_text, dataset=None):
         if generated_text.endswith("<|eot|>"):
             generated_text = generated_text[:-7]  # 删除末尾的<|eot|>
 
         return generated_text
 
+    def generate_inner_vllm(self, message, dataset=None):
+        return self.generate_batch_vllm([message], dataset=dataset)[0]
+
+    def support_batch_generate(self, dataset=None):
+        # All the requests of a batch are submitted to the vLLM engine at once
+        return self.use_vllm
+
+    def generate_batch_inner(self, messages, dataset=None):
+        return self.generate_batch_vllm(messages, dataset=dataset)
+
     def generate_inner_lmdeploy(self, message, dataset=None):
         from lmdeploy import GenerationConfig
         gen_config = GenerationConfig(
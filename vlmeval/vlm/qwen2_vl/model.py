@@ -449,13 +449,7 @@ class Qwen2VLChat(Qwen2VLPromptMixin, BaseModel):
                 logging.critical("qwen_vl_utils not found, please install it via 'pip install qwen-vl-utils'")  # noqa: E501
                 raise err
 
-        messages = []
-        if self.system_prompt is not None:
-            messages.append({'role': 'system', 'content': self.system_prompt})
-        messages.append({'role': 'user', 'content': self._prepare_content(message, dataset=dataset)})
-        if self.verbose:
-            print(f'\033[31m{messages}\033[0m')
-
+        messages = self._build_messages(message, dataset=dataset)
         text = self.processor.apply_chat_template([messages], tokenize=False, add_generation_prompt=True)
         if listinstr(['omni'], self.model_path.lower()):
             audios, images, videos = process_mm_info([messages], use_audio_in_video=self.use_audio_in_video)
@@ -463,7 +457,7 @@ class Qwen2VLChat(Qwen2VLPromptMixin, BaseModel):
         else:
             images, videos = process_vision_info([messages])
             inputs = self.processor(text=text, images=images, videos=videos, padding=True, return_tensors='pt')  # noqa: E501
-        inputs = inputs.to('cuda')
+        inputs = inputs.to(self.model.device)
 
         if listinstr(['omni'], self.model_path.lower()):
             self.generate_kwargs['use_audio_in_video'] = self.use_audio_in_video
@@ -478,7 +472,64 @@ class Qwen2VLChat(Qwen2VLPromptMixin, BaseModel):
         out = self.processor.tokenizer.batch_decode(
             generated_ids, skip_special_tokens=True, clean_up_tokenization_spaces=False
         )
-        response = out[0]
+        response = self._post_process(out[0])
+        if self.verbose:
+            print(f'\033[32m{response}\033[0m')
+        return response
+
+    def support_batch_generate(self, dataset=None):
+        # Batch generation is implemented for the vLLM backend, and the transformers backend except for the Omni models
+        if type(self).generate_inner is not Qwen2VLChat.generate_inner:
+            # Subclasses with their own generation (e.g., Qwen2VLChatAguvis)
+            return False
+        if self.use_vllm:
+            return True
+        return not (self.use_lmdeploy or listinstr(['omni'], self.model_path.lower()))
+
+    def generate_batch_inner(self, messages, dataset=None):
+        if self.use_vllm:
+            return self.generate_batch_vllm(messages, dataset=dataset)
+        try:
+            from qwen_vl_utils import process_vision_info
+        except Exception as err:
+            logging.critical("qwen_vl_utils not found, please install it via 'pip install qwen-vl-utils'")  # noqa: E501
+            raise err
+
+        messages = [self._build_messages(message, dataset=dataset) for message in messages]
+        text = self.processor.apply_chat_template(messages, tokenize=False, add_generation_prompt=True)
+        images, videos = process_vision_info(messages)
+        # Pad on the left, so that the generated tokens of all sequences start at the same position
+        inputs = self.processor(
+            text=text, images=images, videos=videos, padding=True, padding_side='left', return_tensors='pt'
+        )
+        inputs = inputs.to(self.model.device)
+
+        generated_ids = self.model.generate(
+            **inputs,
+            **self.generate_kwargs,
+        )
+        generated_ids = [
+            output_ids[len(input_ids):] for input_ids, output_ids in zip(inputs.input_ids, generated_ids)
+        ]
+        out = self.processor.tokenizer.batch_decode(
+            generated_ids, skip_special_tokens=True, clean_up_tokenization_spaces=False
+        )
+        responses = [self._post_process(response) for response in out]
+        if self.verbose:
+            for response in responses:
+                print(f'\033[32m{response}\033[0m')
+        return responses
+
+    def _build_messages(self, message, dataset=None):
+        messages = []
+        if self.system_prompt is not None:
+            messages.append({'role': 'system', 'content': self.system_prompt})
+        messages.append({'role': 'user', 'content': self._prepare_content(message, dataset=dataset)})
+        if self.verbose:
+            print(f'\033[31m{messages}\033[0m')
+        return messages
+
+    def _post_process(self, response):
         if self.post_process:
             resp = response.split('\\boxed{')[-1]
             lt = len(resp)
@@ -496,9 +547,6 @@ class Qwen2VLChat(Qwen2VLPromptMixin, BaseModel):
                     break
             if end is not None:
                 response = resp[:end]
-
-        if self.verbose:
-            print(f'\033[32m{response}\033[0m')
         return response
 
     def generate_inner_lmdeploy(self, message, dataset=None):
@@ -517,7 +565,7 @@ class Qwen2VLChat(Qwen2VLPromptMixin, BaseModel):
         response = response.text
         return response
 
-    def generate_inner_vllm(self, message, dataset=None):
+    def vllm_request(self, message, dataset=None):
         from vllm import SamplingParams
 
         if listinstr(['omni'], self.model_path.lower()):
@@ -547,6 +595,7 @@ class Qwen2VLChat(Qwen2VLPromptMixin, BaseModel):
             images, videos = process_vision_info(messages)
         print('finishing process vision info in vllm.')
 
+        videos_nd = None
         if DATASET_MODALITY(dataset) == 'VIDEO' and 'megabench' not in dataset.lower():
             assert len(videos) == 1
             videos_nd = [videos[0].detach().cpu().numpy().transpose(0, 2, 3, 1)]
@@ -567,51 +616,27 @@ class Qwen2VLChat(Qwen2VLPromptMixin, BaseModel):
             temperature=0.0, max_tokens=self.max_new_tokens, stop_token_ids=None
         )
         if images:
-            outputs = self.llm.generate(
-                {
-                    "prompt": text,
-                    "multi_modal_data": {"image": images},
-                },
-                sampling_params=sampling_params,
-            )
+            inputs = {
+                "prompt": text,
+                "multi_modal_data": {"image": images},
+            }
         elif videos_nd:
-            outputs = self.llm.generate(
-                video_inputs,
-                sampling_params=sampling_params,
-            )
+            inputs = video_inputs
         else:
-            outputs = self.llm.generate(
-                {
-                    "prompt": text,
-                },
-                sampling_params=sampling_params,
-            )
-
-        for o in outputs:
-            generated_text = o.outputs[0].text
-
-        if self.post_process:
-            resp = generated_text.split('\\boxed{')[-1]
-            lt = len(resp)
-            counter, end = 1, None
-            for i in range(lt):
-                if resp[i] == '{':
-                    counter += 1
-                elif resp[i] == '}':
-                    counter -= 1
-                if counter == 0:
-                    end = i
-                    break
-                elif i == lt - 1:
-                    end = lt
-                    break
-            if end is not None:
-                generated_text = resp[:end]
+            inputs = {
+                "prompt": text,
+            }
+        return inputs, sampling_params
 
+    def vllm_output(self, text, dataset=None):
+        generated_text = self._post_process(text)
         if self.verbose:
             print(f'\033[32m{generated_text}\033[0m')
         return generated_text
 
+    def generate_inner_vllm(self, message, dataset=None):
+        return self.generate_batch_vllm([message], dataset=dataset)[0]
+
     def generate_inner(self, message, dataset=None):
         if self.use_vllm:
             return self.generate_inner_vllm(message, dataset=dataset)